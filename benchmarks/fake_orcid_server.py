@@ -0,0 +1,117 @@
+import functools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import make_profile, orcid_id, work_detail
+
+# Local stand-in for pub.orcid.org/v3.0 serving synthetic profiles. Supports the
+# section endpoints, /record, bulk /works/{put-code,...} and /search.
+
+# Endpoint -> profile dict key
+ENDPOINTS = {"person": "person", "works": "works", "fundings": "fundings", "employments": "employments",
+             "educations": "educations", "peer-reviews": "peer_reviews", "research-resources": "research_resources"}
+
+class FakeOrcidServer:
+    """
+    Serves synthetic profiles of the given size on 127.0.0.1. latency adds a fixed
+    delay per response to imitate the network round trip to the real API.
+    Use base_url as OrcidClient.BASE_URL.
+    """
+
+    def __init__(self, size="medium", seed=0, latency=0.0, search_results=1000):
+        self.size = size
+        self.seed = seed
+        self.latency = latency
+        self.search_results = search_results
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @functools.lru_cache(maxsize=256)
+    def profile(self, orcid):
+        return make_profile(orcid, self.size, self.seed)
+
+    def respond(self, path, query):
+        """Returns (status, body) for a request path."""
+        parts = path.strip("/").split("/")
+        if parts[-1] in ("search", "expanded-search"):
+            start, rows = int(query.get("start", ["0"])[0]), int(query.get("rows", ["100"])[0])
+            ids = [orcid_id(i) for i in range(start, min(start + rows, self.search_results))]
+            if parts[-1] == "search":
+                return 200, {"num-found": self.search_results,
+                             "result": [{"orcid-identifier": {"path": i}} for i in ids]}
+            return 200, {"num-found": self.search_results, "expanded-result": [{"orcid-id": i} for i in ids]}
+        if len(parts) < 2:
+            return 404, {"error": "not found"}
+
+        orcid, endpoint = parts[0], parts[1]
+        profile = self.profile(orcid)
+        if endpoint in ENDPOINTS and len(parts) == 2:
+            return 200, profile[ENDPOINTS[endpoint]]
+        if endpoint == "record":
+            return 200, {"orcid-identifier": {"path": orcid}, "person": profile["person"],
+                         "activities-summary": {ep: profile[key] for ep, key in ENDPOINTS.items() if ep != "person"}}
+        if endpoint == "works" and len(parts) == 3:
+            summaries = {s["put-code"]: s for g in profile["works"]["group"] for s in g["work-summary"]}
+            bulk = []
+            for code in parts[2].split(","):
+                summary = summaries.get(int(code))
+                if summary is None:
+                    bulk.append({"error": {"response-code": 404, "developer-message": f"No work {code}"}})
+                else:
+                    bulk.append({"work": work_detail(random.Random(f"{orcid}/{code}"), orcid, summary)})
+            return 200, {"bulk": bulk}
+        return 404, {"error": "not found"}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                url = urlparse(self.path)
+                path = url.path
+                if path.startswith("/v3.0"):
+                    path = path[len("/v3.0"):]
+                status, body = server.respond(path, parse_qs(url.query))
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
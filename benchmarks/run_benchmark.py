@@ -0,0 +1,225 @@
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import psycopg2
+from psycopg2.extensions import connection as _connection
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.fake_orcid_server import FakeOrcidServer
+from benchmarks.synthetic import SIZES, orcid_id
+from clients.orcid_client import OrcidClient
+from clients.profile_archive import ProfileArchive
+from clients.request_scheduler import RequestScheduler
+from database import InstrumentedCursor, _connection_params
+from repositories.orcid_repo import OrcidRepository
+
+# End-to-end benchmark of the ORCID ingester against local stand-ins: synthetic
+# profiles from a fake HTTP server, saved into a throwaway PostgreSQL database.
+#
+#   python -m benchmarks.run_benchmark --reset-schema --profiles 200 --size medium
+#
+# DB_* in .env must point at a database you can wipe: --reset-schema drops orcid_source.
+
+SCHEMA_SQL = os.path.join(os.path.dirname(__file__), "schema.sql")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+class CountingCursor(InstrumentedCursor):
+    """Counts statements sent to the server (execute_values/execute_batch send one per page)."""
+
+    def execute(self, query, vars=None):
+        self.connection.statements += 1
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        self.connection.statements += len(vars_list)
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        self.connection.statements += 1
+        return super().copy_expert(sql, file, size)
+
+class CountingConnection(_connection):
+    """Connection that counts statements and COMMIT / ROLLBACK round trips."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = 0
+        self.transactions = 0
+        self.cursor_factory = CountingCursor
+
+    def commit(self):
+        self.transactions += 1
+        return super().commit()
+
+    def rollback(self):
+        self.transactions += 1
+        return super().rollback()
+
+    @property
+    def round_trips(self):
+        return self.statements + self.transactions
+
+def quiet():
+    """Silences the per-profile progress output of the client and repository."""
+    return contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8"))
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def summarize(latencies, elapsed, conn=None, start_counts=(0, 0)):
+    n = len(latencies)
+    result = {
+        "profiles": n,
+        "seconds": round(elapsed, 3),
+        "profiles_per_second": round(n / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {p: round(percentile(latencies, q) * 1000, 2)
+                       for p, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))},
+    }
+    if conn is not None and n:
+        statements = conn.statements - start_counts[0]
+        round_trips = conn.round_trips - start_counts[1]
+        result["statements_per_profile"] = round(statements / n, 1)
+        result["round_trips_per_profile"] = round(round_trips / n, 1)
+    return result
+
+def peak_rss_mb():
+    if not resource:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        return None
+
+def reset_schema(conn):
+    with open(SCHEMA_SQL, encoding="utf-8") as f:
+        sql = f.read()
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+        cursor.execute("SET search_path = orcid_source, public")
+    conn.commit()
+
+def run_benchmark(profiles=100, size="medium", fetch_mode="sections", latency=0.0, reset=False, archive=None):
+    conn = psycopg2.connect(**{**_connection_params(), "cursor_factory": CountingCursor},
+                            connection_factory=CountingConnection)
+    if reset:
+        reset_schema(conn)
+    repo = OrcidRepository(conn=conn)
+    repo.ensure_schema()
+    repo.preload_dimensions()
+
+    ids = [orcid_id(i) for i in range(profiles)]
+    results = {}
+    if archive:
+        # Real profiles recorded with ingest_orcid.py --archive; no fetch phase
+        fetched = list(itertools.islice(ProfileArchive(archive).iter_latest(), profiles))
+    else:
+        with FakeOrcidServer(size=size, latency=latency) as server:
+            client = OrcidClient(fetch_mode=fetch_mode, scheduler=RequestScheduler(rate=100000, burst=100000))
+            client.BASE_URL = server.base_url
+
+            # 1. Fetch: HTTP + JSON decoding through the real client
+            fetched, latencies = [], []
+            started = time.perf_counter()
+            with quiet():
+                for orcid in ids:
+                    t = time.perf_counter()
+                    fetched.append(client.get_full_profile(orcid))
+                    latencies.append(time.perf_counter() - t)
+            results["fetch"] = summarize(latencies, time.perf_counter() - started)
+            results["fetch"]["http_requests_per_profile"] = round(server.requests / profiles, 1)
+            client.close()
+
+    # 2. First save (into empty tables with --reset-schema), 3. re-save of unchanged
+    #    profiles, 4. incremental run that skips them
+    for phase, incremental in (("save_cold", False), ("save_unchanged", False), ("save_incremental", True)):
+        counts = (conn.statements, conn.round_trips)
+        latencies = []
+        started = time.perf_counter()
+        with quiet():
+            for profile in fetched:
+                t = time.perf_counter()
+                repo.save_full_profile(profile, incremental)
+                latencies.append(time.perf_counter() - t)
+        results[phase] = summarize(latencies, time.perf_counter() - started, conn, counts)
+
+    conn.close()
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "params": {"profiles": len(fetched), "size": size, "works_per_profile": SIZES[size],
+                   "fetch_mode": fetch_mode, "latency_ms": latency * 1000, "reset_schema": reset,
+                   "archive": archive},
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+def print_report(report, baseline=None):
+    print(f"--- Benchmark ({report['params']}, commit {report['git_commit']}) ---")
+    for phase, r in report["results"].items():
+        line = (f"   {phase:<17} {r['profiles_per_second']:>9.1f} profiles/s   "
+                f"p50 {r['latency_ms']['p50']:>8.2f} ms  p99 {r['latency_ms']['p99']:>8.2f} ms")
+        if "statements_per_profile" in r:
+            line += f"   {r['statements_per_profile']:>6.1f} stmts  {r['round_trips_per_profile']:>6.1f} round trips"
+        if baseline and phase in baseline["results"]:
+            before = baseline["results"][phase]["profiles_per_second"]
+            if before:
+                line += f"   ({(r['profiles_per_second'] / before - 1) * 100:+.1f}% vs baseline)"
+        print(line)
+    print(f"   Peak RSS: {report['peak_rss_mb']} MB")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark ORCID ingestion against a fake API and a throwaway database.")
+    parser.add_argument("--profiles", type=int, default=100)
+    parser.add_argument("--size", choices=list(SIZES), default="medium")
+    parser.add_argument("--fetch-mode", choices=("sections", "record"), default="sections")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated API latency per response")
+    parser.add_argument("--reset-schema", action="store_true",
+                        help="DROP and recreate the orcid_source schema from benchmarks/schema.sql first")
+    parser.add_argument("--archive", help="Save the first --profiles profiles of this ProfileArchive "
+                                          "instead of synthetic ones (skips the fetch phase)")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_benchmark(args.profiles, args.size, args.fetch_mode, args.latency_ms / 1000, args.reset_schema,
+                           args.archive)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"   Results written to {output}")
@@ -0,0 +1,31 @@
+-- Minimal copy of the ORCID source schema used by the ingester, for benchmarks only.
+-- DROPS AND RECREATES the orcid_source schema: run it against a throwaway database.
+DROP SCHEMA IF EXISTS orcid_source CASCADE;
+CREATE SCHEMA orcid_source;
+SET search_path = orcid_source;
+CREATE TABLE country (id bigserial PRIMARY KEY, iso2_code varchar(2) UNIQUE);
+CREATE TABLE work_type (id bigserial PRIMARY KEY, work_type text UNIQUE);
+CREATE TABLE external_id_relationship (id bigserial PRIMARY KEY, relationship bigint UNIQUE);
+CREATE TABLE org (id bigint PRIMARY KEY, name text, city text, region text, country_id bigint REFERENCES country(id), date_created timestamp);
+CREATE TABLE profile (orcid varchar(19) PRIMARY KEY, last_modified timestamp);
+CREATE TABLE record_name (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, given_names text, family_name text, credit_name text, last_modified timestamp);
+CREATE TABLE biography (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, biography text, last_modified timestamp);
+CREATE TABLE email (email_id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, email text, last_modified timestamp);
+CREATE TABLE other_name (other_name_id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, display_name text, last_modified timestamp);
+CREATE TABLE researcher_url (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, url text, url_name text, last_modified timestamp);
+CREATE TABLE profile_keyword (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, keywords_name text, last_modified timestamp);
+CREATE TABLE address (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, country_id bigint REFERENCES country(id), last_modified timestamp);
+CREATE TABLE profile_external_identifier (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, external_id_reference text, external_id_url text, last_modified timestamp);
+CREATE TABLE org_affiliation_relation (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, org_id bigint REFERENCES org(id), start_year int, end_year int, org_affiliation_relation_title text, department text, last_modified timestamp);
+CREATE TABLE org_affilaition_relation_external_identifier (id bigserial PRIMARY KEY, org_affilaition_relation_id bigint REFERENCES org_affiliation_relation(id));
+CREATE TABLE profile_funding (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, title text, type text, start_year int, numeric_amount numeric, currency_code text, org_id bigint REFERENCES org(id), last_modified timestamp);
+CREATE TABLE profile_funding_contributor (id bigserial PRIMARY KEY, profile_funding_id bigint REFERENCES profile_funding(id));
+CREATE TABLE profile_funding_external_identifier (id bigserial PRIMARY KEY, profile_funding_id bigint REFERENCES profile_funding(id));
+CREATE TABLE peer_review (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, org_id bigint REFERENCES org(id), subject_name varchar(1000), last_modified timestamp);
+CREATE TABLE peer_review_external_identifier (id bigserial PRIMARY KEY, peer_review_id bigint REFERENCES peer_review(id));
+CREATE TABLE research_resource (id bigint PRIMARY KEY, orcid varchar(19) REFERENCES profile, title text, last_modified timestamp);
+CREATE TABLE research_resource_item (id bigserial PRIMARY KEY, research_resource_id bigint REFERENCES research_resource(id));
+CREATE TABLE research_resource_external_identifier (id bigserial PRIMARY KEY, research_resource_id bigint REFERENCES research_resource(id));
+CREATE TABLE work (work_id bigint PRIMARY KEY, title text, journal_title text, orcid varchar(19) REFERENCES profile, work_type_id bigint REFERENCES work_type(id), last_modified timestamp);
+CREATE TABLE work_external_identifier (work_id bigint REFERENCES work(work_id), type text, value text, url text, relationship_id bigint REFERENCES external_id_relationship(id));
+CREATE TABLE work_contributor (work_id bigint REFERENCES work(work_id), contributor_orcid varchar(19), credit_name text, contributor_role text, contributor_sequence text);
@@ -0,0 +1,137 @@
+import random
+
+# Deterministic synthetic ORCID responses in the shapes the public API v3.0 returns
+# (and OrcidClient.get_full_profile passes on). The same (orcid, size, seed) always
+# produces the same profile, so runs are comparable.
+
+# Profile size -> number of works; other sections scale along
+SIZES = {"small": 5, "medium": 50, "large": 500, "huge": 3000}
+
+COUNTRIES = ["PL", "DE", "GB", "US", "FR", "NL", "IT", "ES", "CZ", "SE"]
+WORK_TYPES = ["journal-article", "conference-paper", "book-chapter", "preprint", "dataset", "other"]
+ID_TYPES = ["doi", "eid", "wosuid", "pmid", "isbn"]
+WORDS = ("data model learning network graph entity resolution semantic knowledge fusion "
+         "distributed query stream index quality consensus agent ontology metric").split()
+
+def orcid_id(i):
+    """The i-th synthetic ORCID iD, e.g. 0000-0009-0000-0042."""
+    return f"0000-0009-{i // 10000 % 10000:04d}-{i % 10000:04d}"
+
+def _stamp(r):
+    return {"value": 1600000000000 + r.randrange(100000000000)}
+
+def _date(year, month=None):
+    return {"year": {"value": str(year)}, "month": {"value": f"{month:02d}"} if month else None, "day": None}
+
+def _org(r):
+    i = r.randrange(200)
+    disambiguated = None
+    if i % 3:
+        disambiguated = {"disambiguated-organization-identifier": f"https://ror.org/bench{i:04d}",
+                         "disambiguation-source": "ROR"}
+    return {"name": f"University of Benchmark {i}",
+            "address": {"city": f"City {i % 40}", "region": None, "country": COUNTRIES[i % len(COUNTRIES)]},
+            "disambiguated-organization": disambiguated}
+
+def _title(r, n=6):
+    return " ".join(r.choice(WORDS) for _ in range(n)).capitalize()
+
+def _external_ids(r, n):
+    ids = []
+    for _ in range(n):
+        kind = r.choice(ID_TYPES)
+        value = f"10.{r.randrange(1000, 9999)}/{r.randrange(10**8)}" if kind == "doi" else str(r.randrange(10**10))
+        ids.append({"external-id-type": kind, "external-id-value": value,
+                    "external-id-normalized": {"value": value.lower(), "transient": True},
+                    "external-id-url": {"value": f"https://doi.org/{value}"} if kind == "doi" else None,
+                    "external-id-relationship": r.choice(["self", "self", "self", "version-of", "part-of"])})
+    return {"external-id": ids}
+
+def _work_summary(r, orcid, put_code):
+    return {"put-code": put_code, "created-date": _stamp(r), "last-modified-date": _stamp(r),
+            "source": {"source-orcid": {"path": orcid}},
+            "title": {"title": {"value": _title(r)}, "subtitle": None, "translated-title": None},
+            "external-ids": _external_ids(r, r.randint(0, 3)),
+            "url": None, "type": r.choice(WORK_TYPES),
+            "publication-date": _date(r.randint(1990, 2024), r.randint(1, 12)),
+            "journal-title": {"value": f"Journal of {r.choice(WORDS).capitalize()}"} if r.random() < 0.8 else None,
+            "visibility": "public", "path": f"/{orcid}/work/{put_code}", "display-index": "0"}
+
+def _affiliation_group(r, kind, put_code):
+    start = r.randint(1990, 2020)
+    return {"last-modified-date": _stamp(r), "external-ids": {"external-id": []}, "summaries": [{f"{kind}-summary": {
+        "put-code": put_code, "created-date": _stamp(r), "last-modified-date": _stamp(r),
+        "department-name": r.choice(["Computer Science", "Mathematics", None]),
+        "role-title": r.choice(["Professor", "PhD Student", "Researcher", None]),
+        "start-date": _date(start, r.randint(1, 12)),
+        "end-date": _date(start + r.randint(1, 5)) if r.random() < 0.6 else None,
+        "organization": _org(r), "url": None, "visibility": "public"}}]}
+
+def make_profile(orcid, size="medium", seed=0, works=None):
+    """One profile dict as returned by OrcidClient.get_full_profile (fetch_mode="sections")."""
+    n_works = SIZES[size] if works is None else works
+    r = random.Random(f"{orcid}/{n_works}/{seed}")
+    scale = max(1, n_works // 50)
+    put_code = iter(range(100000, 10**9))
+
+    person = {
+        "last-modified-date": _stamp(r),
+        "name": {"given-names": {"value": r.choice(["Anna", "Jan", "Maria", "Piotr", "Eva"])},
+                 "family-name": {"value": f"Bench{r.randrange(10**6)}"},
+                 "credit-name": {"value": "A. Bench"} if r.random() < 0.3 else None},
+        "other-names": {"other-name": [{"put-code": next(put_code), "content": f"Alias {i}"} for i in range(r.randint(0, 2))]},
+        "biography": {"content": " ".join(r.choice(WORDS) for _ in range(40))} if r.random() < 0.7 else None,
+        "researcher-urls": {"researcher-url": [{"put-code": next(put_code), "url-name": "Homepage",
+                                                "url": {"value": f"https://example.org/{orcid}/{i}"}} for i in range(r.randint(0, 2))]},
+        "emails": {"email": [{"email": f"{orcid}@example.org"}] if r.random() < 0.3 else []},
+        "addresses": {"address": [{"put-code": next(put_code), "country": {"value": r.choice(COUNTRIES)}}]},
+        "keywords": {"keyword": [{"put-code": next(put_code), "content": r.choice(WORDS)} for _ in range(r.randint(0, 5))]},
+        "external-identifiers": {"external-identifier": [{
+            "put-code": next(put_code), "external-id-type": "Scopus Author ID",
+            "external-id-value": str(r.randrange(10**10)),
+            "external-id-url": {"value": "https://www.scopus.com/"}}] if r.random() < 0.5 else []},
+    }
+    works_section = {"last-modified-date": _stamp(r), "group": [
+        {"last-modified-date": _stamp(r), "external-ids": {"external-id": []},
+         "work-summary": [_work_summary(r, orcid, next(put_code)) for _ in range(r.choice([1, 1, 1, 2]))]}
+        for _ in range(n_works)]}
+    fundings = {"last-modified-date": _stamp(r), "group": [
+        {"last-modified-date": _stamp(r), "external-ids": {"external-id": []}, "funding-summary": [{
+            "put-code": next(put_code), "last-modified-date": _stamp(r), "title": {"title": {"value": _title(r, 4)}},
+            "type": r.choice(["grant", "contract", "award"]), "start-date": _date(r.randint(2000, 2023)),
+            "end-date": None, "amount": {"value": str(r.randrange(1000, 10**6)), "currency-code": "EUR"}
+            if r.random() < 0.5 else None, "organization": _org(r)}]} for _ in range(r.randint(0, 2 * scale))]}
+    peer_reviews = {"last-modified-date": _stamp(r), "group": [
+        {"last-modified-date": _stamp(r), "external-ids": {"external-id": []}, "peer-review-group": [
+            {"last-modified-date": _stamp(r), "external-ids": {"external-id": []}, "peer-review-summary": [{
+                "put-code": next(put_code), "last-modified-date": _stamp(r),
+                "review-group-id": f"issn:{r.randrange(1000, 9999)}-{r.randrange(1000, 9999)}",
+                "convening-organization": _org(r)}]}]} for _ in range(r.randint(0, 3 * scale))]}
+    resources = {"last-modified-date": _stamp(r), "group": [
+        {"last-modified-date": _stamp(r), "external-ids": {"external-id": []}, "research-resource-summary": [{
+            "put-code": next(put_code), "last-modified-date": _stamp(r),
+            "proposal": {"title": {"title": {"value": _title(r, 3)}}}}]} for _ in range(r.randint(0, 1))]}
+
+    return {
+        "orcid": orcid,
+        "person": person,
+        "works": works_section,
+        "fundings": fundings,
+        "employments": {"last-modified-date": _stamp(r), "affiliation-group": [
+            _affiliation_group(r, "employment", next(put_code)) for _ in range(r.randint(1, 2 + scale))]},
+        "educations": {"last-modified-date": _stamp(r), "affiliation-group": [
+            _affiliation_group(r, "education", next(put_code)) for _ in range(r.randint(0, 3))]},
+        "peer_reviews": peer_reviews,
+        "research_resources": resources,
+    }
+
+def work_detail(r, orcid, summary):
+    """Full /work document (with contributors) for one work summary, as in bulk /works responses."""
+    contributors = []
+    for seq in range(r.randint(1, 6)):
+        contributors.append({
+            "contributor-orcid": {"path": orcid_id(r.randrange(10**6))} if r.random() < 0.4 else None,
+            "credit-name": {"value": f"Author {r.randrange(10**5)}"},
+            "contributor-attributes": {"contributor-sequence": "first" if seq == 0 else "additional",
+                                       "contributor-role": "author"}})
+    return {**summary, "contributors": {"contributor": contributors}}
@@ -0,0 +1,107 @@
+import gzip
+import html.entities
+import re
+import time
+import xml.etree.ElementTree as ET
+
+from models import StandardPaper
+
+# Streaming reader for the DBLP XML dump (https://dblp.org/xml/dblp.xml.gz). The file
+# is several GB uncompressed, so it is parsed with iterparse and every record element
+# is cleared as soon as it has been converted.
+
+RECORD_TAGS = {"article", "inproceedings", "proceedings", "book", "incollection",
+               "phdthesis", "mastersthesis"}
+DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/")
+
+_ENTITY_DECL = re.compile(r'<!ENTITY\s+(\w+)\s+"&#(x?)([0-9A-Fa-f]+);"\s*>')
+
+def load_entities(dtd_path=None):
+    """
+    Character entities used by dblp.xml (&auml;, &eacute;, ...). They are declared in
+    dblp.dtd, which expat does not load, so the parser has to be given them. Without
+    dtd_path the HTML entity table is used; it covers the entities DBLP declares.
+    """
+    entities = {name: chr(cp) for name, cp in html.entities.name2codepoint.items()}
+    if dtd_path:
+        with open(dtd_path, encoding="latin-1") as f:
+            for name, is_hex, code in _ENTITY_DECL.findall(f.read()):
+                entities[name] = chr(int(code, 16 if is_hex else 10))
+    return entities
+
+def _open(path):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+def _fold(text):
+    return " ".join(text.split()).casefold() if text else ""
+
+class DblpDumpReader:
+    """
+    Iterates StandardPaper records of a DBLP dump in constant memory.
+    authors / venues (optional) keep only records with at least one matching
+    author name or whose journal / booktitle matches, compared case-insensitively.
+    """
+
+    def __init__(self, path, dtd_path=None, authors=None, venues=None, types=RECORD_TAGS):
+        self.path = path
+        self.entities = load_entities(dtd_path)
+        self.authors = {_fold(a) for a in authors or ()}
+        self.venues = {_fold(v) for v in venues or ()}
+        self.types = set(types)
+        self.stats = {"records": 0, "matched": 0, "parse_seconds": 0.0}
+
+    def __iter__(self):
+        parser = ET.XMLParser()
+        parser.entity.update(self.entities)
+        with _open(self.path) as f:
+            events = ET.iterparse(f, events=("start", "end"), parser=parser)
+            root = None
+            started = time.perf_counter()
+            for event, elem in events:
+                if root is None:
+                    root = elem
+                    continue
+                if event != "end" or elem.tag not in RECORD_TAGS:
+                    continue
+                paper = self._convert(elem) if elem.tag in self.types else None
+                # Drop the finished record (and its reference from root) to keep memory flat
+                elem.clear()
+                root.clear()
+                self.stats["records"] += 1
+                if paper is None:
+                    continue
+                self.stats["matched"] += 1
+                self.stats["parse_seconds"] += time.perf_counter() - started
+                yield paper
+                started = time.perf_counter()
+            self.stats["parse_seconds"] += time.perf_counter() - started
+
+    def _convert(self, elem):
+        authors = [" ".join(a.itertext()).strip() for a in elem.iter("author")]
+        venue = elem.findtext("journal") or elem.findtext("booktitle")
+        if self.authors and not any(_fold(a) in self.authors for a in authors):
+            return None
+        if self.venues and _fold(venue) not in self.venues:
+            return None
+
+        doi = None
+        for ee in elem.iter("ee"):
+            url = (ee.text or "").strip()
+            for prefix in DOI_PREFIXES:
+                if url.startswith(prefix):
+                    doi = url[len(prefix):].lower()
+                    break
+            if doi:
+                break
+        title_elem = elem.find("title")
+        title = "".join(title_elem.itertext()).strip() if title_elem is not None else None
+        year = elem.findtext("year")
+        return StandardPaper(
+            source_id=elem.get("key"),
+            source_name="dblp",
+            title=title,
+            authors=authors,
+            year=int(year) if year and year.isdigit() else None,
+            venue=venue,
+            doi=doi,
+        )
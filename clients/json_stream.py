@@ -0,0 +1,94 @@
+import codecs
+import json
+
+# Incremental reading of one large array inside a JSON object, e.g. the "group" list
+# of an ORCID /works response, from a stream of text or byte chunks. Only the current
+# element (and the unread rest of the last chunk) is held in memory.
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+class _Reader:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self):
+        if self.eof:
+            raise ValueError("JSON stream ended unexpectedly")
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            chunk = self.utf8.decode(b"", final=True)
+        elif isinstance(chunk, bytes):
+            chunk = self.utf8.decode(chunk)
+        # Drop what has been consumed so the buffer does not grow with the document
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """The next non-whitespace character (not consumed)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self._more()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at {self.buf[self.pos:self.pos + 40]!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value, reading more chunks as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._more()
+                continue
+            # A number or literal at the very end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof:
+                self._more()
+                continue
+            self.pos = end
+            return value
+
+def iter_array(chunks, key, fields=None):
+    """
+    Yields the elements of the array under the top-level key of the JSON object in
+    chunks, one at a time. The object's other top-level members are stored in the
+    fields dict (if given) as they are read, so those before the array are available
+    while it is being iterated and all of them once it is exhausted.
+    """
+    fields = {} if fields is None else fields
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.peek() == "]":
+                        reader.pos += 1
+                        break
+                    reader.expect(",")
+        else:
+            fields[name] = reader.value()
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
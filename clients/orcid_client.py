@@ -1,45 +1,384 @@
+import datetime
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import format_datetime
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from clients.json_stream import iter_array
+from clients.request_scheduler import PermanentRequestError, RequestScheduler, TransientRequestError
+from metrics import metrics
+
+class _SectionItems:
+    """
+    Iterator over the list of a streamed section. The response, and the host slot it
+    holds, are released when the list is exhausted or close() is called, even if
+    iteration never started.
+    """
+
+    def __init__(self, items, release):
+        self._items = items
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        self._items.close()
+        self._release()
 
 class OrcidClient:
     BASE_URL = "https://pub.orcid.org/v3.0"
     HEADERS = {"Accept": "application/json", "User-Agent": "StudentThesisProject/1.0"}
 
+    # Profile dict key -> ORCID endpoint. Order matches the dict returned by get_full_profile.
+    SECTIONS = {
+        "person": "person",
+        "works": "works",
+        "fundings": "fundings",
+        "employments": "employments",
+        "educations": "educations",
+        "peer_reviews": "peer-reviews",
+        "research_resources": "research-resources",
+    }
+    # Sections the repository stores together: if one changed, the others are needed in full too
+    LINKED_SECTIONS = (("employments", "educations"),)
+    # The (possibly huge) list in each section document, read element by element by stream_section
+    SECTION_ARRAYS = {
+        "works": "group",
+        "fundings": "group",
+        "employments": "affiliation-group",
+        "educations": "affiliation-group",
+        "peer_reviews": "group",
+        "research_resources": "group",
+    }
+    # Bytes read from the socket at a time when streaming a section
+    STREAM_CHUNK_BYTES = 64 * 1024
+    # Max put-codes per bulk /works/{put-code,...} request (ORCID's limit)
+    WORKS_BULK_SIZE = 100
+    # Search paging limits of the public API: rows per page, and how deep 'start' may go
+    SEARCH_MAX_ROWS = 1000
+    SEARCH_MAX_RESULTS = 10000
+
+    def __init__(self, max_connections=7, concurrent=True, cache=None, scheduler=None, fetch_mode="sections",
+                 archive=None):
+        """
+        max_connections caps the number of requests in flight against pub.orcid.org,
+        shared by every thread using this client.
+        concurrent=False restores the old one-section-after-another behaviour.
+        cache: optional clients.response_cache.ResponseCache for GET responses.
+        scheduler: RequestScheduler (rate limit + retries); pass one in to share it between clients.
+        fetch_mode: "sections" downloads the seven section endpoints; "record" downloads the
+        single /record endpoint plus full work details (with contributors) in bulk.
+        archive: optional clients.profile_archive.ProfileArchive every fetched profile is appended to.
+        """
+        if fetch_mode not in ("sections", "record"):
+            raise ValueError(f"Unknown fetch_mode: {fetch_mode}")
+        self.fetch_mode = fetch_mode
+        self.cache = cache
+        self.archive = archive
+        self.scheduler = scheduler or RequestScheduler()
+        self.max_connections = max_connections
+        self.concurrent = concurrent
+        self._host_slots = threading.BoundedSemaphore(max_connections)
+
+        # One keep-alive session so sections reuse TCP/TLS connections
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def _get(self, url, params=None, headers=None, stream=False):
+        """With stream=True the response keeps its host slot; the caller releases _host_slots when done."""
+        return self.scheduler.request(self.session, "GET", url, slot=self._host_slots, hold_slot=stream,
+                                      params=params, headers=headers, stream=stream)
+
+    def _since_header(self, since):
+        return format_datetime(since.astimezone(datetime.timezone.utc), usegmt=True)
+
+    def _get_json(self, url, params=None, since=None, endpoint="other"):
+        """
+        GETs url and returns (status, parsed JSON or None), going through the response
+        cache when one is configured. since adds If-Modified-Since (incremental sync).
+        endpoint labels the request in the metrics.
+        """
+        entry = self.cache.get(url, params) if self.cache else None
+        if entry and entry["fresh"]:
+            self.cache.record_hit(url, params, entry)
+            return 200, json.loads(entry["body"])
+
+        headers = {}
+        if since:
+            headers["If-Modified-Since"] = self._since_header(since)
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        resp = self._get(url, params=params, headers=headers or None)
+        metrics.incr("orcid_http_responses_total", endpoint=endpoint, status=resp.status_code)
+        metrics.incr("orcid_http_response_bytes_total", len(resp.content), endpoint=endpoint)
+        if resp.status_code == 304 and entry:
+            self.cache.record_hit(url, params, entry, revalidated=True)
+            self.cache.refresh(url, params, entry)
+            return 200, json.loads(entry["body"])
+        if self.cache:
+            self.cache.record_miss()
+        if resp.status_code != 200:
+            return resp.status_code, None
+
+        if self.cache:
+            self.cache.put(url, params, resp.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return 200, resp.json()
+
     def get_orcid_id(self, query: str):
-        """Searches for a person and returns their ORCID ID."""
+        """
+        Searches for a person and returns their ORCID ID.
+        Raises TransientRequestError if the API stayed unavailable, so callers can retry later.
+        """
         print(f"--> Searching for profile: '{query}'...")
         params = {"q": query, "rows": 1}
         try:
-            resp = requests.get(f"{self.BASE_URL}/search", params=params, headers=self.HEADERS)
-            if resp.status_code == 200:
-                results = resp.json().get('result', [])
+            with metrics.span("orcid_search", endpoint="search"):
+                status, body = self._get_json(f"{self.BASE_URL}/search", params=params, endpoint="search")
+            if status == 200:
+                results = body.get('result') or []
+                if (body.get('num-found') or 0) > 1:
+                    print(f"⚠️ '{query}' matches {body['num-found']} profiles, taking the first one "
+                          f"(use search() to get all of them)")
                 if results:
                     return results[0].get('orcid-identifier', {}).get('path')
+            else:
+                print(f"❌ API Error (Search): HTTP {status}")
+        except TransientRequestError:
+            raise
         except Exception as e:
             print(f"❌ API Error (Search): {e}")
         return None
 
-    def get_full_profile(self, orcid_id: str):
+    def search(self, query: str, rows=200, expanded=False, max_results=None):
+        """
+        Yields the ORCID iD of every profile matching a Solr query, e.g.
+        'affiliation-org-name:"Wroclaw University of Science and Technology"'.
+
+        Pages through /search (or /expanded-search) with start/rows. The next page is
+        requested in the background while the caller consumes the current one, and only
+        one page is held at a time, so the generator can feed IngestionPipeline.run directly.
+        The public API does not page past SEARCH_MAX_RESULTS; split wider queries.
+        """
+        endpoint = "expanded-search" if expanded else "search"
+        result_key = "expanded-result" if expanded else "result"
+        rows = min(rows, self.SEARCH_MAX_ROWS)
+        limit = self.SEARCH_MAX_RESULTS if max_results is None else min(max_results, self.SEARCH_MAX_RESULTS)
+
+        def fetch_page(start):
+            params = {"q": query, "start": start, "rows": min(rows, limit - start)}
+            with metrics.span("orcid_search", endpoint=endpoint):
+                status, body = self._get_json(f"{self.BASE_URL}/{endpoint}", params=params, endpoint=endpoint)
+            if status != 200:
+                raise PermanentRequestError(f"Search '{query}' failed at start={start}: HTTP {status}")
+            return body
+
+        if limit <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            page = prefetch.submit(fetch_page, 0)
+            start = 0
+            while page is not None:
+                body = page.result()
+                results = body.get(result_key) or []
+                total = min(body.get('num-found') or 0, limit)
+                if start == 0:
+                    print(f"--> Search '{query}': {body.get('num-found') or 0} matches")
+                start += len(results)
+                page = prefetch.submit(fetch_page, start) if results and start < total else None
+                try:
+                    for result in results:
+                        orcid_id = (result.get('orcid-id') if expanded
+                                    else (result.get('orcid-identifier') or {}).get('path'))
+                        if orcid_id:
+                            yield orcid_id
+                except GeneratorExit:
+                    # The caller stopped early: do not wait for a page nobody will read
+                    if page is not None:
+                        page.cancel()
+                    raise
+
+    def get_full_profile(self, orcid_id: str, since=None):
         """
         Fetches data from endpoints required by the database schema.
+        Sections are downloaded in parallel over the pooled session unless the client
+        was created with concurrent=False.
+
+        since: optional {section: datetime} of the last ingest (incremental sync). Those
+        sections are requested with If-Modified-Since and come back as None when the
+        server answers 304 Not Modified.
+
+        In "record" mode the result additionally has "work_details": {str(put-code): full work}.
         """
         print(f"--> Fetching full profile for {orcid_id}...")
-        return {
-            "orcid": orcid_id,
-            "person": self._fetch_endpoint(orcid_id, "person"),
-            "works": self._fetch_endpoint(orcid_id, "works"),
-            "fundings": self._fetch_endpoint(orcid_id, "fundings"),
-            "employments": self._fetch_endpoint(orcid_id, "employments"),
-            "educations": self._fetch_endpoint(orcid_id, "educations"),
-            "peer_reviews": self._fetch_endpoint(orcid_id, "peer-reviews"),
-            "research_resources": self._fetch_endpoint(orcid_id, "research-resources")
-        }
-
-    def _fetch_endpoint(self, orcid_id, endpoint):
-        try:
-            url = f"{self.BASE_URL}/{orcid_id}/{endpoint}"
-            resp = requests.get(url, headers=self.HEADERS)
-            if resp.status_code == 200:
-                return resp.json()
-        except Exception as e:
-            print(f"⚠️ API Warning: Could not fetch {endpoint}: {e}")
-        return {}
\ No newline at end of file
+        since = since or {}
+        if self.fetch_mode == "record":
+            profile = self._fetch_record(orcid_id, since)
+        else:
+            sections = self._fetch_sections(orcid_id, list(self.SECTIONS), since)
+
+            for linked in self.LINKED_SECTIONS:
+                if any(sections[key] is not None for key in linked):
+                    missing = [key for key in linked if sections[key] is None]
+                    sections.update(self._fetch_sections(orcid_id, missing, {}))
+
+            profile = {"orcid": orcid_id, **sections}
+
+        if self.archive is not None:
+            self.archive.append(profile)
+        return profile
+
+    def _map(self, fn, items):
+        """Applies fn to every item, on a thread pool unless the client is serial."""
+        items = list(items)
+        if self.concurrent and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(items), self.max_connections)) as pool:
+                return list(pool.map(fn, items))
+        return [fn(item) for item in items]
+
+    def _fetch_sections(self, orcid_id, keys, since):
+        results = self._map(lambda key: self._fetch_endpoint(orcid_id, self.SECTIONS[key], since.get(key)), keys)
+        return dict(zip(keys, results))
+
+    def _fetch_record(self, orcid_id, since):
+        """
+        One /record request replaces the seven section requests; it embeds the same
+        section documents under 'person' and 'activities-summary'.
+        """
+        record = self._fetch_endpoint(orcid_id, "record")
+        activities = record.get('activities-summary') or {}
+        sections = {"person": record.get('person') or {}}
+        for key, endpoint in self.SECTIONS.items():
+            if key != "person":
+                sections[key] = activities.get(endpoint) or {}
+
+        # Without per-section conditional requests, drop sections whose timestamp did not move
+        for key in list(sections):
+            stamp = self._last_modified(sections[key])
+            if stamp is not None and since.get(key) == stamp:
+                sections[key] = None
+        for linked in self.LINKED_SECTIONS:
+            if any(sections[key] is not None for key in linked):
+                for key in linked:
+                    if sections[key] is None:
+                        sections[key] = activities.get(self.SECTIONS[key]) or {}
+
+        work_details = {}
+        if sections["works"] is not None:
+            work_details = self.get_work_details(orcid_id, self._work_put_codes(sections["works"]))
+        return {"orcid": orcid_id, **sections, "work_details": work_details}
+
+    def _last_modified(self, section_data):
+        millis = ((section_data or {}).get('last-modified-date') or {}).get('value')
+        if not millis:
+            return None
+        return datetime.datetime.fromtimestamp(int(millis) / 1000, tz=datetime.timezone.utc)
+
+    def _work_put_codes(self, works):
+        return [s['put-code'] for group in works.get('group', [])
+                for s in group.get('work-summary', []) if s.get('put-code') is not None]
+
+    def get_work_details(self, orcid_id, put_codes):
+        """
+        Returns {str(put-code): full work} using the bulk /works/{put-code,...} endpoint,
+        WORKS_BULK_SIZE put-codes per request. Put-codes the API reports as errors are left out.
+        """
+        chunks = [put_codes[i:i + self.WORKS_BULK_SIZE] for i in range(0, len(put_codes), self.WORKS_BULK_SIZE)]
+        details = {}
+        for bulk in self._map(lambda chunk: self._fetch_endpoint(orcid_id, "works/" + ",".join(map(str, chunk))), chunks):
+            for item in bulk.get('bulk', []):
+                work = item.get('work')
+                if work and work.get('put-code') is not None:
+                    details[str(work['put-code'])] = work
+        return details
+
+    def stream_section(self, orcid_id, key, since=None):
+        """
+        Opens one profile section for incremental reading, for records too large to hold
+        in memory (see OrcidRepository.save_profile_stream). Returns None for 304 Not
+        Modified, else (fields, items): items yields the elements of the section's list
+        (SECTION_ARRAYS) as they arrive, and fields holds the document's other members
+        (e.g. 'last-modified-date'), complete once items is exhausted. The person section
+        has no list and is returned whole with empty items.
+        The response cache is not used. The section's connection counts against
+        max_connections until items is exhausted or closed, so always close it.
+        """
+        endpoint = self.SECTIONS[key]
+        url = f"{self.BASE_URL}/{orcid_id}/{endpoint}"
+        headers = {"If-Modified-Since": self._since_header(since)} if since else None
+        with metrics.span("orcid_fetch_section", section=endpoint):
+            resp = self._get(url, headers=headers, stream=True)
+        metrics.incr("orcid_http_responses_total", endpoint=endpoint, status=resp.status_code)
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                resp.close()
+                self._host_slots.release()
+
+        if resp.status_code != 200:
+            release()
+            if resp.status_code == 304:
+                return None
+            raise PermanentRequestError(f"Could not fetch {endpoint} for {orcid_id}: HTTP {resp.status_code}")
+
+        if key not in self.SECTION_ARRAYS:
+            try:
+                metrics.incr("orcid_http_response_bytes_total", len(resp.content), endpoint=endpoint)
+                return resp.json(), iter(())
+            finally:
+                release()
+
+        def chunks():
+            for chunk in resp.iter_content(self.STREAM_CHUNK_BYTES):
+                metrics.incr("orcid_http_response_bytes_total", len(chunk), endpoint=endpoint)
+                yield chunk
+
+        def items():
+            try:
+                yield from iter_array(chunks(), self.SECTION_ARRAYS[key], fields)
+            except requests.RequestException as e:
+                # The connection broke mid-body: retryable like any other network error
+                raise TransientRequestError(f"Reading {endpoint} of {orcid_id} failed: {e}") from e
+
+        fields = {}
+        return fields, _SectionItems(items(), release)
+
+    def _fetch_endpoint(self, orcid_id, endpoint, since=None):
+        """
+        Returns the section JSON, or None for 304 Not Modified.
+        Failures raise instead of returning {}: saving an empty section would wipe the
+        rows we already have for it.
+        """
+        url = f"{self.BASE_URL}/{orcid_id}/{endpoint}"
+        # Bulk work requests carry their put-codes in the path; keep the label set small
+        section = endpoint if "/" not in endpoint else endpoint.split("/")[0] + "-bulk"
+        with metrics.span("orcid_fetch_section", section=section):
+            status, body = self._get_json(url, since=since, endpoint=section)
+        if status == 304:
+            return None
+        if status == 200:
+            return body
+        raise PermanentRequestError(f"Could not fetch {endpoint} for {orcid_id}: HTTP {status}")
@@ -0,0 +1,236 @@
+import datetime
+import json
+import tarfile
+import xml.etree.ElementTree as ET
+
+from clients.orcid_client import OrcidClient
+
+# Readers for the ORCID public data file (the yearly summaries tarball). Records are
+# converted into the same dict shape OrcidClient.get_full_profile returns, so
+# OrcidRepository.save_full_profile can store them unchanged.
+
+def iter_archive_members(path, skip=0, retry=()):
+    """
+    Streams (index, member name, raw bytes or None) for every member of a tar(.gz)
+    archive without unpacking it to disk. Directories and other non-files yield None.
+    The first `skip` members are passed over without reading their content (resume),
+    except the indexes in retry.
+    """
+    with tarfile.open(path, mode="r|*") as tar:
+        for index, member in enumerate(tar):
+            if (index < skip and index not in retry) or not member.isfile():
+                yield index, member.name, None
+                continue
+            f = tar.extractfile(member)
+            yield index, member.name, f.read() if f else None
+
+def parse_record(name, data):
+    """Converts one archive member into a profile dict, or None if it is not a record."""
+    if name.endswith(".xml"):
+        return record_xml_to_profile(data)
+    if name.endswith(".json"):
+        return record_json_to_profile(json.loads(data))
+    return None
+
+def record_json_to_profile(record):
+    """Splits a /record JSON document into the per-section profile dict."""
+    orcid = (record.get('orcid-identifier') or {}).get('path')
+    if not orcid:
+        return None
+    activities = record.get('activities-summary') or {}
+    profile = {"orcid": orcid, "person": record.get('person') or {}}
+    for key, endpoint in OrcidClient.SECTIONS.items():
+        if key != "person":
+            profile[key] = activities.get(endpoint) or {}
+    return profile
+
+# ---------------------------------------------------------------- XML records
+
+def _strip_namespaces(root):
+    for el in root.iter():
+        if "}" in el.tag:
+            el.tag = el.tag.split("}", 1)[1]
+        if el.attrib:
+            el.attrib = {k.split("}", 1)[-1]: v for k, v in el.attrib.items()}
+    return root
+
+def _text(el, path):
+    if el is None:
+        return None
+    found = el.find(path)
+    if found is None or found.text is None:
+        return None
+    return found.text.strip()
+
+def _value(el, path):
+    text = _text(el, path)
+    return {"value": text} if text is not None else None
+
+def _put_code(el):
+    code = el.get("put-code")
+    return int(code) if code else None
+
+def _millis(el, path="last-modified-date"):
+    text = _text(el, path)
+    if not text:
+        return None
+    ts = datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+    return {"value": int(ts.timestamp() * 1000)}
+
+def _date(el):
+    if el is None:
+        return None
+    return {part: _value(el, part) for part in ("year", "month", "day")}
+
+def _org(el):
+    if el is None:
+        return None
+    disambiguated = el.find("disambiguated-organization")
+    return {
+        "name": _text(el, "name"),
+        "address": {
+            "city": _text(el, "address/city"),
+            "region": _text(el, "address/region"),
+            "country": _text(el, "address/country"),
+        },
+        "disambiguated-organization": None if disambiguated is None else {
+            "disambiguated-organization-identifier": _text(disambiguated, "disambiguated-organization-identifier"),
+            "disambiguation-source": _text(disambiguated, "disambiguation-source"),
+        },
+    }
+
+def _external_ids(el):
+    return {"external-id": [{
+        "external-id-type": _text(ext, "external-id-type"),
+        "external-id-value": _text(ext, "external-id-value"),
+        "external-id-url": _value(ext, "external-id-url"),
+        "external-id-relationship": _text(ext, "external-id-relationship"),
+    } for ext in el.findall("external-ids/external-id")]}
+
+def _person(el):
+    if el is None:
+        return {}
+    name = el.find("name")
+    return {
+        "last-modified-date": _millis(el),
+        "name": None if name is None else {
+            "given-names": _value(name, "given-names"),
+            "family-name": _value(name, "family-name"),
+            "credit-name": _value(name, "credit-name"),
+        },
+        "biography": {"content": _text(el, "biography/content")} if el.find("biography") is not None else None,
+        "emails": {"email": [{"email": _text(e, "email")} for e in el.findall("emails/email")]},
+        "other-names": {"other-name": [{"put-code": _put_code(e), "content": _text(e, "content")}
+                                       for e in el.findall("other-names/other-name")]},
+        "researcher-urls": {"researcher-url": [{"put-code": _put_code(e), "url-name": _text(e, "url-name"),
+                                                "url": _value(e, "url")}
+                                               for e in el.findall("researcher-urls/researcher-url")]},
+        "keywords": {"keyword": [{"put-code": _put_code(e), "content": _text(e, "content")}
+                                 for e in el.findall("keywords/keyword")]},
+        "addresses": {"address": [{"put-code": _put_code(e), "country": _value(e, "country")}
+                                  for e in el.findall("addresses/address")]},
+        "external-identifiers": {"external-identifier": [{
+            "put-code": _put_code(e),
+            "external-id-type": _text(e, "external-id-type"),
+            "external-id-value": _text(e, "external-id-value"),
+            "external-id-url": _value(e, "external-id-url"),
+        } for e in el.findall("external-identifiers/external-identifier")]},
+    }
+
+def _affiliations(el, kind):
+    if el is None:
+        return {}
+    return {
+        "last-modified-date": _millis(el),
+        "affiliation-group": [{"summaries": [{f"{kind}-summary": {
+            "put-code": _put_code(s),
+            "last-modified-date": _millis(s),
+            "department-name": _text(s, "department-name"),
+            "role-title": _text(s, "role-title"),
+            "start-date": _date(s.find("start-date")),
+            "end-date": _date(s.find("end-date")),
+            "organization": _org(s.find("organization")),
+        }} for s in group.findall(f"{kind}-summary")]} for group in el.findall("affiliation-group")],
+    }
+
+def _fundings(el):
+    if el is None:
+        return {}
+    groups = []
+    for group in el.findall("group"):
+        summaries = []
+        for s in group.findall("funding-summary"):
+            amount = s.find("amount")
+            summaries.append({
+                "put-code": _put_code(s),
+                "last-modified-date": _millis(s),
+                "title": {"title": _value(s, "title/title")},
+                "type": _text(s, "type"),
+                "start-date": _date(s.find("start-date")),
+                "end-date": _date(s.find("end-date")),
+                "amount": None if amount is None else {"value": (amount.text or "").strip(),
+                                                       "currency-code": amount.get("currency-code")},
+                "organization": _org(s.find("organization")),
+            })
+        groups.append({"funding-summary": summaries})
+    return {"last-modified-date": _millis(el), "group": groups}
+
+def _peer_reviews(el):
+    if el is None:
+        return {}
+    return {
+        "last-modified-date": _millis(el),
+        "group": [{"peer-review-group": [{"peer-review-summary": [{
+            "put-code": _put_code(s),
+            "last-modified-date": _millis(s),
+            "review-group-id": _text(s, "review-group-id"),
+            "convening-organization": _org(s.find("convening-organization")),
+        } for s in pr_group.findall("peer-review-summary")]} for pr_group in group.findall("peer-review-group")]}
+            for group in el.findall("group")],
+    }
+
+def _research_resources(el):
+    if el is None:
+        return {}
+    return {
+        "last-modified-date": _millis(el),
+        "group": [{"research-resource-summary": [{
+            "put-code": _put_code(s),
+            "last-modified-date": _millis(s),
+            "proposal": {"title": {"title": _value(s, "proposal/title/title")}},
+        } for s in group.findall("research-resource-summary")]} for group in el.findall("group")],
+    }
+
+def _works(el):
+    if el is None:
+        return {}
+    return {
+        "last-modified-date": _millis(el),
+        "group": [{"work-summary": [{
+            "put-code": _put_code(s),
+            "last-modified-date": _millis(s),
+            "title": {"title": _value(s, "title/title")},
+            "type": _text(s, "type"),
+            "journal-title": _value(s, "journal-title"),
+            "external-ids": _external_ids(s),
+        } for s in group.findall("work-summary")]} for group in el.findall("group")],
+    }
+
+def record_xml_to_profile(data):
+    """Converts a <record:record> summary XML document into a profile dict."""
+    root = _strip_namespaces(ET.fromstring(data))
+    orcid = _text(root, "orcid-identifier/path")
+    if not orcid:
+        return None
+    activities = root.find("activities-summary")
+    find = (lambda tag: activities.find(tag)) if activities is not None else (lambda tag: None)
+    return {
+        "orcid": orcid,
+        "person": _person(root.find("person")),
+        "works": _works(find("works")),
+        "fundings": _fundings(find("fundings")),
+        "employments": _affiliations(find("employments"), "employment"),
+        "educations": _affiliations(find("educations"), "education"),
+        "peer_reviews": _peer_reviews(find("peer-reviews")),
+        "research_resources": _research_resources(find("research-resources")),
+    }
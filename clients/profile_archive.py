@@ -0,0 +1,167 @@
+import gzip
+import json
+import os
+import threading
+import zlib
+from collections import Counter
+
+class ProfileArchive:
+    """
+    Append-only archive of raw profiles as returned by OrcidClient.get_full_profile,
+    for re-ingesting without the network (e.g. after a mapping fix in OrcidRepository).
+
+    Profiles are stored as JSON lines in independently gzip-compressed chunks of
+    chunk_size records, so the file is a regular multi-member .gz (zcat works). The
+    sidecar index <path>.idx has one JSON line per chunk with its byte offset, length
+    and ORCID iDs; it is written after the chunk, so a crash can only lose the chunk
+    being written. One writing process per archive; appends are thread-safe.
+    """
+
+    def __init__(self, path, chunk_size=500, level=6):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.chunk_size = chunk_size
+        self.level = level
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._orcids = []
+        self.chunks = self._load_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return sum(chunk["records"] for chunk in self.chunks) + len(self._buffer)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            if os.path.exists(self.path) and os.path.getsize(self.path):
+                return self.rebuild_index()
+            return []
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        chunks = []
+        with open(self.index_path, encoding="utf-8") as f:
+            lines = f.readlines()
+        for line in lines:
+            try:
+                chunk = json.loads(line)
+            except ValueError:
+                break  # Half-written last line
+            if chunk["offset"] + chunk["length"] > size:
+                break
+            chunks.append(chunk)
+        if len(chunks) < len(lines):
+            self._write_index(chunks)
+        return chunks
+
+    def _write_index(self, chunks):
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk) + "\n")
+
+    def rebuild_index(self):
+        """Recreates <path>.idx by decompressing the archive member by member."""
+        chunks = []
+        with open(self.path, "rb") as f:
+            offset = 0
+            while True:
+                f.seek(offset)
+                decompressor = zlib.decompressobj(wbits=31)
+                parts, consumed = [], 0
+                try:
+                    while not decompressor.eof:
+                        block = f.read(1024 * 1024)
+                        if not block:
+                            break
+                        parts.append(decompressor.decompress(block))
+                        consumed += len(block)
+                except zlib.error:
+                    break
+                if not decompressor.eof:
+                    break  # End of file, or a chunk cut short by a crash
+                length = consumed - len(decompressor.unused_data)
+                lines = b"".join(parts).splitlines()
+                chunks.append({"offset": offset, "length": length, "records": len(lines),
+                               "orcids": [json.loads(line)["orcid"] for line in lines]})
+                offset += length
+        self._write_index(chunks)
+        return chunks
+
+    # --- Writing ---
+
+    def append(self, profile):
+        line = json.dumps(profile, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._buffer.append(line)
+            self._orcids.append(profile["orcid"])
+            if len(self._buffer) >= self.chunk_size:
+                self._write_chunk()
+
+    def flush(self):
+        with self._lock:
+            self._write_chunk()
+
+    close = flush
+
+    def _write_chunk(self):
+        if not self._buffer:
+            return
+        data = gzip.compress(("\n".join(self._buffer) + "\n").encode("utf-8"), compresslevel=self.level, mtime=0)
+        end = self.chunks[-1]["offset"] + self.chunks[-1]["length"] if self.chunks else 0
+        with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+            # Anything past the last indexed chunk is a partial write from a crash
+            f.seek(end)
+            f.truncate()
+            f.write(data)
+        chunk = {"offset": end, "length": len(data), "records": len(self._buffer), "orcids": self._orcids}
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(chunk) + "\n")
+        self.chunks.append(chunk)
+        self._buffer, self._orcids = [], []
+
+    # --- Reading ---
+
+    def read_chunk(self, chunk):
+        with open(self.path, "rb") as f:
+            f.seek(chunk["offset"])
+            data = f.read(chunk["length"])
+        return [json.loads(line) for line in gzip.decompress(data).splitlines()]
+
+    def __iter__(self):
+        """Every archived profile in the order it was appended (flushed chunks only)."""
+        for chunk in list(self.chunks):
+            yield from self.read_chunk(chunk)
+
+    def get(self, orcid):
+        """The most recently archived profile of orcid, or None."""
+        for chunk in reversed(self.chunks):
+            if orcid in chunk["orcids"]:
+                return [p for p in self.read_chunk(chunk) if p["orcid"] == orcid][-1]
+        return None
+
+    def iter_latest(self):
+        """
+        Yields one profile per ORCID iD, in archive order of its last appearance.
+        Incremental runs archive unchanged sections as None, so each section is taken
+        from the newest record that has it. Only ORCIDs still expected later in the
+        archive (known from the index) are held in memory.
+        """
+        remaining = Counter(orcid for chunk in self.chunks for orcid in chunk["orcids"])
+        pending = {}
+        for profile in self:
+            orcid = profile["orcid"]
+            remaining[orcid] -= 1
+            if orcid in pending:
+                merged = pending.pop(orcid)
+                for key, value in profile.items():
+                    # work_details belong to the works section they were fetched with
+                    if value is not None and not (key == "work_details" and profile.get("works") is None):
+                        merged[key] = value
+                profile = merged
+            if remaining[orcid]:
+                pending[orcid] = profile
+            else:
+                yield profile
@@ -0,0 +1,148 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+class TransientRequestError(Exception):
+    """The request kept failing with retryable errors (429, 5xx, timeouts) until attempts ran out."""
+
+class PermanentRequestError(Exception):
+    """The server rejected the request in a way retrying will not fix (e.g. 400, 403, 404)."""
+
+class TokenBucket:
+    """Thread-safe token bucket: on average `rate` acquisitions per second, bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available. Returns the seconds spent waiting."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - started
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stops handing out tokens for `seconds`, e.g. after the server answered 429."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+class RequestScheduler:
+    """
+    Sends every HTTP request of a client through one global token bucket and retries
+    transient failures with jittered exponential backoff, honouring Retry-After.
+    Share one scheduler between all threads (and clients) that hit the same API.
+    """
+
+    TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(self, rate=None, burst=None, max_attempts=5, base_delay=0.5, max_delay=60.0, timeout=30):
+        # ORCID's public API allows 24 requests/second with bursts of 40
+        rate = rate or float(os.getenv("ORCID_RATE_LIMIT", 24))
+        burst = burst or int(os.getenv("ORCID_RATE_BURST", 40))
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "throttled": 0, "transient_errors": 0,
+                         "permanent_errors": 0, "gave_up": 0}
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def _incr(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _backoff(self, attempt):
+        # "Full jitter": spread retries of many workers instead of retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _retry_after(self, resp):
+        value = resp.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(self.max_delay, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            return min(self.max_delay, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return None
+
+    def request(self, session, method, url, slot=None, hold_slot=False, **kwargs):
+        """
+        Returns the first non-transient response (2xx, 3xx or a permanent 4xx).
+        Raises TransientRequestError once max_attempts are used up.
+        slot: optional semaphore capping connections in flight (e.g. per host). It is only
+        held while an attempt is on the wire, not during backoff. With hold_slot=True (for
+        stream=True) the returned response keeps it; the caller releases it once the body
+        is read or closed.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(1, self.max_attempts + 1):
+            waited = self.bucket.acquire()
+            with self._lock:
+                self.counters["requests"] += 1
+                self.queue_wait_total += waited
+                self.queue_wait_max = max(self.queue_wait_max, waited)
+
+            if slot is not None:
+                slot.acquire()
+            keep_slot = False
+            try:
+                resp = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+                delay = self._backoff(attempt)
+            else:
+                if resp.status_code not in self.TRANSIENT_STATUSES:
+                    if 400 <= resp.status_code < 500:
+                        self._incr("permanent_errors")
+                    keep_slot = hold_slot
+                    return resp
+                error = f"HTTP {resp.status_code}"
+                retry_after = self._retry_after(resp)
+                resp.close()  # Hand the connection back; streamed responses are not read by requests
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if resp.status_code == 429:
+                    self._incr("throttled")
+                    # Slow everybody down, not just this thread
+                    self.bucket.pause(delay)
+            finally:
+                # Released before sleeping, so a throttled request does not block other requests' slots
+                if slot is not None and not keep_slot:
+                    slot.release()
+
+            self._incr("transient_errors")
+            if attempt == self.max_attempts:
+                self._incr("gave_up")
+                raise TransientRequestError(f"{method} {url} failed after {attempt} attempts ({error})")
+            self._incr("retries")
+            time.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            requests_sent = stats["requests"]
+            stats["queue_wait_avg"] = self.queue_wait_total / requests_sent if requests_sent else 0.0
+            stats["queue_wait_max"] = self.queue_wait_max
+        return stats
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+class ResponseCache:
+    """
+    Persistent cache of API responses on local disk, one gzip file per URL.
+
+    Entries younger than ttl seconds are served without touching the network. Older
+    entries are revalidated with If-None-Match / If-Modified-Since when the server
+    sent an ETag or Last-Modified. The file mtime doubles as the LRU timestamp, and
+    the least recently used files are evicted once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, directory, ttl=24 * 3600, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0,
+                         "evictions": 0, "bytes_saved": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        # key -> [size on disk, last used]
+        self._entries = {}
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".json.gz"):
+                st = entry.stat()
+                self._entries[entry.name[:-len(".json.gz")]] = [st.st_size, st.st_mtime]
+        self._total_bytes = sum(size for size, _ in self._entries.values())
+
+    def _key(self, url, params=None):
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def get(self, url, params=None):
+        """
+        Returns the stored entry {"url", "body", "etag", "last_modified", "stored_at"}
+        plus "fresh" (younger than ttl), or None.
+        """
+        key = self._key(url, params)
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        entry["fresh"] = time.time() - entry["stored_at"] < self.ttl
+        return entry
+
+    def put(self, url, params, body, etag=None, last_modified=None):
+        key = self._key(url, params)
+        path = self._path(key)
+        entry = {"url": url, "params": params, "body": body, "etag": etag,
+                 "last_modified": last_modified, "stored_at": time.time()}
+        # Write to a temp file and rename, so readers never see a half-written entry
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            old = self._entries.get(key)
+            self._total_bytes += size - (old[0] if old else 0)
+            self._entries[key] = [size, time.time()]
+            self.counters["stores"] += 1
+        self._evict()
+
+    def refresh(self, url, params, entry):
+        """Marks a revalidated (304) entry as fresh again."""
+        self.put(url, params, entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+    def record_hit(self, url, params, entry, revalidated=False):
+        key = self._key(url, params)
+        now = time.time()
+        try:
+            os.utime(self._path(key), (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            if key in self._entries:
+                self._entries[key][1] = now
+            self.counters["revalidated" if revalidated else "hits"] += 1
+            self.counters["bytes_saved"] += len(entry["body"].encode("utf-8"))
+
+    def record_miss(self):
+        with self._lock:
+            self.counters["misses"] += 1
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            victims = []
+            # Evict down to 90% so we do not evict on every single store
+            target = self.max_bytes * 0.9
+            for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+                if self._total_bytes <= target:
+                    break
+                victims.append(key)
+                self._total_bytes -= size
+                del self._entries[key]
+            self.counters["evictions"] += len(victims)
+        for key in victims:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes_on_disk"] = self._total_bytes
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
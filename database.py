@@ -1,41 +1,170 @@
 import os
 import psycopg2
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from psycopg2 import pool
+from psycopg2.extensions import cursor as _cursor
 from dotenv import load_dotenv
+from metrics import metrics
 
 # Load variables from .env file
 load_dotenv()
 
+_pool = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+def _statement_kind(query):
+    """First SQL keyword of a statement (lower case), used as the metrics label."""
+    if isinstance(query, bytes):
+        query = query[:32].decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        return "other"  # psycopg2.sql.Composed
+    words = query.split(None, 1)
+    return words[0].lower() if words else "other"
+
+class InstrumentedCursor(_cursor):
+    """Counts and times every statement sent to the server (see metrics.py)."""
+
+    def _timed(self, kind, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            metrics.incr("sql_statements_total", kind=kind)
+            metrics.observe("sql_statement_seconds", time.perf_counter() - started, kind=kind)
+
+    def execute(self, query, vars=None):
+        return self._timed(_statement_kind(query), super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed(_statement_kind(query), super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed("copy", super().copy_expert, sql, file, size)
+
+def _connection_params():
+    # Added client_encoding='UTF8' to fix special character issues
+    return dict(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        client_encoding="UTF8",
+        options="-c search_path=orcid_source,public",
+        cursor_factory=InstrumentedCursor
+    )
+
 def get_connection():
     try:
-        # Added client_encoding='UTF8' to fix special character issues
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),
-            dbname=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            client_encoding="UTF8",
-            options="-c search_path=orcid_source,public"
-        )
+        conn = psycopg2.connect(**_connection_params())
         return conn
     except psycopg2.OperationalError as e:
         print(f"❌ Database Connection Failed: {e}")
         sys.exit(1)
 
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    Sized by DB_POOL_MIN / DB_POOL_MAX (default 1 / 10).
+    """
+    global _pool, _pool_slots
+    with _pool_lock:
+        if _pool is None:
+            min_conn = int(os.getenv("DB_POOL_MIN", 1))
+            max_conn = int(os.getenv("DB_POOL_MAX", 10))
+            try:
+                _pool = pool.ThreadedConnectionPool(min_conn, max_conn, **_connection_params())
+            except psycopg2.OperationalError as e:
+                print(f"❌ Database Connection Failed: {e}")
+                sys.exit(1)
+            # psycopg2 raises PoolError when the pool is empty; this makes callers wait instead
+            _pool_slots = threading.BoundedSemaphore(max_conn)
+        return _pool
+
+@contextmanager
+def pooled_connection():
+    """Borrows a connection from the pool and returns it when the block exits."""
+    db_pool = get_pool()
+    _pool_slots.acquire()
+    try:
+        conn = db_pool.getconn()
+        try:
+            yield conn
+        finally:
+            # Never hand a connection with an open transaction to the next user
+            broken = conn.closed
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            db_pool.putconn(conn, close=bool(broken))
+    finally:
+        _pool_slots.release()
+
+@contextmanager
+def db_cursor():
+    """Borrows a pooled connection and yields (conn, cursor)."""
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            yield conn, cursor
+        finally:
+            cursor.close()
+
+# Errors the database raises for one bad row (value too long for its column, out of range,
+# violated constraint); anything else (deadlock, lost connection) still aborts the transaction
+ROW_REJECTED = (psycopg2.DataError, psycopg2.IntegrityError)
+
+def execute_rows(cursor, rows, write, label):
+    """
+    Calls write(cursor, rows) under a savepoint; write may return a list of fetched rows.
+    If the database rejects the batch, it is retried row by row and the rows it rejects
+    are skipped (labelled label in logs and metrics), so one bad row does not abort the
+    transaction. Returns (rows written, fetched results).
+    """
+    cursor.execute("SAVEPOINT batch_sp")
+    try:
+        results = write(cursor, rows) or []
+    except ROW_REJECTED as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT batch_sp")
+        print(f"⚠️ Batch of {len(rows)} {label} rows rejected ({e.pgcode}), retrying row by row")
+        written, results = [], []
+        for row in rows:
+            cursor.execute("SAVEPOINT row_sp")
+            try:
+                results.extend(write(cursor, [row]) or [])
+            except ROW_REJECTED as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT row_sp")
+                metrics.incr("sql_rows_rejected_total", table=label)
+                print(f"⚠️ Skipping {label} row (Error: {str(e).strip()})")
+                continue
+            cursor.execute("RELEASE SAVEPOINT row_sp")
+            written.append(row)
+        rows = written
+    cursor.execute("RELEASE SAVEPOINT batch_sp")
+    return rows, results
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
 def init_db():
     print("--> Attempting to connect to PostgreSQL...")
-    conn = get_connection()
-    
-    # Verify we can see the tables now
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT count(*) FROM profile;")
-        print("✅ Successfully connected and found table 'profile' in schema 'orcid_source'.")
-    except Exception as e:
-        print(f"❌ Connection worked, but table still not found: {e}")
-        
-    conn.close()
+    with db_cursor() as (conn, cur):
+        # Verify we can see the tables now
+        try:
+            cur.execute("SELECT count(*) FROM profile;")
+            print("✅ Successfully connected and found table 'profile' in schema 'orcid_source'.")
+        except Exception as e:
+            print(f"❌ Connection worked, but table still not found: {e}")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db()
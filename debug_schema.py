@@ -1,4 +1,16 @@
-from database import get_connection
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import re
+
+import psycopg2
+from psycopg2.extensions import connection as _connection
+
+from benchmarks.synthetic import SIZES, make_profile, orcid_id
+from database import InstrumentedCursor, _connection_params, _statement_kind, get_connection
+from repositories.orcid_repo import OrcidRepository
 
 def check_database_structure():
     conn = get_connection()
@@ -30,5 +42,308 @@ def check_database_structure():
 
     conn.close()
 
+# --- Index advisor ---------------------------------------------------------------
+#
+# Replays the statements OrcidRepository issues for synthetic profiles inside one
+# transaction that is rolled back at the end, so the database is left untouched.
+# The first statement of every query shape is run under EXPLAIN (ANALYZE, BUFFERS)
+# (in a savepoint) right before the real statement, i.e. against the same data.
+
+EXPLAINED_KINDS = ("select", "insert", "update", "delete", "with")
+
+# Foreign keys whose referencing columns are not the leading columns of any index
+MISSING_FK_INDEXES_SQL = """
+    SELECT c.conrelid::regclass::text, c.conname, array_agg(a.attname::text ORDER BY k.ord)
+    FROM pg_constraint c
+    CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+    WHERE c.contype = 'f' AND c.connamespace = current_schema()::regnamespace
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_index i
+          WHERE i.indrelid = c.conrelid
+            AND (string_to_array(i.indkey::text, ' ')::int2[])[1:cardinality(c.conkey)] @> c.conkey)
+    GROUP BY c.conrelid, c.conname
+    ORDER BY 1, 2
+"""
+
+# table -> [(index name, [key columns])]
+INDEXES_SQL = """
+    SELECT t.relname, ix.relname, array_agg(a.attname::text ORDER BY k.ord)
+    FROM pg_index i
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_class ix ON ix.oid = i.indexrelid
+    CROSS JOIN LATERAL unnest(string_to_array(i.indkey::text, ' ')::int2[]) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+    WHERE t.relnamespace = current_schema()::regnamespace
+    GROUP BY t.relname, ix.relname
+"""
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+def _first_statement(sql):
+    """execute_batch sends 'stmt; stmt; ...' in one call; EXPLAIN takes one statement."""
+    quoted = False
+    for i, ch in enumerate(sql):
+        if ch == "'":
+            quoted = not quoted
+        elif ch == ";" and not quoted:
+            return sql[:i]
+    return sql
+
+def query_shape(sql):
+    """The statement with literals, VALUES rows and array contents replaced by placeholders."""
+    shape = _LITERAL.sub("?", sql)
+    shape = re.sub(r"\bVALUES\s*\(.*?\)(?=\s*(?:ON CONFLICT|RETURNING|\)|$))", "VALUES (...)", shape,
+                   flags=re.S | re.I)
+    shape = re.sub(r"(?<![\w.])-?\d+(?:\.\d+)?\b", "?", shape)
+    shape = re.sub(r"ARRAY\[[^\]]*\]", "ARRAY[...]", shape)
+    shape = re.sub(r"\(\?(?:\s*,\s*\?)+\)", "(?, ...)", shape)
+    return " ".join(shape.split())
+
+def _filter_columns(condition):
+    """Columns compared with '=' (or = ANY) in a plan's Filter / Index Cond."""
+    condition = _LITERAL.sub("?", condition)
+    columns = re.findall(r"\(*(\w+)\)*(?:::[\w ]+(?:\[\])?)?\s*=", condition)
+    return [c for c in dict.fromkeys(columns) if not c.isdigit()]
+
+def _walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+def _quiet():
+    """Silences the per-profile progress output of the repository."""
+    return contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8"))
+
+class QueryPlan:
+    def __init__(self, shape, sql, plan):
+        self.shape = shape
+        self.sql = sql
+        self.plan = plan  # EXPLAIN (FORMAT JSON) output, or None if EXPLAIN failed
+        self.calls = 1
+        self.error = None
+
+    @property
+    def execution_ms(self):
+        return self.plan["Execution Time"] if self.plan else 0.0
+
+    def seq_scans(self):
+        """[(table, filter, rows read)] for sequential scans that filter rows."""
+        if not self.plan:
+            return []
+        return [(node["Relation Name"], node["Filter"],
+                 (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * node.get("Actual Loops", 1))
+                for node in _walk(self.plan["Plan"]) if node["Node Type"] == "Seq Scan" and "Filter" in node]
+
+    def triggers(self):
+        """[(trigger, table, ms, calls)]; foreign key checks show up as RI_ConstraintTrigger_*."""
+        if not self.plan:
+            return []
+        return [(t["Trigger Name"], t.get("Relation"), t["Time"], t["Calls"]) for t in self.plan.get("Triggers", [])]
+
+    def shared_buffers(self):
+        if not self.plan:
+            return 0
+        top = self.plan["Plan"]
+        return top.get("Shared Hit Blocks", 0) + top.get("Shared Read Blocks", 0)
+
+class ExplainingCursor(InstrumentedCursor):
+    def execute(self, query, vars=None):
+        advisor = getattr(self.connection, "advisor", None)
+        if advisor is not None:
+            advisor.explain(self, query, vars)
+        return super().execute(query, vars)
+
+class AdvisorConnection(_connection):
+    """Keeps everything in one transaction, rolled back by advise_indexes: commit() is a no-op."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.advisor = None
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        # The repository rolls back skipped profiles; undo only up to the advisor's start
+        with self.cursor() as cursor:
+            cursor.execute("ROLLBACK TO SAVEPOINT advisor_start")
+
+class IndexAdvisor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.plans = {}  # shape -> QueryPlan
+
+    def explain(self, cursor, query, vars):
+        sql = cursor.mogrify(query, vars).decode("utf-8")
+        sql = _first_statement(sql).strip()
+        if _statement_kind(sql) not in EXPLAINED_KINDS or "pg_advisory" in sql:
+            return
+        shape = query_shape(sql)
+        if shape in self.plans:
+            self.plans[shape].calls += 1
+            return
+
+        raw = psycopg2.extensions.cursor.execute
+        plan = QueryPlan(shape, sql, None)
+        raw(cursor, "SAVEPOINT advisor_explain")
+        try:
+            raw(cursor, "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)
+            plan.plan = cursor.fetchone()[0][0]
+        except psycopg2.Error as e:
+            plan.error = str(e).strip().splitlines()[0]
+        raw(cursor, "ROLLBACK TO SAVEPOINT advisor_explain")
+        self.plans[shape] = plan
+
+    def load_sample(self, profiles, size, seed):
+        """Saves synthetic profiles twice: a cold insert, then a re-save that updates and deletes rows."""
+        repo = OrcidRepository(conn=self.conn)
+        ids = [orcid_id(i) for i in range(profiles)]
+        with _quiet():
+            for orcid in ids:
+                repo.save_full_profile(make_profile(orcid, size, seed))
+        with self.conn.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            psycopg2.extensions.cursor.execute(cursor, "SAVEPOINT advisor_start")
+
+        # A different seed gives other works, orgs, keywords ... for the same put-codes and ORCID iDs
+        self.conn.advisor = self
+        with _quiet():
+            for orcid in ids:
+                repo.save_full_profile(make_profile(orcid, size, seed + 1, works=SIZES[size] * 9 // 10))
+        self.conn.advisor = None
+
+    def table_indexes(self):
+        indexes = {}
+        with self.conn.cursor() as cursor:
+            cursor.execute(INDEXES_SQL)
+            for table, index, columns in cursor.fetchall():
+                indexes.setdefault(table, []).append((index, columns))
+        return indexes
+
+    def trigger_constraints(self):
+        """{trigger name: constraint name} for the internal RI_ConstraintTrigger_* triggers."""
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT t.tgname, c.conname FROM pg_trigger t JOIN pg_constraint c ON c.oid = t.tgconstraint")
+            return dict(cursor.fetchall())
+
+    def missing_fk_indexes(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute(MISSING_FK_INDEXES_SQL)
+            return cursor.fetchall()
+
+    def suggestions(self):
+        """{(table, (columns...)): [reasons]} for every index the plans or foreign keys call for."""
+        indexes = self.table_indexes()
+        suggested = {}
+        for table, constraint, columns in self.missing_fk_indexes():
+            suggested.setdefault((table, tuple(columns)), []).append(f"foreign key {constraint}")
+        for plan in self.plans.values():
+            for table, condition, _ in plan.seq_scans():
+                columns = _filter_columns(condition)
+                if not columns:
+                    continue
+                leading = {cols[0] for _, cols in indexes.get(table, [])}
+                reason = f"seq scan on {_LITERAL.sub('?', condition)}"
+                reasons = suggested.setdefault((table, tuple(columns[:1])), [])
+                if columns[0] not in leading and reason not in reasons:
+                    reasons.append(reason)
+        return {key: reasons for key, reasons in suggested.items() if reasons}
+
+    def print_report(self, limit=15):
+        plans = sorted(self.plans.values(), key=lambda p: p.execution_ms * p.calls, reverse=True)
+        explained = [p for p in plans if p.plan]
+        print(f"--- Explained {len(explained)} query shapes ({sum(p.calls for p in plans)} statements) ---")
+        for plan in explained[:limit]:
+            print(f"   {plan.execution_ms:8.3f} ms x {plan.calls:<5} {plan.shared_buffers():>6} buffers   {plan.shape[:110]}")
+        for plan in plans:
+            if plan.error:
+                print(f"⚠️ Could not explain {plan.shape[:80]}: {plan.error}")
+
+        indexes = self.table_indexes()
+        scans = sorted(((p, scan) for p in explained for scan in p.seq_scans()), key=lambda s: s[1][2], reverse=True)
+        if scans:
+            print(f"--- {len(scans)} sequential scan(s) with a filter ---")
+        for plan, (table, condition, rows) in scans:
+            columns = _filter_columns(condition)
+            covered = [name for name, cols in indexes.get(table, []) if columns and cols[0] == columns[0]]
+            if covered:
+                # The planner prefers a seq scan over the index while the table is this small
+                print(f"⚠️ {table}: read {rows} rows for {_LITERAL.sub('?', condition)} (index {covered[0]} exists)")
+            else:
+                print(f"❌ {table}: read {rows} rows for {_LITERAL.sub('?', condition)}")
+                print(f"     in: {plan.shape[:110]}")
+
+        triggers = sorted(((t, p) for p in explained for t in p.triggers()), key=lambda t: t[0][2], reverse=True)
+        if triggers:
+            print("--- Slowest triggers (foreign key checks of deletes and inserts) ---")
+            constraints = self.trigger_constraints()
+        for (name, table, ms, calls), plan in triggers[:limit // 3]:
+            print(f"   {ms:8.3f} ms x {calls:<5} {constraints.get(name, name)} on {table}   in: {plan.shape[:70]}")
+
+        missing = self.missing_fk_indexes()
+        if missing:
+            print(f"--- {len(missing)} foreign key(s) without an index (joins and parent deletes scan the table) ---")
+        for table, constraint, columns in missing:
+            print(f"❌ {table}({', '.join(columns)}) -> {constraint}")
+
+    def migration(self):
+        lines = [f"-- Index migration generated by debug_schema.py --advise on {datetime.date.today()}",
+                 "-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block: apply statement by statement."]
+        for (table, columns), reasons in sorted(self.suggestions().items()):
+            # PostgreSQL truncates identifiers to 63 bytes
+            name = f"{table}_{'_'.join(columns)}"[:59] + "_idx"
+            lines.extend(f"-- {reason}" for reason in reasons)
+            lines.append(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(columns)});")
+        return "\n".join(lines) + "\n"
+
+def advise_indexes(profiles=200, size="medium", seed=0, output=None, plans_path=None):
+    """
+    Runs the advisor against the configured database and prints its report and the
+    CREATE INDEX migration (also written to output if given). Nothing is committed.
+    """
+    conn = psycopg2.connect(**{**_connection_params(), "cursor_factory": ExplainingCursor},
+                            connection_factory=AdvisorConnection)
+    try:
+        advisor = IndexAdvisor(conn)
+        with conn.cursor() as cursor:
+            psycopg2.extensions.cursor.execute(cursor, "SAVEPOINT advisor_start")
+        repo = OrcidRepository(conn=conn)
+        repo.ensure_schema()
+        print(f"--> Loading {profiles} synthetic '{size}' profiles (rolled back at the end)...")
+        advisor.load_sample(profiles, size, seed)
+        advisor.print_report()
+        migration = advisor.migration()
+    finally:
+        _connection.rollback(conn)
+        conn.close()
+
+    print("--- Suggested migration ---")
+    print(migration, end="")
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(migration)
+        print(f"✅ Migration written to {output}")
+    if plans_path:
+        with open(plans_path, "w", encoding="utf-8") as f:
+            json.dump([{"shape": p.shape, "calls": p.calls, "sql": p.sql, "plan": p.plan, "error": p.error}
+                       for p in advisor.plans.values()], f, indent=2)
+    return migration
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Inspect the ORCID schema and suggest missing indexes.")
+    parser.add_argument("--advise", action="store_true",
+                        help="EXPLAIN ANALYZE the repository's queries and print a CREATE INDEX migration")
+    parser.add_argument("--profiles", type=int, default=200, help="Synthetic profiles in the sample dataset")
+    parser.add_argument("--size", choices=list(SIZES), default="medium")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the migration SQL to this file")
+    parser.add_argument("--plans", help="Write every query shape with its JSON plan to this file")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    check_database_structure()
\ No newline at end of file
+    args = parse_args()
+    if args.advise:
+        advise_indexes(args.profiles, args.size, args.seed, args.output, args.plans)
+    else:
+        check_database_structure()
@@ -0,0 +1,272 @@
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# Cross-source duplicate detection for StandardPaper records (ORCID, Crossref, DBLP).
+#
+# 1. Papers with the same normalised DOI are the same paper.
+# 2. Everything else is blocked with MinHash/LSH over the title tokens: only papers
+#    sharing at least one LSH band bucket (and with compatible years) are compared.
+# 3. Candidate pairs are scored on title, first-author surname and year; matches are
+#    merged with union-find, so clusters are transitive, except that two clusters
+#    carrying different DOIs are never merged.
+#
+# The index is incremental: add_batch() only compares the new papers against their
+# blocks and reports the papers whose cluster changed. lsh_keys() gives the blocks of
+# a paper as integers, so a caller can store them and later load only the papers
+# that share a block with a new batch.
+
+_DOI_PREFIX = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_STOPWORDS = frozenset("a an and as at by for from in into of on or the to with via".split())
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Band number of the lsh_keys() entry for the normalised DOI
+DOI_BAND = -1
+
+def normalize_doi(doi):
+    if not doi:
+        return None
+    doi = _DOI_PREFIX.sub("", doi.strip()).lower()
+    return doi or None
+
+def normalize_text(text):
+    """Lower-case ASCII words: accents stripped, punctuation and markup removed."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(_NON_WORD.split(text)).strip()
+
+def title_tokens(title):
+    return {t for t in normalize_text(title).split() if t not in _STOPWORDS}
+
+def first_author_surname(authors):
+    if not authors:
+        return ""
+    name = authors[0]
+    # DBLP appends a homonym number ("Jan Kowalski 0002"); "Last, First" comes from some sources
+    name = re.sub(r"\s+\d{4}$", "", name)
+    if "," in name:
+        return normalize_text(name.split(",", 1)[0])
+    words = normalize_text(name).split()
+    return words[-1] if words else ""
+
+def _bucket_id(value):
+    """Signed 64-bit hash of a band signature or DOI (fits a bigint column)."""
+    return int.from_bytes(hashlib.blake2b(repr(value).encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+class MinHasher:
+    """MinHash signatures of token sets, with num_perm universal hash permutations."""
+
+    def __init__(self, num_perm=64, seed=1):
+        self.num_perm = num_perm
+        rng = hashlib.sha256(str(seed).encode()).digest()
+        params = []
+        for i in range(num_perm):
+            digest = hashlib.sha256(rng + i.to_bytes(4, "big")).digest()
+            params.append((int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1,
+                           int.from_bytes(digest[8:16], "big") % _MERSENNE_PRIME))
+        self._params = params
+
+    @staticmethod
+    def _token_hash(token):
+        return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def signature(self, tokens):
+        hashes = [self._token_hash(t) for t in tokens]
+        if not hashes:
+            return None
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._params)
+
+class DedupIndex:
+    """
+    Incremental duplicate index. Papers are identified by a caller-chosen key
+    (e.g. papers.id); keys must be orderable, and a cluster's id is its smallest key,
+    so cluster ids are stable as long as that paper exists.
+
+    bands * rows must equal num_perm. With 16 bands of 4 rows, title token sets with a
+    Jaccard similarity around 0.5 have a 50% chance to become candidates and those
+    above 0.8 are almost always found.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.85, max_year_gap=1, max_bucket=1000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_year_gap = max_year_gap
+        # Generic titles ("Editorial", "Preface") collide in huge buckets; stop comparing within those
+        self.max_bucket = max_bucket
+
+        self._features = {}                 # key -> (doi, tokens, normalised title, surname, year)
+        self._by_doi = {}                   # doi -> key
+        self._buckets = defaultdict(list)   # (band, band signature) -> [key]
+        self._parent = {}
+        self._members = {}                  # cluster root -> [keys]
+        self._dois = {}                     # cluster root -> set of DOIs in the cluster
+        self.stats = {"papers": 0, "doi_matches": 0, "candidates": 0, "scored_matches": 0, "full_buckets": 0}
+
+    def __len__(self):
+        return len(self._features)
+
+    def __contains__(self, key):
+        return key in self._features
+
+    # ------------------------------------------------------------------ union-find
+
+    def _find(self, key):
+        root = key
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[key] != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def _union(self, a, b, changed):
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return
+        keep, gone = (ra, rb) if ra < rb else (rb, ra)
+        self._parent[gone] = keep
+        moved = self._members.pop(gone)
+        # Members of the cluster that lost its root get a new cluster id
+        changed.update(moved)
+        self._members[keep].extend(moved)
+        self._dois.setdefault(keep, set()).update(self._dois.pop(gone, ()))
+
+    def _conflicting(self, a, b):
+        """Two clusters that each carry DOIs, none in common, are different papers."""
+        dois_a, dois_b = self._dois.get(self._find(a)), self._dois.get(self._find(b))
+        return bool(dois_a and dois_b and dois_a.isdisjoint(dois_b))
+
+    def cluster_id(self, key):
+        return self._find(key)
+
+    def clusters(self):
+        """Returns {cluster id: [keys]} for every cluster with more than one paper."""
+        return {root: list(keys) for root, keys in self._members.items() if len(keys) > 1}
+
+    # ------------------------------------------------------------------ matching
+
+    def _featurize(self, paper):
+        tokens = title_tokens(paper.title)
+        return (normalize_doi(paper.doi), tokens, normalize_text(paper.title),
+                first_author_surname(paper.authors), paper.year)
+
+    def similarity(self, a, b):
+        """Score in [0, 1] for two featurized papers; 0 if they cannot be the same paper."""
+        doi_a, tokens_a, title_a, surname_a, year_a = a
+        doi_b, tokens_b, title_b, surname_b, year_b = b
+        if doi_a and doi_b and doi_a != doi_b:
+            return 0.0
+        if year_a and year_b and abs(year_a - year_b) > self.max_year_gap:
+            return 0.0
+        if not tokens_a or not tokens_b:
+            return 0.0
+        jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+        if jaccard < 0.5:
+            return 0.0
+        score = 0.5 * jaccard + 0.5 * SequenceMatcher(None, title_a, title_b).ratio()
+        if surname_a and surname_b:
+            score += 0.05 if surname_a == surname_b else -0.15
+        return max(0.0, min(1.0, score))
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def lsh_keys(self, paper):
+        """
+        Returns the (band, bucket) pairs of a paper: one per LSH band and (DOI_BAND,
+        bucket) for its DOI. Papers that can become candidates of each other share one.
+        """
+        doi, tokens = normalize_doi(paper.doi), title_tokens(paper.title)
+        keys = [(DOI_BAND, _bucket_id(doi))] if doi else []
+        signature = self.hasher.signature(tokens)
+        if signature is not None:
+            keys.extend((band, _bucket_id(band_signature)) for band, band_signature in self._band_keys(signature))
+        return keys
+
+    def add(self, key, paper, changed=None):
+        """Indexes one paper and merges it into the clusters it matches."""
+        changed = set() if changed is None else changed
+        if key in self._features:
+            raise ValueError(f"Paper {key!r} is already indexed")
+        features = self._featurize(paper)
+        self._features[key] = features
+        self._parent[key] = key
+        self._members[key] = [key]
+        self.stats["papers"] += 1
+        changed.add(key)
+
+        doi = features[0]
+        if doi:
+            self._dois[key] = {doi}
+            other = self._by_doi.get(doi)
+            if other is not None:
+                self.stats["doi_matches"] += 1
+                self._union(key, other, changed)
+            else:
+                self._by_doi[doi] = key
+
+        signature = self.hasher.signature(features[1])
+        if signature is None:
+            return changed
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets[band_key]
+            if len(bucket) >= self.max_bucket:
+                self.stats["full_buckets"] += 1
+                continue
+            candidates.update(bucket)
+            bucket.append(key)
+
+        root = self._find(key)
+        for other in candidates:
+            if self._find(other) == root:
+                continue
+            self.stats["candidates"] += 1
+            if (self.similarity(features, self._features[other]) >= self.threshold
+                    and not self._conflicting(key, other)):
+                self.stats["scored_matches"] += 1
+                self._union(key, other, changed)
+                root = self._find(key)
+        return changed
+
+    def add_batch(self, items):
+        """
+        Indexes (key, paper) pairs and returns {key: cluster id} for every paper whose
+        cluster id is new or changed, i.e. the rows a caller has to (re)write.
+        """
+        changed = set()
+        for key, paper in items:
+            self.add(key, paper, changed)
+        return {key: self._find(key) for key in changed}
+
+    def load(self, key, paper, cluster_id):
+        """
+        Re-indexes a paper clustered by an earlier run without scoring it again:
+        it joins cluster_id directly (cluster_id must be loaded, or be key itself).
+        """
+        features = self._featurize(paper)
+        self._features[key] = features
+        self._parent.setdefault(key, key)
+        self._members.setdefault(key, [key])
+        self.stats["papers"] += 1
+        if features[0]:
+            self._by_doi.setdefault(features[0], key)
+            self._dois.setdefault(self._find(key), set()).add(features[0])
+        signature = self.hasher.signature(features[1])
+        if signature is not None:
+            for band_key in self._band_keys(signature):
+                bucket = self._buckets[band_key]
+                if len(bucket) < self.max_bucket:
+                    bucket.append(key)
+        if cluster_id is not None and cluster_id != key:
+            self._parent.setdefault(cluster_id, cluster_id)
+            self._members.setdefault(cluster_id, [cluster_id])
+            self._union(key, cluster_id, set())
@@ -0,0 +1,70 @@
+import argparse
+import itertools
+import time
+
+from dedup import DedupIndex
+from repositories.paper_repo import PaperRepository
+
+def run_dedup(batch_size=10000, threshold=0.85, repo=None):
+    """
+    Assigns papers.cluster_id across sources. Papers clustered by earlier runs keep
+    their cluster; just the papers without a cluster are matched and written. The LSH
+    buckets and DOI of every clustered paper are stored in paper_lsh, so for each new
+    batch only the clusters sharing a bucket with it are read and indexed: a run is
+    proportional to the new papers and their candidates, not to the corpus.
+    """
+    repo = repo or PaperRepository()
+    repo.ensure_table()
+    index = DedupIndex(threshold=threshold)
+    started = time.monotonic()
+
+    if repo.needs_lsh_backfill():
+        # Clustered before paper_lsh existed: store the buckets of the whole corpus once
+        backfilled = 0
+        clustered = repo.iter_papers(clustered=True, batch_size=batch_size)
+        while True:
+            batch = list(itertools.islice(clustered, batch_size))
+            if not batch:
+                break
+            repo.save_clusters({}, _lsh_rows(index, [(key, paper) for key, paper, _ in batch]))
+            backfilled += len(batch)
+        print(f"--> Stored LSH buckets of {backfilled} clustered papers in {time.monotonic() - started:.1f}s")
+
+    updated = loaded = 0
+    new_papers = ((key, paper) for key, paper, _ in repo.iter_papers(clustered=False, batch_size=batch_size))
+    while True:
+        batch = list(itertools.islice(new_papers, batch_size))
+        if not batch:
+            break
+        lsh_rows = _lsh_rows(index, batch)
+        lsh_keys = list({(band, bucket) for band, bucket, _ in lsh_rows})
+        for key, paper, cluster_id in repo.iter_candidates(lsh_keys, index.max_bucket, batch_size):
+            if key not in index:
+                index.load(key, paper, cluster_id)
+                loaded += 1
+        updated += repo.save_clusters(index.add_batch(batch), lsh_rows)
+        print(f"--> Indexed {len(index)} papers ({loaded} clustered candidates loaded), "
+              f"{updated} cluster ids written")
+
+    duplicates = sum(len(keys) for keys in index.clusters().values())
+    s = index.stats
+    print("--- Deduplication Summary ---")
+    print(f"   Papers indexed: {len(index)}, in duplicate clusters: {duplicates} ({len(index.clusters())} clusters)")
+    print(f"   DOI matches: {s['doi_matches']}, candidate pairs scored: {s['candidates']}, "
+          f"title matches: {s['scored_matches']}")
+    print(f"   Time: {time.monotonic() - started:.1f}s")
+    return index
+
+def _lsh_rows(index, batch):
+    """(band, bucket, paper id) rows of (key, paper) pairs for paper_lsh."""
+    return [(band, bucket, key) for key, paper in batch for band, bucket in index.lsh_keys(paper)]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cluster duplicate papers across Crossref, DBLP and ORCID.")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--threshold", type=float, default=0.85, help="Minimum similarity of a title match")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_dedup(args.batch_size, args.threshold)
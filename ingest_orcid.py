@@ -1,17 +1,24 @@
+import argparse
+
 from database import init_db
 from clients.orcid_client import OrcidClient
+from clients.profile_archive import ProfileArchive
+from clients.response_cache import ResponseCache
+from metrics import metrics
 from repositories.orcid_repo import OrcidRepository
+from pipeline import IngestionPipeline, read_input_file
 
 def run_ingestion():
     # 1. Setup
     init_db()
     client = OrcidClient()
     repo = OrcidRepository()
+    repo.ensure_schema()
 
     # 2. Search
     target_name = "Krystian Wojtkiewicz"
     print(f"--- Starting Ingestion for: {target_name} ---")
-    
+
     orcid_id = client.get_orcid_id(target_name)
     if not orcid_id:
         print("❌ Person not found.")
@@ -28,5 +35,92 @@ def run_ingestion():
     repo.save_full_profile(profile_data)
     print("🎉 Ingestion Complete!")
 
+def run_batch_ingestion(input_path, fetch_workers=4, write_workers=2, queue_size=16, incremental=False,
+                        cache=None, fetch_mode="sections", archive=None, streaming=False, chunk_size=500):
+    """Ingests every name or ORCID iD listed in input_path (one per line)."""
+    init_db()
+    print(f"--- Starting Batch Ingestion from: {input_path} ---")
+    pipeline = IngestionPipeline(client=OrcidClient(cache=cache, fetch_mode=fetch_mode, archive=archive),
+                                 fetch_workers=fetch_workers, write_workers=write_workers,
+                                 queue_size=queue_size, incremental=incremental,
+                                 streaming=streaming, chunk_size=chunk_size)
+    pipeline.run(read_input_file(input_path))
+
+def run_search_ingestion(query, fetch_workers=4, write_workers=2, queue_size=16, incremental=False,
+                         cache=None, fetch_mode="sections", expanded=False, max_results=None, archive=None,
+                         streaming=False, chunk_size=500):
+    """Ingests every profile matching an ORCID search query, streaming the result pages."""
+    init_db()
+    print(f"--- Starting Search Ingestion for: {query} ---")
+    client = OrcidClient(cache=cache, fetch_mode=fetch_mode, archive=archive)
+    pipeline = IngestionPipeline(client=client, fetch_workers=fetch_workers, write_workers=write_workers,
+                                 queue_size=queue_size, incremental=incremental,
+                                 streaming=streaming, chunk_size=chunk_size)
+    pipeline.run(client.search(query, expanded=expanded, max_results=max_results))
+
+def run_replay(archive_path, write_workers=4, queue_size=16):
+    """Re-saves the newest archived version of every profile in a ProfileArchive, without any API calls."""
+    init_db()
+    with ProfileArchive(archive_path) as archive:
+        print(f"--- Replaying {len(archive)} archived profiles from: {archive_path} ---")
+        pipeline = IngestionPipeline(write_workers=write_workers, queue_size=queue_size)
+        pipeline.replay(archive.iter_latest())
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ingest ORCID profiles into PostgreSQL.")
+    parser.add_argument("--input", help="File with one researcher name or ORCID iD per line")
+    parser.add_argument("--search", help="Ingest every profile matching this ORCID search query, "
+                                             "e.g. 'affiliation-org-name:\"Some University\"'")
+    parser.add_argument("--expanded-search", action="store_true", help="Page through /expanded-search instead of /search")
+    parser.add_argument("--max-results", type=int, help="Stop after this many search results")
+    parser.add_argument("--replay", metavar="ARCHIVE",
+                        help="Re-save the profiles of an archive written with --archive instead of calling the API")
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--write-workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=16,
+                        help="Max fetched profiles waiting for a writer")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip profiles and sections unchanged since the last ingest")
+    parser.add_argument("--cache-dir", help="Keep ORCID responses in an on-disk cache in this directory")
+    parser.add_argument("--cache-ttl", type=int, default=24 * 3600,
+                        help="Seconds a cached response is used without revalidation")
+    parser.add_argument("--cache-max-mb", type=int, default=512)
+    parser.add_argument("--fetch-mode", choices=("sections", "record"), default="sections",
+                        help="'record': one /record request plus bulk work details (fills work_contributor)")
+    parser.add_argument("--archive", help="Append every fetched profile to this compressed archive (.jsonl.gz)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write each section while downloading it, in chunks (for very large records; "
+                             "no response cache or archive)")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                        help="List elements per write chunk with --stream")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port at /metrics")
+    parser.add_argument("--metrics-log-interval", type=float,
+                        help="Log a JSON line with all metrics to stderr every this many seconds")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    run_ingestion()
\ No newline at end of file
+    args = parse_args()
+    if args.metrics_port:
+        metrics.start_http_server(args.metrics_port)
+    if args.metrics_log_interval:
+        metrics.start_json_logger(args.metrics_log_interval)
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024)
+    archive = ProfileArchive(args.archive) if args.archive else None
+    try:
+        if args.replay:
+            run_replay(args.replay, args.write_workers, args.queue_size)
+        elif args.search:
+            run_search_ingestion(args.search, args.fetch_workers, args.write_workers, args.queue_size,
+                                 args.incremental, cache, args.fetch_mode, args.expanded_search, args.max_results,
+                                 archive, args.stream, args.chunk_size)
+        elif args.input:
+            run_batch_ingestion(args.input, args.fetch_workers, args.write_workers, args.queue_size,
+                                args.incremental, cache, args.fetch_mode, archive, args.stream, args.chunk_size)
+        else:
+            run_ingestion()
+    finally:
+        # Flushes the buffered records and the index, also after Ctrl+C or a failed run
+        if archive:
+            archive.close()
@@ -0,0 +1,165 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from database import init_db
+from clients.orcid_dump import iter_archive_members, parse_record
+from repositories.orcid_repo import OrcidRepository
+
+# Offline loader for the ORCID public data file: streams the tarball, parses and saves
+# records on a process pool and checkpoints progress so an interrupted run can resume.
+
+_worker_repo = None
+_worker_incremental = False
+
+def _init_worker(incremental):
+    global _worker_repo, _worker_incremental
+    _worker_repo = OrcidRepository()
+    _worker_repo.preload_dimensions()
+    _worker_incremental = incremental
+
+def _load_member(name, data):
+    """Runs in a worker process. Returns (status, name, detail)."""
+    try:
+        profile = parse_record(name, data)
+        if profile is None:
+            return "skipped", name, None
+        written = _worker_repo.save_full_profile(profile, _worker_incremental)
+        return ("saved" if written else "unchanged"), name, profile["orcid"]
+    except Exception as e:
+        return "failed", name, str(e)
+
+class Checkpoint:
+    """
+    Progress of one archive, stored as JSON. `completed` is the number of leading
+    archive members that are processed; members finish out of order, so the ones done
+    beyond that point are kept in `done_ahead` until the gap closes. Members that
+    failed (e.g. during a database outage) are kept in `failed` and retried on resume.
+    """
+
+    def __init__(self, path, archive):
+        self.path = path
+        self.state = {"archive": os.path.abspath(archive), "completed": 0, "done_ahead": [], "failed": {},
+                      "counts": {"saved": 0, "unchanged": 0, "skipped": 0, "failed": 0}}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("archive") == self.state["archive"]:
+                self.state.update(saved)
+        self._done_ahead = set(self.state["done_ahead"])
+        self.failed = {int(index): name for index, name in self.state["failed"].items()}
+
+    @property
+    def completed(self):
+        return self.state["completed"]
+
+    def is_done(self, index):
+        """True if the member needs no processing on this run."""
+        if index in self.failed:
+            return False
+        return index < self.state["completed"] or index in self._done_ahead
+
+    def mark_done(self, index, status, name=None):
+        counts = self.state["counts"]
+        if self.failed.pop(index, None) is not None:
+            counts["failed"] -= 1  # Retried: counted again below with its new status
+        if status:
+            counts[status] += 1
+        if status == "failed":
+            self.failed[index] = name
+        if index >= self.state["completed"]:
+            self._done_ahead.add(index)
+        while self.state["completed"] in self._done_ahead:
+            self._done_ahead.remove(self.state["completed"])
+            self.state["completed"] += 1
+
+    def save(self):
+        if not self.path:
+            return
+        # Counts include the members in done_ahead, so they are saved with them and not counted twice on resume
+        self.state["done_ahead"] = sorted(self._done_ahead)
+        self.state["failed"] = {str(index): name for index, name in sorted(self.failed.items())}
+        # Write and rename, so a crash never leaves a truncated checkpoint behind
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+def run_dump_ingestion(archive, workers=4, max_in_flight=64, checkpoint_path=None,
+                       checkpoint_every=1000, incremental=False):
+    init_db()
+    OrcidRepository().ensure_schema()
+    checkpoint = Checkpoint(checkpoint_path, archive)
+    start_index = checkpoint.completed
+    retry = set(checkpoint.failed)
+    print(f"--- Loading ORCID public data file: {archive} ---")
+    if start_index:
+        print(f"--> Resuming after {start_index} archive members (checkpoint {checkpoint_path})")
+    if retry:
+        print(f"--> Retrying {len(retry)} members that failed in an earlier run")
+
+    started = time.monotonic()
+    processed = 0
+    pending = {}
+    # 'spawn' so workers open their own database pool instead of inheriting sockets
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(incremental,)) as pool:
+
+        def collect(done):
+            nonlocal processed
+            for future in done:
+                index = pending.pop(future)
+                status, name, detail = future.result()
+                if status == "failed":
+                    print(f"❌ {name}: {detail}")
+                checkpoint.mark_done(index, status, name)
+                processed += 1
+                if processed % checkpoint_every == 0:
+                    checkpoint.save()
+                    rate = processed / (time.monotonic() - started)
+                    print(f"--> {checkpoint.completed} members done ({rate:.1f} records/s), {checkpoint.state['counts']}")
+
+        for index, name, data in iter_archive_members(archive, skip=start_index, retry=retry):
+            if checkpoint.is_done(index):
+                continue
+            if data is None:
+                checkpoint.mark_done(index, None)
+                continue
+            # Bounded memory: never hold more than max_in_flight raw records
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(_load_member, name, data)] = index
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    checkpoint.save()
+    elapsed = time.monotonic() - started
+    counts = checkpoint.state["counts"]
+    print("--- Dump Ingestion Summary ---")
+    print(f"   Records processed: {processed} in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.1f} records/s)")
+    print(f"   Saved: {counts['saved']}, Unchanged: {counts['unchanged']}, "
+          f"Not a record: {counts['skipped']}, Failed: {counts['failed']}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load an ORCID public data file (summaries tar.gz) into PostgreSQL.")
+    parser.add_argument("archive", help="Path to the ORCID summaries tarball")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--max-in-flight", type=int, default=64,
+                        help="Max records read from the archive but not yet saved")
+    parser.add_argument("--checkpoint", help="JSON file used to resume an interrupted run")
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip records and sections unchanged since the last ingest")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_dump_ingestion(args.archive, args.workers, args.max_in_flight, args.checkpoint,
+                       args.checkpoint_every, args.incremental)
@@ -0,0 +1,216 @@
+import argparse
+import itertools
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from database import init_db
+from clients.orcid_client import OrcidClient
+from clients.profile_archive import ProfileArchive
+from clients.request_scheduler import PermanentRequestError
+from clients.response_cache import ResponseCache
+from repositories.job_queue_repo import JobQueueRepository
+from repositories.orcid_repo import OrcidRepository
+from metrics import metrics
+from pipeline import ORCID_ID_PATTERN, read_input_file, stream_profile
+
+# Multi-node ingestion: 'enqueue' fills the ingest_job table once, then any number of
+# 'work' processes on any number of machines drain it against the same database.
+
+ENQUEUE_CHUNK = 1000
+
+def enqueue(items, client, requeue_finished=False):
+    """Queues an ORCID job for every item (ORCID iD or name). Names are resolved first."""
+    jobs = JobQueueRepository()
+    jobs.ensure_table()
+
+    def orcids():
+        for item in items:
+            if ORCID_ID_PATTERN.match(item):
+                yield item
+                continue
+            orcid_id = client.get_orcid_id(item)
+            if orcid_id:
+                yield orcid_id
+            else:
+                print(f"❌ Person not found: {item}")
+
+    added = 0
+    stream = orcids()
+    while True:
+        chunk = list(itertools.islice(stream, ENQUEUE_CHUNK))
+        if not chunk:
+            break
+        added += jobs.enqueue(chunk, requeue_finished=requeue_finished)
+    print(f"✅ Queued {added} new jobs. Queue: {jobs.counts()}")
+
+class JobWorker:
+    """
+    Claims batches of jobs, ingests them on a small thread pool and keeps their leases
+    alive from a heartbeat thread. A crashed worker simply stops heartbeating; its
+    jobs are picked up by other workers once the lease expires.
+    """
+
+    def __init__(self, client=None, worker_id=None, batch_size=10, threads=4, lease_seconds=300,
+                 incremental=False, poll_interval=5.0, streaming=False, chunk_size=500):
+        """streaming=True writes each profile while downloading it, chunk_size list elements at a time."""
+        self.client = client or OrcidClient()
+        if streaming and self.client.archive is not None:
+            raise ValueError("Streaming ingestion does not keep whole profiles, so it cannot archive them")
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.batch_size = batch_size
+        self.threads = threads
+        self.lease_seconds = lease_seconds
+        self.incremental = incremental
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.jobs = JobQueueRepository()
+        self.repo = OrcidRepository()
+        self.stop = threading.Event()
+        self.counts = {"done": 0, "unchanged": 0, "retry": 0, "failed": 0, "lease_lost": 0}
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def _incr(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _heartbeat(self):
+        while not self.stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                active = set(self._active)
+            try:
+                owned = self.jobs.heartbeat(self.worker_id, active, self.lease_seconds)
+            except Exception as e:
+                print(f"⚠️ Heartbeat failed: {e}")
+                continue
+            for job_id in active - owned:
+                print(f"⚠️ Lost the lease on job {job_id}; another worker took it over")
+
+    def _process(self, job):
+        job_id, orcid_id, attempt = job
+        try:
+            since = self.repo.load_sync_state(orcid_id) if self.incremental else None
+            if self.streaming:
+                written = stream_profile(self.client, self.repo, orcid_id, since, self.chunk_size)
+            else:
+                profile = self.client.get_full_profile(orcid_id, since)
+                written = self.repo.save_full_profile(profile, self.incremental)
+        except PermanentRequestError as e:
+            print(f"❌ Job {job_id} ({orcid_id}) failed permanently: {e}")
+            self._record("failed", self.jobs.fail, job_id, e, False)
+        except Exception as e:
+            print(f"⚠️ Job {job_id} ({orcid_id}) failed on attempt {attempt}: {e}")
+            self._record("retry", self.jobs.fail, job_id, e)
+        else:
+            self._record("done" if written else "unchanged", self.jobs.complete, job_id)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def _record(self, outcome, update, job_id, *args):
+        """
+        Stores a job's outcome with update (JobQueueRepository.complete or fail) and counts it.
+        If the lease was lost meanwhile, or the update itself failed (the lease then expires
+        and the job is claimed again), it is counted as lease_lost.
+        """
+        try:
+            owned = update(self.worker_id, job_id, *args)
+        except Exception as e:
+            print(f"⚠️ Could not record job {job_id} as {outcome}: {e}")
+            owned = False
+        self._incr(outcome if owned else "lease_lost")
+
+    def run(self, exit_when_empty=False):
+        self.jobs.ensure_table()
+        self.repo.ensure_schema()
+        self.repo.preload_dimensions()
+        print(f"--- Worker {self.worker_id} started ---")
+        heartbeat = threading.Thread(target=self._heartbeat, daemon=True)
+        heartbeat.start()
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            while not self.stop.is_set():
+                batch = self.jobs.claim(self.worker_id, self.batch_size, self.lease_seconds)
+                if not batch:
+                    counts = self.jobs.counts()
+                    if exit_when_empty and not counts.get("running") and not counts.get("pending"):
+                        break
+                    self.stop.wait(self.poll_interval)
+                    continue
+                with self._lock:
+                    self._active.update(job_id for job_id, _, _ in batch)
+                list(pool.map(self._process, batch))
+
+        self.stop.set()
+        heartbeat.join()
+        elapsed = time.monotonic() - started
+        print(f"--- Worker {self.worker_id} stopped after {elapsed:.1f}s: {self.counts} ---")
+        return self.counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distributed ORCID ingestion through the ingest_job table.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    queue_cmd = sub.add_parser("enqueue", help="Queue ORCID iDs for ingestion")
+    queue_cmd.add_argument("--input", help="File with one researcher name or ORCID iD per line")
+    queue_cmd.add_argument("--search", help="Queue every profile matching this ORCID search query")
+    queue_cmd.add_argument("--requeue-finished", action="store_true",
+                           help="Also requeue ORCIDs whose job is already done or failed")
+
+    work_cmd = sub.add_parser("work", help="Claim and ingest queued jobs until stopped")
+    work_cmd.add_argument("--batch-size", type=int, default=10, help="Jobs claimed per round trip")
+    work_cmd.add_argument("--threads", type=int, default=4, help="Jobs ingested in parallel")
+    work_cmd.add_argument("--lease-seconds", type=int, default=300)
+    work_cmd.add_argument("--exit-when-empty", action="store_true",
+                          help="Stop once no job is pending or running instead of polling")
+    work_cmd.add_argument("--incremental", action="store_true",
+                          help="Skip profiles and sections unchanged since the last ingest")
+    work_cmd.add_argument("--cache-dir", help="Keep ORCID responses in an on-disk cache in this directory")
+    work_cmd.add_argument("--fetch-mode", choices=("sections", "record"), default="sections")
+    work_cmd.add_argument("--archive", help="Append every fetched profile to this archive (one file per worker process)")
+    work_cmd.add_argument("--stream", action="store_true",
+                          help="Write each section while downloading it, in chunks (for very large records)")
+    work_cmd.add_argument("--chunk-size", type=int, default=500, help="List elements per write chunk with --stream")
+    work_cmd.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port at /metrics")
+    work_cmd.add_argument("--metrics-log-interval", type=float,
+                          help="Log a JSON line with all metrics to stderr every this many seconds")
+
+    sub.add_parser("status", help="Print the number of jobs per state")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    init_db()
+    if args.command == "enqueue":
+        client = OrcidClient()
+        if args.search:
+            enqueue(client.search(args.search), client, args.requeue_finished)
+        if args.input:
+            enqueue(read_input_file(args.input), client, args.requeue_finished)
+    elif args.command == "work":
+        if args.metrics_port:
+            metrics.start_http_server(args.metrics_port)
+        if args.metrics_log_interval:
+            metrics.start_json_logger(args.metrics_log_interval)
+        cache = ResponseCache(args.cache_dir) if args.cache_dir else None
+        archive = ProfileArchive(args.archive) if args.archive else None
+        worker = JobWorker(OrcidClient(cache=cache, fetch_mode=args.fetch_mode, archive=archive), batch_size=args.batch_size,
+                           threads=args.threads, lease_seconds=args.lease_seconds, incremental=args.incremental,
+                           streaming=args.stream, chunk_size=args.chunk_size)
+        # Finish the current batch on Ctrl+C / SIGTERM instead of abandoning leased jobs
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop.set())
+        signal.signal(signal.SIGINT, lambda *_: worker.stop.set())
+        try:
+            worker.run(args.exit_when_empty)
+        finally:
+            if archive:
+                archive.close()
+    else:
+        print(JobQueueRepository().counts())
@@ -0,0 +1,165 @@
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Process-wide counters and latency histograms for the ingestion hot paths (HTTP
+# requests, section fetches, section saves, SQL statements). Exposed in the
+# Prometheus text format over HTTP and/or as a periodic JSON log line.
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """Cumulative-bucket histogram as in Prometheus; not thread-safe on its own."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip((*self.buckets, float("inf")), self.counts):
+            total += n
+            yield bound, total
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key, extra=()):
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # name -> {label key: value}
+        self._histograms = {}  # name -> {label key: Histogram}
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def incr(self, name, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Times the block into the histogram '<name>_seconds', also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(self._histograms[name].items()):
+                    for bound, total in h.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', le),))} {total}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Counters and histogram summaries (count, sum, mean) as a JSON-friendly dict."""
+        def series_name(name, key):
+            return name + _format_labels(key)
+
+        with self._lock:
+            counters = {series_name(n, k): v for n, series in self._counters.items() for k, v in series.items()}
+            histograms = {series_name(n, k): {"count": h.count, "sum": round(h.sum, 6),
+                                              "mean": round(h.sum / h.count, 6) if h.count else 0.0}
+                          for n, series in self._histograms.items() for k, h in series.items()}
+        return {"counters": counters, "histograms": histograms}
+
+    def start_http_server(self, port, host="0.0.0.0"):
+        """Serves GET /metrics in the Prometheus text format from a daemon thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                data = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def start_json_logger(self, interval=60.0, stream=None):
+        """Writes one JSON line with snapshot() every interval seconds (stderr by default)."""
+        stream = stream or sys.stderr
+        stop = threading.Event()
+
+        def log():
+            while not stop.wait(interval):
+                stream.write(json.dumps({"ts": time.time(), **self.snapshot()}) + "\n")
+                stream.flush()
+
+        threading.Thread(target=log, daemon=True).start()
+        return stop
+
+# Shared by every client, repository and connection in the process
+metrics = MetricsRegistry()
+metrics.describe("orcid_http_responses_total", "ORCID API responses by endpoint and HTTP status")
+metrics.describe("orcid_http_response_bytes_total", "Bytes of ORCID API response bodies")
+metrics.describe("orcid_fetch_section_seconds", "Time to fetch one profile section (incl. retries and cache)")
+metrics.describe("orcid_search_seconds", "Time of one ORCID search request")
+metrics.describe("orcid_save_section_seconds", "Time to write one section group of a profile")
+metrics.describe("orcid_rows_skipped_total", "API rows skipped because they could not be normalised")
+metrics.describe("sql_statements_total", "SQL statements sent to PostgreSQL")
+metrics.describe("sql_statement_seconds", "Server round trip time of one SQL statement")
+metrics.describe("sql_rows_written_total", "Rows inserted, updated or deleted")
+metrics.describe("sql_rows_rejected_total", "Rows skipped because the database rejected them")
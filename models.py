@@ -1,8 +1,10 @@
+from array import array
 from dataclasses import dataclass
 from typing import List, Optional
+import io
 import json
 
-@dataclass
+@dataclass(slots=True)
 class StandardPaper:
     """
     The unified format for a research paper.
@@ -22,8 +24,135 @@ class StandardPaper:
             self.source_id,
             self.source_name,
             self.title,
-            json.dumps(self.authors), # Store list as JSON string in SQLite
+            json.dumps(self.authors), # Stored in the jsonb column papers.authors_json (PostgreSQL)
             self.year,
             self.venue,
             self.doi
-        )
\ No newline at end of file
+        )
+
+def _copy_escape(value):
+    """One field in PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+class PaperBatch:
+    """
+    Columnar container for many papers: one list or array per field instead of one
+    object per paper. Source names and venues are interned in a shared string table,
+    author names in a shared author table, and each paper's authors are a slice of
+    one flat id array, so millions of papers fit in a fraction of the memory of
+    StandardPaper objects.
+    """
+
+    _NO_YEAR = -1
+
+    def __init__(self):
+        self.source_ids = []
+        self.titles = []
+        self.dois = []
+        self.years = array("i")
+        self.source_name_ids = array("I")
+        self.venue_ids = array("i")        # -1: no venue
+        self.author_ids = array("I")       # flat; paper i owns author_ids[author_offsets[i]:author_offsets[i + 1]]
+        self.author_offsets = array("I", [0])
+        self._strings = []
+        self._string_ids = {}
+        self._authors = []
+        self._author_ids = {}
+        self._author_json = []             # json.dumps of each author name, encoded once
+
+    @classmethod
+    def from_papers(cls, papers):
+        batch = cls()
+        batch.extend(papers)
+        return batch
+
+    def __len__(self):
+        return len(self.source_ids)
+
+    def _intern(self, text):
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self._strings)
+            self._strings.append(text)
+        return string_id
+
+    def _author_id(self, name):
+        author_id = self._author_ids.get(name)
+        if author_id is None:
+            author_id = self._author_ids[name] = len(self._authors)
+            self._authors.append(name)
+            self._author_json.append(json.dumps(name))
+        return author_id
+
+    def append(self, paper):
+        self.source_ids.append(paper.source_id)
+        self.titles.append(paper.title)
+        self.dois.append(paper.doi)
+        self.years.append(self._NO_YEAR if paper.year is None else paper.year)
+        self.source_name_ids.append(self._intern(paper.source_name))
+        self.venue_ids.append(-1 if paper.venue is None else self._intern(paper.venue))
+        self.author_ids.extend(self._author_id(name) for name in paper.authors or ())
+        self.author_offsets.append(len(self.author_ids))
+
+    def extend(self, papers):
+        for paper in papers:
+            self.append(paper)
+
+    def authors(self, i):
+        ids = self.author_ids[self.author_offsets[i]:self.author_offsets[i + 1]]
+        return [self._authors[a] for a in ids]
+
+    def _authors_json(self, i):
+        ids = self.author_ids[self.author_offsets[i]:self.author_offsets[i + 1]]
+        return "[" + ", ".join(self._author_json[a] for a in ids) + "]"
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        year = self.years[i]
+        venue_id = self.venue_ids[i]
+        return StandardPaper(
+            source_id=self.source_ids[i],
+            source_name=self._strings[self.source_name_ids[i]],
+            title=self.titles[i],
+            authors=self.authors(i),
+            year=None if year == self._NO_YEAR else year,
+            venue=None if venue_id < 0 else self._strings[venue_id],
+            doi=self.dois[i],
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_tuples(self):
+        """Database tuples in the same order as StandardPaper.to_db_tuple, for the whole batch."""
+        strings = self._strings
+        return [
+            (self.source_ids[i], strings[self.source_name_ids[i]], self.titles[i], self._authors_json(i),
+             None if self.years[i] == self._NO_YEAR else self.years[i],
+             None if self.venue_ids[i] < 0 else strings[self.venue_ids[i]], self.dois[i])
+            for i in range(len(self))
+        ]
+
+    def to_copy_buffer(self):
+        """The whole batch in COPY text format (columns as in to_tuples), ready for copy_expert."""
+        buf = io.StringIO()
+        escaped = [_copy_escape(s) for s in self._strings]
+        for i in range(len(self)):
+            year = self.years[i]
+            venue_id = self.venue_ids[i]
+            buf.write("\t".join((
+                _copy_escape(self.source_ids[i]),
+                escaped[self.source_name_ids[i]],
+                _copy_escape(self.titles[i]),
+                _copy_escape(self._authors_json(i)),
+                "\\N" if year == self._NO_YEAR else str(year),
+                "\\N" if venue_id < 0 else escaped[venue_id],
+                _copy_escape(self.dois[i]),
+            )))
+            buf.write("\n")
+        buf.seek(0)
+        return buf
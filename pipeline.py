@@ -0,0 +1,224 @@
+import functools
+import queue
+import re
+import threading
+import time
+
+from clients.orcid_client import OrcidClient
+from clients.request_scheduler import PermanentRequestError
+from repositories.orcid_repo import OrcidRepository
+from repositories.dimension_cache import dimension_cache
+from repositories.org_resolver import org_resolver
+
+ORCID_ID_PATTERN = re.compile(r"^\d{4}-\d{4}-\d{4}-\d{3}[\dX]$")
+
+# Queue sentinel telling a worker to stop
+_DONE = object()
+
+def read_input_file(path):
+    """Yields one researcher (name or ORCID iD) per non-empty line, skipping '#' comments."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+def stream_profile(client, repo, orcid_id, since=None, chunk_size=500):
+    """Downloads and saves one profile section by section (OrcidRepository.save_profile_stream)."""
+    print(f"--> Fetching full profile for {orcid_id}...")
+    work_details = None
+    if client.fetch_mode == "record":
+        # Summaries come from the section endpoints; details add contributors after the works are read
+        work_details = functools.partial(client.get_work_details, orcid_id)
+    return repo.save_profile_stream(orcid_id, functools.partial(client.stream_section, orcid_id),
+                                    since, chunk_size, work_details)
+
+class PipelineStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counts = {"queued": 0, "fetched": 0, "saved": 0, "unchanged": 0, "not_found": 0, "failed": 0, "retries": 0}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def print_summary(self):
+        elapsed = self.elapsed()
+        c = self.counts
+        rate = c["saved"] / elapsed if elapsed > 0 else 0.0
+        print("--- Batch Ingestion Summary ---")
+        print(f"   Input items:  {c['queued']}")
+        print(f"   Saved:        {c['saved']} in {elapsed:.1f}s ({rate:.2f} profiles/s)")
+        print(f"   Unchanged:    {c['unchanged']}")
+        print(f"   Not found:    {c['not_found']}")
+        print(f"   Failed:       {c['failed']}")
+        print(f"   Retries:      {c['retries']}")
+
+class IngestionPipeline:
+    """
+    Two-stage ingestion: fetch workers download profiles from ORCID while writer
+    workers save earlier profiles to PostgreSQL, so network and database latency overlap.
+    Both queues are bounded, so at most queue_size + fetch_workers + write_workers
+    profiles are held in memory no matter how long the input is.
+
+    With streaming=True every fetch worker writes its profile section by section while
+    downloading it (OrcidRepository.save_profile_stream) instead of handing it to the
+    writers, so memory per worker stays bounded by chunk_size even for huge records.
+    """
+
+    def __init__(self, client=None, fetch_workers=4, write_workers=2, queue_size=16,
+                 max_attempts=3, retry_delay=1.0, incremental=False, streaming=False, chunk_size=500):
+        """
+        incremental=True skips profiles and sections unchanged since the last ingest.
+        client is only used by run() (default: a new OrcidClient); replay() needs none.
+        """
+        self.client = client
+        if streaming and client is not None and client.archive is not None:
+            raise ValueError("Streaming ingestion does not keep whole profiles, so it cannot archive them")
+        self.incremental = incremental
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.fetch_workers = fetch_workers
+        self.write_workers = write_workers
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.stats = PipelineStats()
+
+    def run(self, items):
+        if self.client is None:
+            self.client = OrcidClient()
+        self.stats = PipelineStats()
+        input_q = queue.Queue(maxsize=self.fetch_workers * 2)
+        profile_q = queue.Queue(maxsize=self.queue_size)
+        writers = self._start_writers(profile_q)
+
+        fetchers = [threading.Thread(target=self._fetch_worker, args=(input_q, profile_q), daemon=True)
+                    for _ in range(self.fetch_workers)]
+        for t in fetchers:
+            t.start()
+
+        # Feeding blocks once the fetchers fall behind (backpressure)
+        for item in items:
+            input_q.put(item)
+            self.stats.incr("queued")
+
+        for _ in fetchers:
+            input_q.put(_DONE)
+        for t in fetchers:
+            t.join()
+        self._stop_writers(profile_q, writers)
+
+        self.stats.print_summary()
+        self._print_cache_stats()
+        s = self.client.scheduler.stats()
+        print(f"   HTTP: {s['requests']} requests, {s['retries']} retries ({s['throttled']} rate limited), "
+              f"{s['permanent_errors']} permanent errors, queue wait avg {s['queue_wait_avg'] * 1000:.0f} ms "
+              f"/ max {s['queue_wait_max'] * 1000:.0f} ms")
+        if self.client.cache:
+            s = self.client.cache.stats()
+            print(f"   HTTP cache: {s['hit_rate']:.0%} hit rate ({s['hits']} fresh, {s['revalidated']} revalidated, "
+                  f"{s['misses']} misses), {s['bytes_saved'] / 1e6:.1f} MB saved, {s['evictions']} evictions")
+        return self.stats
+
+    def replay(self, profiles):
+        """
+        Saves already downloaded profiles (e.g. ProfileArchive.iter_latest()) with the
+        write workers only, so reprocessing is bound by the database, not the network.
+        """
+        self.stats = PipelineStats()
+        profile_q = queue.Queue(maxsize=self.queue_size)
+        writers = self._start_writers(profile_q)
+        for profile in profiles:
+            profile_q.put(profile)
+            self.stats.incr("queued")
+        self._stop_writers(profile_q, writers)
+
+        self.stats.print_summary()
+        self._print_cache_stats()
+        return self.stats
+
+    def _start_writers(self, profile_q):
+        repo = OrcidRepository()
+        repo.ensure_schema()
+        repo.preload_dimensions()
+        writers = [threading.Thread(target=self._write_worker, args=(profile_q,), daemon=True)
+                   for _ in range(0 if self.streaming else self.write_workers)]
+        for t in writers:
+            t.start()
+        return writers
+
+    def _stop_writers(self, profile_q, writers):
+        for _ in writers:
+            profile_q.put(_DONE)
+        for t in writers:
+            t.join()
+
+    def _print_cache_stats(self):
+        for name, s in dimension_cache.stats().items():
+            print(f"   Cache {name}: {s['hits']} hits / {s['misses']} misses ({s['size']} cached)")
+        s = org_resolver.stats()
+        print(f"   Cache org: {s['hits']} hits / {s['misses']} misses ({s['size']} cached)")
+
+    def _with_retries(self, label, fn, *args):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return fn(*args)
+            except PermanentRequestError:
+                raise
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                self.stats.incr("retries")
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                print(f"⚠️ {label} failed (attempt {attempt}/{self.max_attempts}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def _resolve_orcid(self, item):
+        if ORCID_ID_PATTERN.match(item):
+            return item
+        return self._with_retries(f"Search '{item}'", self.client.get_orcid_id, item)
+
+    def _fetch_worker(self, input_q, profile_q):
+        repo = OrcidRepository()
+        while True:
+            item = input_q.get()
+            if item is _DONE:
+                return
+            try:
+                orcid_id = self._resolve_orcid(item)
+                if not orcid_id:
+                    print(f"❌ Person not found: {item}")
+                    self.stats.incr("not_found")
+                    continue
+                since = repo.load_sync_state(orcid_id) if self.incremental else None
+                if self.streaming:
+                    written = self._with_retries(f"Stream {orcid_id}", stream_profile, self.client, repo,
+                                                 orcid_id, since, self.chunk_size)
+                    self.stats.incr("fetched")
+                    self.stats.incr("saved" if written else "unchanged")
+                    continue
+                profile = self._with_retries(f"Fetch {orcid_id}", self.client.get_full_profile, orcid_id, since)
+                self.stats.incr("fetched")
+                profile_q.put(profile)
+            except Exception as e:
+                print(f"❌ Giving up on '{item}' (fetch): {e}")
+                self.stats.incr("failed")
+
+    def _write_worker(self, profile_q):
+        repo = OrcidRepository()
+        while True:
+            profile = profile_q.get()
+            if profile is _DONE:
+                return
+            try:
+                written = self._with_retries(f"Save {profile['orcid']}", repo.save_full_profile,
+                                             profile, self.incremental)
+                self.stats.incr("saved" if written else "unchanged")
+            except Exception as e:
+                print(f"❌ Giving up on {profile['orcid']} (write): {e}")
+                self.stats.incr("failed")
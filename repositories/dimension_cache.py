@@ -0,0 +1,108 @@
+import threading
+from psycopg2.extras import execute_values
+from database import execute_rows
+
+class DimensionCache:
+    """
+    Process-wide in-memory cache of the small lookup tables that every profile
+    references (country, work_type, external_id_relationship).
+
+    Ids inserted by a transaction that has not committed yet are kept per connection
+    and only published to other threads after commit(conn), so a rollback can never
+    leave an id in the cache that does not exist in the database.
+    """
+
+    # Dimension name -> (table, key column)
+    DIMENSIONS = {
+        "country": ("country", "iso2_code"),
+        "work_type": ("work_type", "work_type"),
+        "relationship": ("external_id_relationship", "relationship"),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {name: {} for name in self.DIMENSIONS}
+        self._pending = {}  # connection -> {dimension: {value: id}}
+        self.hits = {name: 0 for name in self.DIMENSIONS}
+        self.misses = {name: 0 for name in self.DIMENSIONS}
+
+    def preload(self, cursor):
+        """Loads every existing row of the dimension tables."""
+        for name, (table, column) in self.DIMENSIONS.items():
+            cursor.execute(f"SELECT {column}, id FROM {table}")
+            rows = cursor.fetchall()
+            with self._lock:
+                self._ids[name].update(rows)
+
+    def resolve(self, cursor, name, values, count=True):
+        """
+        Returns {value: id} for all non-empty values. Values not in the cache are
+        looked up with one SELECT and the still unknown ones created with one INSERT.
+        count=False leaves the hit/miss stats alone, for per-row lookups of values that
+        were already resolved (and counted) in bulk.
+        """
+        values = {v for v in values if v}
+        conn = cursor.connection
+        found = {}
+        with self._lock:
+            known = self._ids[name]
+            pending = self._pending.get(conn, {}).get(name, {})
+            for v in values:
+                if v in known:
+                    found[v] = known[v]
+                elif v in pending:
+                    found[v] = pending[v]
+            if count:
+                self.hits[name] += len(found)
+                self.misses[name] += len(values) - len(found)
+
+        missing = values - found.keys()
+        if not missing:
+            return found
+
+        table, column = self.DIMENSIONS[name]
+        selected = self._select(cursor, table, column, missing)
+        inserted = {}
+        new_values = missing - selected.keys()
+        if new_values:
+            # DO NOTHING: a concurrent writer may insert the same value first. Its row is
+            # picked up by the re-select below once that writer commits. Sorted, so writers
+            # inserting the same new values lock them in the same order and cannot deadlock.
+            # A value the column rejects (e.g. a 3-letter iso2_code) is skipped and resolves to None.
+            query = f"INSERT INTO {table} ({column}) VALUES %s ON CONFLICT DO NOTHING RETURNING {column}, id"
+            _, rows = execute_rows(cursor, [(v,) for v in sorted(new_values)],
+                                   lambda cur, batch: execute_values(cur, query, batch, fetch=True), table)
+            inserted = dict(rows)
+            lost = new_values - inserted.keys()
+            if lost:
+                selected.update(self._select(cursor, table, column, lost))
+
+        with self._lock:
+            self._ids[name].update(selected)
+            self._pending.setdefault(conn, {}).setdefault(name, {}).update(inserted)
+        found.update(selected)
+        found.update(inserted)
+        return found
+
+    def _select(self, cursor, table, column, values):
+        cursor.execute(f"SELECT {column}, id FROM {table} WHERE {column} = ANY(%s)", (list(values),))
+        return dict(cursor.fetchall())
+
+    def commit(self, conn):
+        """Publishes the ids inserted on conn. Call after conn.commit()."""
+        with self._lock:
+            for name, ids in self._pending.pop(conn, {}).items():
+                self._ids[name].update(ids)
+
+    def rollback(self, conn):
+        """Forgets the ids inserted on conn. Call after conn.rollback()."""
+        with self._lock:
+            self._pending.pop(conn, None)
+
+    def stats(self):
+        with self._lock:
+            return {name: {"hits": self.hits[name], "misses": self.misses[name], "size": len(self._ids[name])}
+                    for name in self.DIMENSIONS}
+
+# Shared by every OrcidRepository in the process
+dimension_cache = DimensionCache()
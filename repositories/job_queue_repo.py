@@ -0,0 +1,164 @@
+from psycopg2.extras import execute_values
+from database import db_cursor
+
+class JobQueueRepository:
+    """
+    Durable ingestion queue in PostgreSQL, shared by workers on any number of machines.
+
+    A job is one ORCID iD. Workers claim pending jobs with SELECT ... FOR UPDATE SKIP LOCKED,
+    so concurrent claims never block on or return the same row, and hold them under a lease
+    they renew with heartbeats. A job whose lease expired (worker crashed or lost its
+    connection) is claimable again; after max_attempts it is marked failed.
+    """
+
+    DDL = """
+        CREATE TABLE IF NOT EXISTS ingest_job (
+            id bigserial PRIMARY KEY,
+            orcid varchar(19) NOT NULL UNIQUE,
+            state text NOT NULL DEFAULT 'pending'
+                CHECK (state IN ('pending', 'running', 'done', 'failed')),
+            attempts integer NOT NULL DEFAULT 0,
+            max_attempts integer NOT NULL DEFAULT 5,
+            run_after timestamptz NOT NULL DEFAULT now(),
+            lease_owner text,
+            lease_expires_at timestamptz,
+            last_error text,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            finished_at timestamptz
+        );
+        CREATE INDEX IF NOT EXISTS ingest_job_pending_idx ON ingest_job (run_after, id) WHERE state = 'pending';
+        CREATE INDEX IF NOT EXISTS ingest_job_lease_idx ON ingest_job (lease_expires_at) WHERE state = 'running';
+    """
+
+    def __init__(self, conn=None):
+        """conn: optional connection owned by the caller; otherwise each call borrows a pooled one."""
+        self.conn = conn
+
+    def _run(self, fn, *args):
+        if self.conn is not None:
+            with self.conn.cursor() as cursor:
+                result = fn(cursor, *args)
+            self.conn.commit()
+            return result
+        with db_cursor() as (conn, cursor):
+            result = fn(cursor, *args)
+            conn.commit()
+            return result
+
+    def ensure_table(self):
+        self._run(lambda cursor: cursor.execute(self.DDL))
+
+    def enqueue(self, orcids, max_attempts=5, requeue_finished=False):
+        """
+        Adds jobs for orcids and returns how many were added or requeued. ORCIDs already
+        queued or running are left alone; done/failed ones are only requeued with
+        requeue_finished=True (e.g. for a periodic refresh).
+        """
+        rows = [(orcid, max_attempts) for orcid in dict.fromkeys(orcids)]
+        if not rows:
+            return 0
+        on_conflict = """
+            DO UPDATE SET state = 'pending', attempts = 0, max_attempts = EXCLUDED.max_attempts,
+                          run_after = now(), last_error = NULL, finished_at = NULL, updated_at = now()
+            WHERE ingest_job.state IN ('done', 'failed')
+        """ if requeue_finished else "DO NOTHING"
+
+        def insert(cursor):
+            result = execute_values(cursor, f"""
+                INSERT INTO ingest_job (orcid, max_attempts) VALUES %s
+                ON CONFLICT (orcid) {on_conflict}
+                RETURNING id
+            """, rows, page_size=len(rows), fetch=True)
+            return len(result)
+        return self._run(insert)
+
+    def claim(self, worker_id, batch_size=10, lease_seconds=300):
+        """
+        Leases up to batch_size jobs to worker_id and returns them as [(id, orcid, attempts)].
+        Pending jobs come first in queue order; running jobs whose lease expired are taken over.
+        """
+        def claim(cursor):
+            self._fail_exhausted(cursor)
+            cursor.execute("""
+                WITH picked AS (
+                    SELECT id FROM ingest_job
+                    WHERE (state = 'pending' AND run_after <= now())
+                       OR (state = 'running' AND lease_expires_at < now())
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE ingest_job j
+                SET state = 'running', attempts = j.attempts + 1, lease_owner = %s,
+                    lease_expires_at = now() + make_interval(secs => %s), updated_at = now()
+                FROM picked
+                WHERE j.id = picked.id
+                RETURNING j.id, j.orcid, j.attempts
+            """, (batch_size, worker_id, lease_seconds))
+            return sorted(cursor.fetchall())
+        return self._run(claim)
+
+    def _fail_exhausted(self, cursor):
+        # An expired lease on the last attempt means the job crashed its worker every time
+        cursor.execute("""
+            UPDATE ingest_job
+            SET state = 'failed', lease_owner = NULL, lease_expires_at = NULL, finished_at = now(),
+                updated_at = now(), last_error = coalesce(last_error, 'lease expired')
+            WHERE id IN (
+                SELECT id FROM ingest_job
+                WHERE state = 'running' AND lease_expires_at < now() AND attempts >= max_attempts
+                FOR UPDATE SKIP LOCKED
+            )
+        """)
+
+    def heartbeat(self, worker_id, job_ids, lease_seconds=300):
+        """Extends the lease on job_ids. Returns the ids this worker still owns."""
+        if not job_ids:
+            return set()
+
+        def renew(cursor):
+            cursor.execute("""
+                UPDATE ingest_job
+                SET lease_expires_at = now() + make_interval(secs => %s), updated_at = now()
+                WHERE id = ANY(%s) AND state = 'running' AND lease_owner = %s
+                RETURNING id
+            """, (lease_seconds, list(job_ids), worker_id))
+            return {row[0] for row in cursor.fetchall()}
+        return self._run(renew)
+
+    def complete(self, worker_id, job_id):
+        """Marks a job done. Returns False if the lease was lost to another worker meanwhile."""
+        def done(cursor):
+            cursor.execute("""
+                UPDATE ingest_job
+                SET state = 'done', lease_owner = NULL, lease_expires_at = NULL, last_error = NULL,
+                    finished_at = now(), updated_at = now()
+                WHERE id = %s AND state = 'running' AND lease_owner = %s
+            """, (job_id, worker_id))
+            return cursor.rowcount == 1
+        return self._run(done)
+
+    def fail(self, worker_id, job_id, error, retry=True, retry_delay=60):
+        """
+        Records a failed attempt. With retry the job goes back to pending after
+        retry_delay * 2^(attempts-1) seconds, unless it used up max_attempts.
+        """
+        def failed(cursor):
+            cursor.execute("""
+                UPDATE ingest_job
+                SET state = CASE WHEN %s AND attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                    run_after = now() + make_interval(secs => %s * power(2, attempts - 1)),
+                    finished_at = CASE WHEN %s AND attempts < max_attempts THEN NULL ELSE now() END,
+                    lease_owner = NULL, lease_expires_at = NULL, last_error = %s, updated_at = now()
+                WHERE id = %s AND state = 'running' AND lease_owner = %s
+            """, (retry, retry_delay, retry, str(error)[:2000], job_id, worker_id))
+            return cursor.rowcount == 1
+        return self._run(failed)
+
+    def counts(self):
+        """Returns {state: number of jobs}."""
+        def count(cursor):
+            cursor.execute("SELECT state, count(*) FROM ingest_job GROUP BY state")
+            return dict(cursor.fetchall())
+        return self._run(count)
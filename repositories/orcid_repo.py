@@ -1,15 +1,111 @@
 import datetime
-import random
 import hashlib
-from database import get_connection
+import psycopg2
+from collections import Counter, defaultdict
+from itertools import islice
+from decimal import Decimal
+from psycopg2.extras import execute_batch, execute_values
+from database import db_cursor, execute_rows, pooled_connection
+from metrics import metrics
+from repositories.dimension_cache import dimension_cache
+from repositories.org_resolver import OrgResolver, org_resolver
+from repositories.sync_state_repo import SyncStateRepository
+
+# Errors raised while normalising one API row; such rows are skipped, anything else aborts the profile
+ROW_ERRORS = (ValueError, TypeError, AttributeError, KeyError)
 
 class OrcidRepository:
-    def __init__(self):
-        pass
+    # Profile sections that are written together by one _save_* step
+    SECTION_GROUPS = {
+        "person": ("person",),
+        "affiliations": ("employments", "educations"),
+        "fundings": ("fundings",),
+        "peer_reviews": ("peer_reviews",),
+        "research_resources": ("research_resources",),
+        "works": ("works",),
+    }
+    # Section group -> (table, key column, columns, child tables [(table, fk column)]).
+    # NOTE: the SQL dump doesn't show ON DELETE CASCADE for the child tables (e.g.
+    # 'org_affilaition_relation_external_identifier'), so their rows are deleted first.
+    GROUP_TABLES = {
+        "affiliations": ("org_affiliation_relation", "id",
+                         ("org_id", "start_year", "end_year", "org_affiliation_relation_title", "department"),
+                         [("org_affilaition_relation_external_identifier", "org_affilaition_relation_id")]),
+        "fundings": ("profile_funding", "id",
+                     ("title", "type", "start_year", "numeric_amount", "currency_code", "org_id"),
+                     [("profile_funding_contributor", "profile_funding_id"),
+                      ("profile_funding_external_identifier", "profile_funding_id")]),
+        "peer_reviews": ("peer_review", "id", ("org_id", "subject_name"),
+                         [("peer_review_external_identifier", "peer_review_id")]),
+        "research_resources": ("research_resource", "id", ("title",),
+                               [("research_resource_item", "research_resource_id"),
+                                ("research_resource_external_identifier", "research_resource_id")]),
+        "works": ("work", "work_id", ("title", "journal_title", "work_type_id"),
+                  [("work_external_identifier", "work_id"), ("work_contributor", "work_id")]),
+    }
+    # Keys written so far by a streamed section (save_profile_stream); gone at commit / rollback
+    STREAM_SEEN_DDL = "CREATE TEMP TABLE IF NOT EXISTS stream_seen_key (key bigint PRIMARY KEY) ON COMMIT DROP"
+    # work_contributor columns filled from full work details (OrcidClient fetch_mode="record")
+    # NOTE: the SQL dump only shows work_contributor(work_id), so ensure_schema adds these
+    # columns if the table does not have them yet.
+    CONTRIBUTOR_COLUMNS = ("contributor_orcid", "credit_name", "contributor_role", "contributor_sequence")
+    CONTRIBUTOR_COLUMN_TYPES = {"contributor_orcid": "varchar(19)", "credit_name": "text",
+                                "contributor_role": "text", "contributor_sequence": "text"}
+
+    def __init__(self, conn=None, dimensions=None, orgs=None):
+        """
+        conn: optional connection owned by the caller. It is used for every save and never
+        closed here. Without it each save borrows a connection from the pool in database.py.
+        """
+        self.conn = conn
+        self.dimensions = dimensions or dimension_cache
+        self.orgs = orgs or (org_resolver if dimensions is None else OrgResolver(self.dimensions))
+        self.sync_state = SyncStateRepository()
+
+    def _run(self, fn, *args):
+        """Runs fn(cursor, *args) on the injected connection or a pooled one and commits."""
+        if self.conn is not None:
+            with self.conn.cursor() as cursor:
+                result = fn(cursor, *args)
+            self.conn.commit()
+            return result
+        with db_cursor() as (conn, cursor):
+            result = fn(cursor, *args)
+            conn.commit()
+            return result
 
-    def _generate_id(self):
-        """Generates a random 63-bit BigInt ID."""
-        return random.getrandbits(63)
+    def ensure_schema(self):
+        """Creates the bookkeeping tables and columns the ingester adds to the ORCID schema."""
+        self._run(self.sync_state.ensure_table)
+        self._run(self.orgs.ensure_schema)
+        self._run(self._ensure_contributor_columns)
+
+    def _ensure_contributor_columns(self, cursor):
+        # Looked up first: ALTER TABLE locks work_contributor even when the columns exist
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = 'work_contributor' AND table_schema = ANY(current_schemas(false))
+        """)
+        found = {row[0] for row in cursor.fetchall()}
+        missing = [c for c in self.CONTRIBUTOR_COLUMNS if c not in found]
+        if missing:
+            cursor.execute("ALTER TABLE work_contributor " + ", ".join(
+                f"ADD COLUMN IF NOT EXISTS {c} {self.CONTRIBUTOR_COLUMN_TYPES[c]}" for c in missing))
+
+    def load_sync_state(self, orcid):
+        """Returns {section: upstream last-modified} stored by the previous ingest of orcid."""
+        return self._run(self.sync_state.load, orcid)
+
+    def preload_dimensions(self):
+        """Fills the dimension cache from the country, work_type and relationship tables."""
+        self._run(self.dimensions.preload)
+
+    def _stable_id(self, orcid, section, key=''):
+        """
+        Deterministic 63-bit ID for an item of a profile, e.g. (orcid, 'work', put-code).
+        Re-ingesting the same item always yields the same primary key.
+        """
+        return self._string_to_bigint(f"{orcid}/{section}/{key}")
 
     def _string_to_bigint(self, text):
         """
@@ -22,52 +118,439 @@ class OrcidRepository:
         # Create a hash and convert to a positive integer within Postgres BigInt range
         return int(hashlib.sha256(text.encode('utf-8')).hexdigest(), 16) % (2**63 - 1)
 
-    def save_full_profile(self, data):
-        conn = get_connection()
+    def _bulk_insert(self, cursor, table, columns, rows):
+        """
+        Inserts all rows with a single multi-row INSERT ... VALUES statement. Rows the
+        database rejects (e.g. a value too long for its column) are skipped.
+        """
+        if not rows: return
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+        rows, _ = execute_rows(cursor, rows, lambda cur, batch: execute_values(cur, query, batch, page_size=len(batch)),
+                               table)
+        metrics.incr("sql_rows_written_total", len(rows), table=table, op="insert")
+
+    def _same_value(self, old, new):
+        if isinstance(old, (int, float, Decimal)) and isinstance(new, (int, float, Decimal)):
+            return float(old) == float(new)
+        return old == new
+
+    def _merge_rows(self, cursor, table, key_column, columns, rows, orcid, ts, child_tables=()):
+        """
+        Makes the ORCID's rows in table match rows, a list of (key, *columns) tuples:
+        new keys are inserted, rows whose columns changed are updated and keys that
+        disappeared upstream are deleted, after their rows in child_tables [(table, fk_column)].
+        Unchanged rows are not touched. Returns the keys that existed before and still exist.
+        """
+        desired = {}
+        for row in rows:
+            desired.setdefault(row[0], tuple(row[1:]))
+
+        cursor.execute(f"SELECT {key_column}, {', '.join(columns)} FROM {table} WHERE orcid = %s", (orcid,))
+        existing = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        gone = [key for key in existing if key not in desired]
+        if gone:
+            for child_table, fk_column in child_tables:
+                cursor.execute(f"DELETE FROM {child_table} WHERE {fk_column} = ANY(%s)", (gone,))
+                metrics.incr("sql_rows_written_total", cursor.rowcount, table=child_table, op="delete")
+            cursor.execute(f"DELETE FROM {table} WHERE {key_column} = ANY(%s)", (gone,))
+            metrics.incr("sql_rows_written_total", cursor.rowcount, table=table, op="delete")
+
+        self._write_rows(cursor, table, key_column, columns, desired, existing, orcid, ts)
+        return existing.keys() & desired.keys()
+
+    def _write_rows(self, cursor, table, key_column, columns, desired, existing, orcid, ts):
+        """Inserts the desired {key: values} missing from existing and updates the ones that differ."""
+        self._bulk_insert(cursor, table, (key_column, "orcid", *columns, "last_modified"),
+                          [(key, orcid, *values, ts) for key, values in desired.items() if key not in existing])
+
+        changed = [(*values, ts, key) for key, values in desired.items()
+                   if key in existing and not all(map(self._same_value, existing[key], values))]
+        if changed:
+            assignments = ", ".join(f"{c} = %s" for c in (*columns, "last_modified"))
+            query = f"UPDATE {table} SET {assignments} WHERE {key_column} = %s"
+            changed, _ = execute_rows(cursor, changed,
+                                      lambda cur, batch: execute_batch(cur, query, batch, page_size=len(batch)), table)
+            metrics.incr("sql_rows_written_total", len(changed), table=table, op="update")
+
+    def _merge_group(self, cursor, group, rows, orcid, ts):
+        table, key_column, columns, child_tables = self.GROUP_TABLES[group]
+        return self._merge_rows(cursor, table, key_column, columns, rows, orcid, ts, child_tables)
+
+    def _merge_rows_chunk(self, cursor, group, rows, orcid, ts):
+        """
+        Streaming counterpart of _merge_rows for one chunk of a section group: inserts new
+        keys and updates changed rows, but only reads the rows of this chunk. Keys are
+        recorded in stream_seen_key; _delete_unseen removes the rest once the group is done.
+        Returns (keys written by this chunk, those of them that existed before).
+        """
+        table, key_column, columns, _ = self.GROUP_TABLES[group]
+        desired = {}
+        for row in rows:
+            desired.setdefault(row[0], tuple(row[1:]))
+        if not desired:
+            return set(), set()
+
+        # A key repeated in a later chunk keeps its first version, as in _merge_rows
+        new_keys = execute_values(cursor, "INSERT INTO stream_seen_key (key) VALUES %s ON CONFLICT DO NOTHING RETURNING key",
+                                  [(key,) for key in desired], page_size=len(desired), fetch=True)
+        desired = {key: desired[key] for (key,) in new_keys}
+
+        cursor.execute(f"SELECT {key_column}, {', '.join(columns)} FROM {table} WHERE {key_column} = ANY(%s)",
+                       (list(desired),))
+        existing = {row[0]: row[1:] for row in cursor.fetchall()}
+        self._write_rows(cursor, table, key_column, columns, desired, existing, orcid, ts)
+        return desired.keys(), existing.keys() & desired.keys()
+
+    def _delete_unseen(self, cursor, group, orcid):
+        """Deletes the ORCID's rows of a streamed group (and their children) whose key was not written."""
+        table, key_column, _, child_tables = self.GROUP_TABLES[group]
+        unseen = f"SELECT {key_column} FROM {table} WHERE orcid = %s AND {key_column} NOT IN (SELECT key FROM stream_seen_key)"
+        for child_table, fk_column in child_tables:
+            cursor.execute(f"DELETE FROM {child_table} WHERE {fk_column} IN ({unseen})", (orcid,))
+            metrics.incr("sql_rows_written_total", cursor.rowcount, table=child_table, op="delete")
+        cursor.execute(f"DELETE FROM {table} WHERE {key_column} IN ({unseen})", (orcid,))
+        metrics.incr("sql_rows_written_total", cursor.rowcount, table=table, op="delete")
+        cursor.execute("DELETE FROM stream_seen_key")
+
+    def _merge_children(self, cursor, table, fk_column, columns, parent_ids, existing_parent_ids, rows):
+        """
+        Child tables have no key of their own, so children are compared per parent as a
+        whole: a parent's children are only rewritten if their set changed.
+        rows are (parent_id, *columns) tuples for the parents in parent_ids.
+        """
+        desired = defaultdict(list)
+        for row in rows:
+            desired[row[0]].append(tuple(row[1:]))
+
+        existing = defaultdict(list)
+        if existing_parent_ids:
+            cursor.execute(f"SELECT {fk_column}, {', '.join(columns)} FROM {table} WHERE {fk_column} = ANY(%s)",
+                           (list(existing_parent_ids),))
+            for row in cursor.fetchall():
+                existing[row[0]].append(tuple(row[1:]))
+
+        stale = [p for p in parent_ids if Counter(existing.get(p, [])) != Counter(desired.get(p, []))]
+        if not stale: return
+
+        to_delete = [p for p in stale if p in existing]
+        if to_delete:
+            cursor.execute(f"DELETE FROM {table} WHERE {fk_column} = ANY(%s)", (to_delete,))
+            metrics.incr("sql_rows_written_total", cursor.rowcount, table=table, op="delete")
+        self._bulk_insert(cursor, table, (fk_column, *columns),
+                          [(p, *child) for p in stale for child in desired.get(p, [])])
+
+    def _put_code(self, summary):
+        put_code = summary.get('put-code')
+        if put_code is None:
+            raise ValueError("missing put-code")
+        return put_code
+
+    def _year(self, date):
+        """Returns the year of an ORCID fuzzy date, None if missing. Raises ValueError on garbage."""
+        return int(((date or {}).get('year') or {}).get('value', 0) or 0) or None
+
+    def save_full_profile(self, data, incremental=False):
+        """
+        Writes one profile in a single transaction.
+        incremental=True only rewrites section groups whose upstream 'last-modified-date'
+        differs from the previous ingest, and skips the profile entirely if none did.
+        Sections set to None (not re-downloaded because unchanged) count as unchanged.
+        Returns False if nothing had to be written.
+        """
+        if self.conn is not None:
+            return self._save_full_profile(self.conn, data, incremental)
+        with pooled_connection() as conn:
+            return self._save_full_profile(conn, data, incremental)
+
+    def _save_full_profile(self, conn, data, incremental):
         cursor = conn.cursor()
         orcid = data['orcid']
         ts = datetime.datetime.now()
 
         try:
+            # One writer per ORCID across processes and machines; released at commit/rollback
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (self._string_to_bigint(f"profile/{orcid}"),))
+            stamps = {key: self.sync_state.last_modified(data.get(key))
+                      for keys in self.SECTION_GROUPS.values() for key in keys}
+            if incremental:
+                changed = self._changed_groups(cursor, orcid, data, stamps)
+            else:
+                # Rewriting a group from a section that was not re-downloaded would wipe its rows
+                changed = {group for group, keys in self.SECTION_GROUPS.items()
+                           if not any(key in data and data[key] is None for key in keys)}
+            if not changed:
+                conn.rollback()
+                print(f"⏭️ {orcid} unchanged since last ingest, skipping.")
+                return False
+
             print(f"--> Saving profile data for {orcid}...")
-            
+
+            # 0. Resolve every lookup value and org of this profile in bulk, so rows below hit the cache
+            with metrics.span("orcid_save_section", section="prefetch"):
+                self._prefetch_dimensions(cursor, data)
+
             # 1. Core Profile
-            self._save_profile_core(cursor, orcid, data.get('person'), ts)
-            
+            if "person" in changed:
+                with metrics.span("orcid_save_section", section="person"):
+                    self._save_profile_core(cursor, orcid, data.get('person'), ts)
+
             # 2. Affiliations
-            affiliations = []
-            if data.get('employments'):
-                affiliations.extend(data['employments'].get('affiliation-group', []))
-            if data.get('educations'):
-                affiliations.extend(data['educations'].get('affiliation-group', []))
-            self._save_affiliations(cursor, orcid, affiliations, ts)
+            if "affiliations" in changed:
+                affiliations = []
+                if data.get('employments'):
+                    affiliations.extend(data['employments'].get('affiliation-group', []))
+                if data.get('educations'):
+                    affiliations.extend(data['educations'].get('affiliation-group', []))
+                with metrics.span("orcid_save_section", section="affiliations"):
+                    self._save_affiliations(cursor, orcid, affiliations, ts)
 
             # 3. Fundings
-            fundings = data.get('fundings', {}).get('group', [])
-            self._save_fundings(cursor, orcid, fundings, ts)
+            if "fundings" in changed:
+                fundings = (data.get('fundings') or {}).get('group', [])
+                with metrics.span("orcid_save_section", section="fundings"):
+                    self._save_fundings(cursor, orcid, fundings, ts)
 
             # 4. Peer Reviews
-            peer_reviews = data.get('peer_reviews', {}).get('group', [])
-            self._save_peer_reviews(cursor, orcid, peer_reviews, ts)
-            
+            if "peer_reviews" in changed:
+                peer_reviews = (data.get('peer_reviews') or {}).get('group', [])
+                with metrics.span("orcid_save_section", section="peer_reviews"):
+                    self._save_peer_reviews(cursor, orcid, peer_reviews, ts)
+
             # 5. Research Resources
-            resources = data.get('research_resources', {}).get('group', [])
-            self._save_research_resources(cursor, orcid, resources, ts)
+            if "research_resources" in changed:
+                resources = (data.get('research_resources') or {}).get('group', [])
+                with metrics.span("orcid_save_section", section="research_resources"):
+                    self._save_research_resources(cursor, orcid, resources, ts)
 
             # 6. Works
-            works = data.get('works', {}).get('group', [])
-            self._save_works(cursor, orcid, works, ts)
-
-            conn.commit()
+            if "works" in changed:
+                works = (data.get('works') or {}).get('group', [])
+                with metrics.span("orcid_save_section", section="works"):
+                    self._save_works(cursor, orcid, works, ts, data.get('work_details'))
+
+            # 7. Remember upstream timestamps for the next incremental run
+            self.sync_state.save(cursor, orcid, {key: stamps[key] for group in changed
+                                                 for key in self.SECTION_GROUPS[group]})
+
+            with metrics.span("orcid_save_section", section="commit"):
+                conn.commit()
+            self.dimensions.commit(conn)
+            self.orgs.commit(conn)
             print("✅ Data committed successfully.")
+            return True
 
         except Exception as e:
             print(f"❌ Critical SQL Error (Rolling back transaction): {e}")
             conn.rollback()
+            self.dimensions.rollback(conn)
+            self.orgs.rollback(conn)
             raise e # Re-raise so we know the script failed
         finally:
             cursor.close()
-            conn.close()
+
+    def save_profile_stream(self, orcid, open_section, since=None, chunk_size=500, work_details=None):
+        """
+        Writes one profile while it is being downloaded, for records too large to hold in
+        memory. Each section is read and written chunk_size list elements at a time before
+        the next section is opened, all in a single transaction.
+        open_section(key, since) returns None for not modified or (fields, items), see
+        OrcidClient.stream_section.
+        since: {section: datetime} of the last ingest (incremental); groups whose sections
+        all come back not modified, or with the same 'last-modified-date', are left untouched.
+        work_details: optional fn(put_codes) -> {str(put-code): full work}, called per chunk
+        of put-codes once the works section is read (and its connection released) to add
+        contributors; only the put-codes are kept until then.
+        Returns False if nothing had to be written.
+        """
+        if self.conn is not None:
+            return self._save_profile_stream(self.conn, orcid, open_section, since or {}, chunk_size, work_details)
+        with pooled_connection() as conn:
+            return self._save_profile_stream(conn, orcid, open_section, since or {}, chunk_size, work_details)
+
+    def _save_profile_stream(self, conn, orcid, open_section, since, chunk_size, work_details):
+        cursor = conn.cursor()
+        ts = datetime.datetime.now()
+
+        try:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (self._string_to_bigint(f"profile/{orcid}"),))
+            cursor.execute(self.STREAM_SEEN_DDL)
+            print(f"--> Streaming profile data for {orcid}...")
+
+            stamps = {}
+            for group, keys in self.SECTION_GROUPS.items():
+                with metrics.span("orcid_save_section", section=group):
+                    skipped = []
+                    for key in keys:
+                        section = open_section(key, since.get(key))
+                        written = section is not None
+                        if written:
+                            written, stamp = self._save_section_stream(cursor, orcid, group, key, section, ts,
+                                                                       chunk_size, work_details, since.get(key))
+                        if written:
+                            stamps[key] = stamp
+                        else:
+                            skipped.append(key)
+                    if len(skipped) == len(keys):
+                        continue
+                    # The group is rewritten as a whole, so sections that did not change are needed too
+                    for key in skipped:
+                        _, stamps[key] = self._save_section_stream(cursor, orcid, group, key, open_section(key, None),
+                                                                   ts, chunk_size, work_details)
+                    if group in self.GROUP_TABLES:
+                        self._delete_unseen(cursor, group, orcid)
+
+            if not stamps:
+                conn.rollback()
+                print(f"⏭️ {orcid} unchanged since last ingest, skipping.")
+                return False
+
+            self.sync_state.save(cursor, orcid, stamps)
+
+            with metrics.span("orcid_save_section", section="commit"):
+                conn.commit()
+            self.dimensions.commit(conn)
+            self.orgs.commit(conn)
+            print("✅ Data committed successfully.")
+            return True
+
+        except Exception as e:
+            if isinstance(e, psycopg2.Error):
+                print(f"❌ Critical SQL Error (Rolling back transaction): {e}")
+            else:
+                # Network failures and bad response bodies surface here too, while a section is read
+                print(f"❌ Streaming {orcid} failed (Rolling back transaction): {type(e).__name__}: {e}")
+            conn.rollback()
+            self.dimensions.rollback(conn)
+            self.orgs.rollback(conn)
+            raise e
+        finally:
+            cursor.close()
+
+    def _save_section_stream(self, cursor, orcid, group, key, section, ts, chunk_size, work_details, since=None):
+        """
+        Writes one opened section chunk by chunk. Returns (written, upstream timestamp);
+        nothing is written if the section's 'last-modified-date' equals since, for servers
+        that answer 200 although it did not change.
+        """
+        fields, items = section
+        if group == "person":
+            stamp = self.sync_state.last_modified(fields)
+            if since is not None and stamp == since:
+                return False, stamp
+            self._prefetch_dimensions(cursor, {"person": fields})
+            self._save_profile_core(cursor, orcid, fields, ts)
+            return True, stamp
+
+        list_key = 'affiliation-group' if group == "affiliations" else 'group'
+        put_codes = []
+        try:
+            while True:
+                chunk = list(islice(items, chunk_size))
+                if since is not None:
+                    # Reading the first chunk has parsed the members before the list
+                    stamp = self.sync_state.last_modified(fields)
+                    if stamp == since:
+                        return False, stamp
+                    since = None
+                if not chunk:
+                    break
+                self._prefetch_dimensions(cursor, {key: {list_key: chunk}})
+                if group == "works":
+                    work_rows, ext_rows, _, _ = self._work_rows(cursor, orcid, chunk)
+                    written, kept = self._merge_rows_chunk(cursor, group, work_rows, orcid, ts)
+                    # Children of works already written by an earlier chunk (duplicate put-codes) are dropped
+                    self._merge_work_children(cursor, set(written), kept,
+                                              [row for row in ext_rows if row[0] in written], set(), [])
+                    if work_details:
+                        codes = {self._stable_id(orcid, 'work', code): code for code in self._work_put_codes(chunk)}
+                        put_codes.extend(codes[w_id] for w_id in written if w_id in codes)
+                else:
+                    rows = {"affiliations": self._affiliation_rows, "fundings": self._funding_rows,
+                            "peer_reviews": self._peer_review_rows,
+                            "research_resources": self._research_resource_rows}[group](cursor, orcid, chunk)
+                    self._merge_rows_chunk(cursor, group, rows, orcid, ts)
+        finally:
+            items.close()
+
+        # Fetching details needs connections of its own, so not while the works body still holds one
+        for i in range(0, len(put_codes), chunk_size):
+            self._save_contributors(cursor, orcid, put_codes[i:i + chunk_size], work_details)
+        return True, self.sync_state.last_modified(fields)
+
+    def _save_contributors(self, cursor, orcid, put_codes, work_details):
+        """Merges the contributors of already written works from their full details."""
+        details = work_details(put_codes)
+        rows, detailed_ids = [], set()
+        for code in put_codes:
+            work = details.get(str(code))
+            if work is None:
+                continue
+            w_id = self._stable_id(orcid, 'work', code)
+            try:
+                work_rows = self._contributor_rows(w_id, work)
+            except ROW_ERRORS as e:
+                metrics.incr("orcid_rows_skipped_total", section="work")
+                print(f"⚠️ Skipping contributors of work {code}: {e}")
+                continue
+            detailed_ids.add(w_id)
+            rows.extend(work_rows)
+        self._merge_children(cursor, "work_contributor", "work_id", self.CONTRIBUTOR_COLUMNS,
+                             detailed_ids, detailed_ids, rows)
+
+    def _work_put_codes(self, groups):
+        return [s['put-code'] for group in groups
+                for s in group.get('work-summary', []) if s.get('put-code') is not None]
+
+    def _changed_groups(self, cursor, orcid, data, stamps):
+        stored = self.sync_state.load(cursor, orcid)
+        changed = set()
+        for group, keys in self.SECTION_GROUPS.items():
+            if not any(self._section_changed(data.get(key), stamps[key], stored.get(key)) for key in keys):
+                continue
+            missing = [key for key in keys if data.get(key) is None]
+            if missing:
+                # The group is rewritten as a whole, so every section of it must be present
+                raise ValueError(f"Section(s) {missing} of {orcid} were not downloaded but '{group}' changed")
+            changed.add(group)
+        return changed
+
+    def _section_changed(self, section_data, new_stamp, old_stamp):
+        if section_data is None:
+            return False  # Not re-downloaded: the server said it is unchanged
+        if new_stamp is None:
+            return True  # No timestamp to compare, rewrite to be safe
+        return new_stamp != old_stamp
+
+    def _prefetch_dimensions(self, cursor, data):
+        countries, work_types, relationships, orgs = set(), set(), set(), []
+
+        def org_country(org):
+            countries.add(((org or {}).get('address') or {}).get('country'))
+            orgs.append(org)
+
+        for addr in ((data.get('person') or {}).get('addresses') or {}).get('address', []):
+            countries.add((addr.get('country') or {}).get('value'))
+        for key in ('employments', 'educations'):
+            for group in (data.get(key) or {}).get('affiliation-group', []):
+                for summary in group.get('summaries', []):
+                    org_country((summary.get('employment-summary') or summary.get('education-summary') or {}).get('organization'))
+        for group in (data.get('fundings') or {}).get('group', []):
+            for s in group.get('funding-summary', []):
+                org_country(s.get('organization'))
+        for group in (data.get('peer_reviews') or {}).get('group', []):
+            for s in group.get('peer-review-summary', []):
+                org_country(s.get('convening-organization'))
+        for group in (data.get('works') or {}).get('group', []):
+            for s in group.get('work-summary', []):
+                work_types.add(s.get('type'))
+                for ext in (s.get('external-ids') or {}).get('external-id', []):
+                    relationships.add(self._string_to_bigint(ext.get('external-id-relationship') or 'self'))
+
+        self.dimensions.resolve(cursor, "country", countries)
+        self.dimensions.resolve(cursor, "work_type", work_types)
+        self.dimensions.resolve(cursor, "relationship", relationships)
+        self.orgs.resolve(cursor, orgs)
 
     def _save_profile_core(self, cursor, orcid, person_data, ts):
         if not person_data: return
@@ -81,316 +564,218 @@ class OrcidRepository:
         # Record Name
         name = person_data.get('name', {})
         if name:
-            cursor.execute("DELETE FROM record_name WHERE orcid = %s", (orcid,))
-            cursor.execute("""
-                INSERT INTO record_name (id, orcid, given_names, family_name, credit_name, last_modified)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (self._generate_id(), orcid, 
-                  (name.get('given-names') or {}).get('value'),
-                  (name.get('family-name') or {}).get('value'),
-                  (name.get('credit-name') or {}).get('value'), ts))
+            self._merge_rows(cursor, "record_name", "id", ("given_names", "family_name", "credit_name"), [
+                (self._stable_id(orcid, 'record_name'),
+                 (name.get('given-names') or {}).get('value'),
+                 (name.get('family-name') or {}).get('value'),
+                 (name.get('credit-name') or {}).get('value'))
+            ], orcid, ts)
 
         # Biography
         bio = (person_data.get('biography') or {}).get('content')
         if bio:
-            cursor.execute("DELETE FROM biography WHERE orcid = %s", (orcid,))
-            cursor.execute("""
-                INSERT INTO biography (id, orcid, biography, last_modified) 
-                VALUES (%s, %s, %s, %s)
-            """, (self._generate_id(), orcid, bio, ts))
-
-        # Email
-        cursor.execute("DELETE FROM email WHERE orcid = %s", (orcid,))
-        for em in (person_data.get('emails') or {}).get('email', []):
-            if em.get('email'):
-                cursor.execute("""
-                    INSERT INTO email (email_id, orcid, email, last_modified) 
-                    VALUES (%s, %s, %s, %s)
-                """, (self._generate_id(), orcid, em['email'], ts))
-        
+            self._merge_rows(cursor, "biography", "id", ("biography",), [
+                (self._stable_id(orcid, 'biography'), bio)
+            ], orcid, ts)
+
+        # Email (no put-code on public emails, the address itself is the key)
+        self._merge_rows(cursor, "email", "email_id", ("email",), [
+            (self._stable_id(orcid, 'email', em['email']), em['email'])
+            for em in (person_data.get('emails') or {}).get('email', []) if em.get('email')
+        ], orcid, ts)
+
         # Other Name
-        cursor.execute("DELETE FROM other_name WHERE orcid = %s", (orcid,))
-        for on in (person_data.get('other-names') or {}).get('other-name', []):
-            if on.get('content'):
-                cursor.execute("""
-                    INSERT INTO other_name (other_name_id, orcid, display_name, last_modified) 
-                    VALUES (%s, %s, %s, %s)
-                """, (self._generate_id(), orcid, on['content'], ts))
+        self._merge_rows(cursor, "other_name", "other_name_id", ("display_name",), [
+            (self._stable_id(orcid, 'other_name', on.get('put-code') or on['content']), on['content'])
+            for on in (person_data.get('other-names') or {}).get('other-name', []) if on.get('content')
+        ], orcid, ts)
 
         # Researcher URL
-        cursor.execute("DELETE FROM researcher_url WHERE orcid = %s", (orcid,))
-        for url in (person_data.get('researcher-urls') or {}).get('researcher-url', []):
-             if url.get('url'):
-                cursor.execute("""
-                    INSERT INTO researcher_url (id, orcid, url, url_name, last_modified) 
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (self._generate_id(), orcid, url.get('url', {}).get('value'), url.get('url-name'), ts))
+        self._merge_rows(cursor, "researcher_url", "id", ("url", "url_name"), [
+            (self._stable_id(orcid, 'researcher_url', url.get('put-code') or (url.get('url') or {}).get('value')),
+             (url.get('url') or {}).get('value'), url.get('url-name'))
+            for url in (person_data.get('researcher-urls') or {}).get('researcher-url', []) if url.get('url')
+        ], orcid, ts)
 
         # Keywords
-        cursor.execute("DELETE FROM profile_keyword WHERE orcid = %s", (orcid,))
-        for kw in (person_data.get('keywords') or {}).get('keyword', []):
-            if kw.get('content'):
-                cursor.execute("""
-                    INSERT INTO profile_keyword (id, orcid, keywords_name, last_modified) 
-                    VALUES (%s, %s, %s, %s)
-                """, (self._generate_id(), orcid, kw['content'], ts))
-        
+        self._merge_rows(cursor, "profile_keyword", "id", ("keywords_name",), [
+            (self._stable_id(orcid, 'keyword', kw.get('put-code') or kw['content']), kw['content'])
+            for kw in (person_data.get('keywords') or {}).get('keyword', []) if kw.get('content')
+        ], orcid, ts)
+
         # Address
-        cursor.execute("DELETE FROM address WHERE orcid = %s", (orcid,))
+        rows = []
         for addr in (person_data.get('addresses') or {}).get('address', []):
             country_code = (addr.get('country') or {}).get('value')
-            country_id = self._get_country_id(cursor, country_code)
-            cursor.execute("""
-                INSERT INTO address (id, orcid, country_id, last_modified) 
-                VALUES (%s, %s, %s, %s)
-            """, (self._generate_id(), orcid, country_id, ts))
+            rows.append((self._stable_id(orcid, 'address', addr.get('put-code') or country_code),
+                         self._get_country_id(cursor, country_code)))
+        self._merge_rows(cursor, "address", "id", ("country_id",), rows, orcid, ts)
 
         # External Identifiers
-        cursor.execute("DELETE FROM profile_external_identifier WHERE orcid = %s", (orcid,))
-        for eid in (person_data.get('external-identifiers') or {}).get('external-identifier', []):
-             cursor.execute("""
-                INSERT INTO profile_external_identifier (id, orcid, external_id_reference, external_id_url, last_modified) 
-                VALUES (%s, %s, %s, %s, %s)
-             """, (self._generate_id(), orcid, eid.get('external-id-value'), eid.get('external-id-url', {}).get('value'), ts))
+        self._merge_rows(cursor, "profile_external_identifier", "id", ("external_id_reference", "external_id_url"), [
+            (self._stable_id(orcid, 'external_identifier', eid.get('put-code') or eid.get('external-id-value')),
+             eid.get('external-id-value'), (eid.get('external-id-url') or {}).get('value'))
+            for eid in (person_data.get('external-identifiers') or {}).get('external-identifier', [])
+        ], orcid, ts)
 
     def _save_affiliations(self, cursor, orcid, groups, ts):
-        # Clean up existing affiliations
-        # NOTE: We must handle dependencies if any child tables exist, but currently org_affiliation seems standalone or handled by CASCADE
-        # However, the SQL dump doesn't show ON DELETE CASCADE for 'org_affilaition_relation_external_identifier', so we delete that first.
-        
-        # 1. Find IDs to delete for clean up
-        cursor.execute("SELECT id FROM org_affiliation_relation WHERE orcid = %s", (orcid,))
-        existing_ids = [row[0] for row in cursor.fetchall()]
-        
-        if existing_ids:
-            # Delete children
-            cursor.execute("DELETE FROM org_affilaition_relation_external_identifier WHERE org_affilaition_relation_id = ANY(%s)", (existing_ids,))
-            # Delete parent
-            cursor.execute("DELETE FROM org_affiliation_relation WHERE orcid = %s", (orcid,))
-        
+        self._merge_group(cursor, "affiliations", self._affiliation_rows(cursor, orcid, groups), orcid, ts)
+
+    def _affiliation_rows(self, cursor, orcid, groups):
+        rows = []
         for group in groups:
             for summary in group.get('summaries', []):
-                s = summary.get('employment-summary') or summary.get('education-summary')
+                kind = 'employment' if summary.get('employment-summary') else 'education'
+                s = summary.get(f'{kind}-summary')
                 if not s: continue
 
                 try:
-                    cursor.execute("SAVEPOINT aff_sp")
-                    org_id = self._get_or_create_org(cursor, s.get('organization', {}))
-                    
-                    start_date = s.get('start-date') or {}
-                    end_date = s.get('end-date') or {}
-                    
-                    s_year = int((start_date.get('year') or {}).get('value', 0) or 0) or None
-                    e_year = int((end_date.get('year') or {}).get('value', 0) or 0) or None
-
-                    cursor.execute("""
-                        INSERT INTO org_affiliation_relation 
-                        (id, orcid, org_id, start_year, end_year, org_affiliation_relation_title, department, last_modified)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (self._generate_id(), orcid, org_id, s_year, e_year, s.get('role-title'), s.get('department-name'), ts))
-                    cursor.execute("RELEASE SAVEPOINT aff_sp")
-                except Exception as e:
+                    s_year = self._year(s.get('start-date'))
+                    e_year = self._year(s.get('end-date'))
+                    org_id = self._get_or_create_org(cursor, s.get('organization') or {})
+                    rows.append((self._stable_id(orcid, kind, self._put_code(s)), org_id, s_year, e_year,
+                                 s.get('role-title'), s.get('department-name')))
+                except ROW_ERRORS as e:
+                    metrics.incr("orcid_rows_skipped_total", section="affiliation")
                     print(f"⚠️ Skipping affiliation (Error: {e})")
-                    cursor.execute("ROLLBACK TO SAVEPOINT aff_sp")
+        return rows
 
     def _save_fundings(self, cursor, orcid, groups, ts):
-        # Clean up children first
-        cursor.execute("SELECT id FROM profile_funding WHERE orcid = %s", (orcid,))
-        f_ids = [row[0] for row in cursor.fetchall()]
-        if f_ids:
-            cursor.execute("DELETE FROM profile_funding_contributor WHERE profile_funding_id = ANY(%s)", (f_ids,))
-            cursor.execute("DELETE FROM profile_funding_external_identifier WHERE profile_funding_id = ANY(%s)", (f_ids,))
-            cursor.execute("DELETE FROM profile_funding WHERE orcid = %s", (orcid,))
-        
+        self._merge_group(cursor, "fundings", self._funding_rows(cursor, orcid, groups), orcid, ts)
+
+    def _funding_rows(self, cursor, orcid, groups):
+        rows = []
         for group in groups:
             for s in group.get('funding-summary', []):
                 try:
-                    cursor.execute("SAVEPOINT fund_sp")
-                    
-                    start_date = s.get('start-date') or {}
-                    s_year = int((start_date.get('year') or {}).get('value', 0) or 0) or None
-                    
+                    s_year = self._year(s.get('start-date'))
+
                     amount_str = (s.get('amount') or {}).get('value')
                     amount = float(amount_str) if amount_str else None
-                    
-                    org_id = self._get_or_create_org(cursor, s.get('organization', {}))
-
-                    cursor.execute("""
-                        INSERT INTO profile_funding 
-                        (id, orcid, title, type, start_year, numeric_amount, currency_code, org_id, last_modified)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (self._generate_id(), orcid, 
-                          (s.get('title') or {}).get('title', {}).get('value'), 
-                          s.get('type'), 
-                          s_year, amount, 
-                          (s.get('amount') or {}).get('currency-code'), org_id, ts))
-                    cursor.execute("RELEASE SAVEPOINT fund_sp")
-                except Exception as e:
+
+                    org_id = self._get_or_create_org(cursor, s.get('organization') or {})
+                    rows.append((self._stable_id(orcid, 'funding', self._put_code(s)),
+                                 ((s.get('title') or {}).get('title') or {}).get('value'),
+                                 s.get('type'),
+                                 s_year, amount,
+                                 (s.get('amount') or {}).get('currency-code'), org_id))
+                except ROW_ERRORS as e:
+                    metrics.incr("orcid_rows_skipped_total", section="funding")
                     print(f"⚠️ Skipping funding (Error: {e})")
-                    cursor.execute("ROLLBACK TO SAVEPOINT fund_sp")
+        return rows
 
     def _save_peer_reviews(self, cursor, orcid, groups, ts):
-        # Clean up children first
-        cursor.execute("SELECT id FROM peer_review WHERE orcid = %s", (orcid,))
-        pr_ids = [row[0] for row in cursor.fetchall()]
-        if pr_ids:
-            cursor.execute("DELETE FROM peer_review_external_identifier WHERE peer_review_id = ANY(%s)", (pr_ids,))
-            cursor.execute("DELETE FROM peer_review WHERE orcid = %s", (orcid,))
+        self._merge_group(cursor, "peer_reviews", self._peer_review_rows(cursor, orcid, groups), orcid, ts)
 
+    def _peer_review_rows(self, cursor, orcid, groups):
+        rows = []
         for group in groups:
             for s in group.get('peer-review-summary', []):
                 try:
-                    cursor.execute("SAVEPOINT peer_sp")
-                    org_id = self._get_or_create_org(cursor, s.get('convening-organization', {}))
-                    
-                    # Explicit column naming to avoid mismatch
-                    cursor.execute("""
-                        INSERT INTO peer_review (id, orcid, org_id, subject_name, last_modified)
-                        VALUES (%s, %s, %s, %s, %s) 
-                    """, (self._generate_id(), orcid, org_id, (s.get('review-group-id') or '')[:1000], ts))
-                    cursor.execute("RELEASE SAVEPOINT peer_sp")
-                except Exception as e:
+                    org_id = self._get_or_create_org(cursor, s.get('convening-organization') or {})
+                    rows.append((self._stable_id(orcid, 'peer_review', self._put_code(s)),
+                                 org_id, (s.get('review-group-id') or '')[:1000]))
+                except ROW_ERRORS as e:
+                    metrics.incr("orcid_rows_skipped_total", section="peer_review")
                     print(f"⚠️ Skipping peer review (Error: {e})")
-                    cursor.execute("ROLLBACK TO SAVEPOINT peer_sp")
+        return rows
 
     def _save_research_resources(self, cursor, orcid, groups, ts):
-        # Clean up children first
-        cursor.execute("SELECT id FROM research_resource WHERE orcid = %s", (orcid,))
-        rr_ids = [row[0] for row in cursor.fetchall()]
-        if rr_ids:
-            cursor.execute("DELETE FROM research_resource_item WHERE research_resource_id = ANY(%s)", (rr_ids,))
-            cursor.execute("DELETE FROM research_resource_external_identifier WHERE research_resource_id = ANY(%s)", (rr_ids,))
-            cursor.execute("DELETE FROM research_resource WHERE orcid = %s", (orcid,))
+        self._merge_group(cursor, "research_resources", self._research_resource_rows(cursor, orcid, groups), orcid, ts)
 
+    def _research_resource_rows(self, cursor, orcid, groups):
+        rows = []
         for group in groups:
-             for s in group.get('research-resource-summary', []):
+            for s in group.get('research-resource-summary', []):
                 try:
-                    cursor.execute("SAVEPOINT res_sp")
-                    title = (s.get('title') or {}).get('title', {}).get('value')
-                    cursor.execute("""
-                        INSERT INTO research_resource (id, orcid, title, last_modified)
-                        VALUES (%s, %s, %s, %s)
-                    """, (self._generate_id(), orcid, title, ts))
-                    cursor.execute("RELEASE SAVEPOINT res_sp")
-                except Exception as e:
+                    title = ((s.get('title') or {}).get('title') or {}).get('value')
+                    rows.append((self._stable_id(orcid, 'research_resource', self._put_code(s)), title))
+                except ROW_ERRORS as e:
+                    metrics.incr("orcid_rows_skipped_total", section="research_resource")
                     print(f"⚠️ Skipping research resource (Error: {e})")
-                    cursor.execute("ROLLBACK TO SAVEPOINT res_sp")
+        return rows
 
-    def _save_works(self, cursor, orcid, groups, ts):
+    def _save_works(self, cursor, orcid, groups, ts, details=None):
         """
-        STRATEGY CHANGE: 
-        We cannot use 'put-code' as work_id because it is not globally unique (only unique per orcid).
-        We cannot use 'ON CONFLICT' because we are generating random IDs.
-        Therefore, we perform a full DELETE of works for this ORCID before inserting.
+        'put-code' is only unique per ORCID, so work_id is a hash of (orcid, 'work', put-code).
+        That key is stable across runs, so works are merged: only new, changed and
+        removed works (and their external IDs) are written.
+        details ({str(put-code): full work}) adds contributors; work summaries do not have them.
         """
-        
-        # 1. Get current work IDs for this user to safely delete children first
-        cursor.execute("SELECT work_id FROM work WHERE orcid = %s", (orcid,))
-        existing_work_ids = [row[0] for row in cursor.fetchall()]
-
-        if existing_work_ids:
-            # 2. Delete children tables (Manually, because SQL schema lacks ON DELETE CASCADE)
-            cursor.execute("DELETE FROM work_external_identifier WHERE work_id = ANY(%s)", (existing_work_ids,))
-            cursor.execute("DELETE FROM work_contributor WHERE work_id = ANY(%s)", (existing_work_ids,))
-            
-            # 3. Delete the parent works
-            cursor.execute("DELETE FROM work WHERE orcid = %s", (orcid,))
-
-        # 4. Insert new works
+        work_rows, ext_rows, contributor_rows, detailed_ids = self._work_rows(cursor, orcid, groups, details)
+        kept = self._merge_group(cursor, "works", work_rows, orcid, ts)
+        self._merge_work_children(cursor, {row[0] for row in work_rows}, kept, ext_rows, detailed_ids, contributor_rows)
+
+    def _work_rows(self, cursor, orcid, groups, details=None):
+        """Returns (work rows, external ID rows, contributor rows, IDs of works with details)."""
+        work_rows = []
+        ext_rows = []
+        contributor_rows = []
+        detailed_ids = set()
         for group in groups:
             for s in group.get('work-summary', []):
                 try:
-                    cursor.execute("SAVEPOINT work_sp")
-                    
-                    # Generate a GLOBAL UNIQUE ID, do not use put-code
-                    w_id = self._generate_id()
-                    
-                    title = (s.get('title') or {}).get('title', {}).get('value')
-                    venue = (s.get('journal-title') or {}).get('value') 
-                    
-                    type_str = s.get('type')
-                    type_id = self._get_work_type_id(cursor, type_str)
-                    
-                    cursor.execute("""
-                        INSERT INTO work (work_id, title, journal_title, orcid, work_type_id, last_modified)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (w_id, title, venue, orcid, type_id, ts))
-
-                    # External IDs
+                    w_id = self._stable_id(orcid, 'work', self._put_code(s))
+
+                    title = ((s.get('title') or {}).get('title') or {}).get('value')
+                    venue = (s.get('journal-title') or {}).get('value')
+                    type_id = self._get_work_type_id(cursor, s.get('type'))
+
+                    work_ext_rows = []
                     for ext in (s.get('external-ids') or {}).get('external-id', []):
                         rel_name = ext.get('external-id-relationship') or 'self'
                         # Use the hash-based ID lookup
                         rel_id = self._get_relationship_id(cursor, rel_name)
-
-                        cursor.execute("""
-                            INSERT INTO work_external_identifier (work_id, type, value, url, relationship_id)
-                            VALUES (%s, %s, %s, %s, %s)
-                        """, (w_id, ext.get('external-id-type'), ext.get('external-id-value'), ext.get('external-id-url', {}).get('value'), rel_id))
-                    
-                    cursor.execute("RELEASE SAVEPOINT work_sp")
-                except Exception as e:
-                    # print(f"⚠️ Skipping work {s.get('put-code')}: {e}")
-                    cursor.execute("ROLLBACK TO SAVEPOINT work_sp")
-
+                        work_ext_rows.append((w_id, ext.get('external-id-type'), ext.get('external-id-value'),
+                                              (ext.get('external-id-url') or {}).get('value'), rel_id))
+
+                    work = (details or {}).get(str(s.get('put-code')))
+                    work_contributor_rows = self._contributor_rows(w_id, work) if work is not None else None
+                except ROW_ERRORS as e:
+                    metrics.incr("orcid_rows_skipped_total", section="work")
+                    print(f"⚠️ Skipping work {s.get('put-code')}: {e}")
+                    continue
+
+                work_rows.append((w_id, title, venue, type_id))
+                ext_rows.extend(work_ext_rows)
+                if work_contributor_rows is not None:
+                    detailed_ids.add(w_id)
+                    contributor_rows.extend(work_contributor_rows)
+        return work_rows, ext_rows, contributor_rows, detailed_ids
+
+    def _merge_work_children(self, cursor, work_ids, kept, ext_rows, detailed_ids, contributor_rows):
+        """kept: the work_ids that existed before (their children may need no rewrite)."""
+        self._merge_children(cursor, "work_external_identifier", "work_id", ("type", "value", "url", "relationship_id"),
+                             work_ids, kept, ext_rows)
+        # Only works we have details for; contributors of the others are left as they are
+        self._merge_children(cursor, "work_contributor", "work_id", self.CONTRIBUTOR_COLUMNS,
+                             detailed_ids, kept & detailed_ids, contributor_rows)
+
+    def _contributor_rows(self, w_id, work):
+        rows = []
+        for c in (work.get('contributors') or {}).get('contributor') or []:
+            attrs = c.get('contributor-attributes') or {}
+            rows.append((w_id,
+                         (c.get('contributor-orcid') or {}).get('path'),
+                         (c.get('credit-name') or {}).get('value'),
+                         attrs.get('contributor-role'),
+                         attrs.get('contributor-sequence')))
+        return rows
+
+    # Per-row lookups normally hit what _prefetch_dimensions resolved; they are left out of
+    # the cache stats, which would otherwise count every value twice.
     def _get_or_create_org(self, cursor, org_data):
-        name = org_data.get('name')
-        if not name: return None
-        
-        addr = org_data.get('address') or {}
-        city = addr.get('city')
-        region = addr.get('region')
-        country_code = addr.get('country')
-        country_id = self._get_country_id(cursor, country_code)
-
-        cursor.execute("SELECT id FROM org WHERE name = %s AND (city = %s OR city IS NULL)", (name, city))
-        res = cursor.fetchone()
-        if res: return res[0]
-
-        new_id = self._generate_id()
-        cursor.execute("""
-            INSERT INTO org (id, name, city, region, country_id, date_created) 
-            VALUES (%s, %s, %s, %s, %s, NOW()) 
-            RETURNING id
-        """, (new_id, name, city, region, country_id))
-        return cursor.fetchone()[0]
+        key = self.orgs.key(org_data)
+        if not key: return None
+        return self.orgs.resolve(cursor, [org_data], count=False).get(key)
 
     def _get_country_id(self, cursor, iso2_code):
         if not iso2_code: return None
-        
-        cursor.execute("SELECT id FROM country WHERE iso2_code = %s", (iso2_code,))
-        res = cursor.fetchone()
-        if res: return res[0]
-        
-        try:
-            cursor.execute("SAVEPOINT country_insert")
-            cursor.execute("INSERT INTO country (iso2_code) VALUES (%s) RETURNING id", (iso2_code,))
-            cid = cursor.fetchone()[0]
-            cursor.execute("RELEASE SAVEPOINT country_insert")
-            return cid
-        except Exception:
-            cursor.execute("ROLLBACK TO SAVEPOINT country_insert")
-            cursor.execute("SELECT id FROM country WHERE iso2_code = %s", (iso2_code,))
-            res = cursor.fetchone()
-            return res[0] if res else None
+        return self.dimensions.resolve(cursor, "country", [iso2_code], count=False).get(iso2_code)
 
     def _get_work_type_id(self, cursor, type_str):
         if not type_str: return None
-        
-        cursor.execute("SELECT id FROM work_type WHERE work_type = %s", (type_str,))
-        res = cursor.fetchone()
-        if res: return res[0]
-        
-        try:
-            cursor.execute("SAVEPOINT work_type_insert")
-            cursor.execute("INSERT INTO work_type (work_type) VALUES (%s) RETURNING id", (type_str,))
-            tid = cursor.fetchone()[0]
-            cursor.execute("RELEASE SAVEPOINT work_type_insert")
-            return tid
-        except Exception:
-            cursor.execute("ROLLBACK TO SAVEPOINT work_type_insert")
-            cursor.execute("SELECT id FROM work_type WHERE work_type = %s", (type_str,))
-            res = cursor.fetchone()
-            return res[0] if res else None
+        return self.dimensions.resolve(cursor, "work_type", [type_str], count=False).get(type_str)
 
     def _get_relationship_id(self, cursor, rel_name):
         """
@@ -399,24 +784,7 @@ class OrcidRepository:
         the database expects a BigInt in the 'relationship' column.
         """
         if not rel_name: return None
-        
+
         # Generate a deterministic number for this string
         rel_val_as_int = self._string_to_bigint(rel_name)
-
-        # Check if we already have an ID for this 'value'
-        cursor.execute("SELECT id FROM external_id_relationship WHERE relationship = %s", (rel_val_as_int,))
-        res = cursor.fetchone()
-        if res: return res[0]
-
-        try:
-            cursor.execute("SAVEPOINT rel_insert")
-            # Insert the generated integer into the 'relationship' column
-            cursor.execute("INSERT INTO external_id_relationship (relationship) VALUES (%s) RETURNING id", (rel_val_as_int,))
-            rid = cursor.fetchone()[0]
-            cursor.execute("RELEASE SAVEPOINT rel_insert")
-            return rid
-        except Exception:
-            cursor.execute("ROLLBACK TO SAVEPOINT rel_insert")
-            cursor.execute("SELECT id FROM external_id_relationship WHERE relationship = %s", (rel_val_as_int,))
-            res = cursor.fetchone()
-            return res[0] if res else None
\ No newline at end of file
+        return self.dimensions.resolve(cursor, "relationship", [rel_val_as_int], count=False).get(rel_val_as_int)
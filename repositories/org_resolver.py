@@ -0,0 +1,221 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from psycopg2.extras import execute_values
+from database import execute_rows
+from repositories.dimension_cache import dimension_cache
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _fold(text):
+    """Unicode-normalised, case-folded text with runs of whitespace collapsed."""
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+
+class OrgResolver:
+    """
+    Resolves ORCID organization objects to org ids in bulk.
+
+    Every org gets a normalised key: the disambiguated-organization identifier
+    (e.g. 'ror:https://ror.org/008fyn775') when ORCID has one, otherwise the folded
+    name|city|country. The key is stored in org.norm_key under a unique index, so
+    all orgs of a profile are found with one SELECT and the missing ones created
+    with one INSERT ... ON CONFLICT DO NOTHING, which is also safe against
+    concurrent writers.
+
+    Like DimensionCache, the in-memory index is process-wide and ids inserted by a
+    transaction are only published after commit(conn).
+    """
+
+    DDL = """
+        ALTER TABLE org ADD COLUMN IF NOT EXISTS norm_key text;
+        CREATE UNIQUE INDEX IF NOT EXISTS org_norm_key_idx ON org (norm_key);
+    """
+
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._pending = {}  # connection -> {norm_key: id}
+        self.hits = 0
+        self.misses = 0
+
+    def ensure_schema(self, cursor):
+        """
+        Adds org.norm_key and its index on first use. Both are looked up first: even with
+        IF NOT EXISTS the DDL takes an exclusive lock on org, which would stall every
+        writer already running whenever another worker starts.
+        """
+        cursor.execute("""
+            SELECT
+                EXISTS (SELECT 1 FROM information_schema.columns
+                        WHERE table_name = 'org' AND column_name = 'norm_key'
+                          AND table_schema = ANY(current_schemas(false))),
+                EXISTS (SELECT 1 FROM pg_indexes
+                        WHERE tablename = 'org' AND indexname = 'org_norm_key_idx'
+                          AND schemaname = ANY(current_schemas(false)))
+        """)
+        has_column, has_index = cursor.fetchone()
+        if has_column and has_index:
+            return
+        cursor.execute(self.DDL)
+        if not has_column:
+            # Same transaction as the ALTER, so the backfill runs exactly once
+            self._backfill(cursor)
+
+    def _backfill(self, cursor):
+        """
+        Gives orgs created before norm_key existed a key; the oldest row wins on duplicates.
+        Only name keys can be rebuilt from the stored columns; resolve() matches identifier
+        keys against them before creating an org (_select_by_name).
+        """
+        cursor.execute("""
+            SELECT o.id, o.name, o.city, c.iso2_code
+            FROM org o LEFT JOIN country c ON c.id = o.country_id
+            WHERE o.norm_key IS NULL
+            ORDER BY o.date_created NULLS LAST, o.id
+        """)
+        keyed = {}
+        for org_id, name, city, country in cursor.fetchall():
+            key = self._name_key(name, city, country)
+            if key:
+                keyed.setdefault(key, org_id)
+        if not keyed:
+            return
+        execute_values(cursor, """
+            UPDATE org SET norm_key = v.norm_key
+            FROM (VALUES %s) AS v (id, norm_key)
+            WHERE org.id = v.id::bigint
+              AND NOT EXISTS (SELECT 1 FROM org taken WHERE taken.norm_key = v.norm_key)
+        """, [(org_id, key) for key, org_id in keyed.items()], page_size=1000)
+
+    @staticmethod
+    def _name_key(name, city, country):
+        name = _fold(name)
+        if not name:
+            return None
+        return f"name:{name}|{_fold(city)}|{_fold(country)}"
+
+    @classmethod
+    def key(cls, org_data):
+        """Normalised key of an ORCID organization object, or None if it has no name."""
+        if not org_data or not org_data.get('name'):
+            return None
+        disambiguated = org_data.get('disambiguated-organization') or {}
+        identifier = _fold(disambiguated.get('disambiguated-organization-identifier'))
+        if identifier:
+            source = _fold(disambiguated.get('disambiguation-source')) or "unknown"
+            return f"{source}:{identifier}"
+        return cls._org_name_key(org_data)
+
+    @classmethod
+    def _org_name_key(cls, org_data):
+        addr = org_data.get('address') or {}
+        return cls._name_key(org_data['name'], addr.get('city'), addr.get('country'))
+
+    def resolve(self, cursor, orgs, count=True):
+        """
+        Returns {norm_key: org id} for every named org in orgs, creating missing ones.
+        count=False leaves the hit/miss stats alone (see DimensionCache.resolve).
+        """
+        wanted = {}
+        for org in orgs:
+            key = self.key(org)
+            if key:
+                wanted.setdefault(key, org)
+
+        conn = cursor.connection
+        found = {}
+        with self._lock:
+            pending = self._pending.get(conn, {})
+            for key in wanted:
+                org_id = self._ids.get(key) or pending.get(key)
+                if org_id:
+                    found[key] = org_id
+            if count:
+                self.hits += len(found)
+                self.misses += len(wanted) - len(found)
+
+        missing = wanted.keys() - found.keys()
+        if not missing:
+            return found
+
+        selected = self._select(cursor, missing)
+        new_keys = missing - selected.keys()
+        if new_keys:
+            selected.update(self._select_by_name(cursor, {key: wanted[key] for key in new_keys}))
+            new_keys -= selected.keys()
+        inserted = {}
+        if new_keys:
+            countries = self.dimensions.resolve(
+                cursor, "country", [(wanted[k].get('address') or {}).get('country') for k in new_keys], count=False)
+            rows = []
+            # Sorted, so concurrent writers creating the same orgs lock them in the same order
+            for key in sorted(new_keys):
+                org = wanted[key]
+                addr = org.get('address') or {}
+                rows.append((self._org_id(key), org['name'], addr.get('city'), addr.get('region'),
+                             countries.get(addr.get('country')), key))
+            # DO NOTHING: a concurrent writer may create the same org first; re-select it below.
+            # An org the table rejects (e.g. a name too long) is skipped and resolves to None.
+            query = """
+                INSERT INTO org (id, name, city, region, country_id, norm_key, date_created)
+                SELECT v.id::bigint, v.name, v.city, v.region, v.country_id::bigint, v.norm_key, NOW()
+                FROM (VALUES %s) AS v (id, name, city, region, country_id, norm_key)
+                ON CONFLICT DO NOTHING
+                RETURNING norm_key, id
+            """
+            _, result = execute_rows(cursor, rows, lambda cur, batch: execute_values(
+                cur, query, batch, page_size=len(batch), fetch=True), "org")
+            inserted = dict(result)
+            lost = new_keys - inserted.keys()
+            if lost:
+                selected.update(self._select(cursor, lost))
+
+        with self._lock:
+            self._ids.update(selected)
+            self._pending.setdefault(conn, {}).update(inserted)
+        found.update(selected)
+        found.update(inserted)
+        return found
+
+    def _org_id(self, key):
+        # Deterministic 63-bit id, so the same org gets the same id in every database
+        return int(hashlib.sha256(f"org/{key}".encode("utf-8")).hexdigest(), 16) % (2**63 - 1)
+
+    def _select_by_name(self, cursor, orgs):
+        """
+        {key: org id} for orgs with an identifier key that are stored under their name key.
+        NOTE: the org table from the SQL dump has no disambiguation id column, so orgs created
+        before norm_key existed were backfilled with name keys only; without this fallback
+        every one of them with a ROR / Ringgold / GRID id would be created a second time.
+        """
+        name_keys = {key: self._org_name_key(org) for key, org in orgs.items()}
+        name_keys = {key: name_key for key, name_key in name_keys.items() if name_key and name_key != key}
+        if not name_keys:
+            return {}
+        by_name = self._select(cursor, set(name_keys.values()))
+        return {key: by_name[name_key] for key, name_key in name_keys.items() if name_key in by_name}
+
+    def _select(self, cursor, keys):
+        cursor.execute("SELECT norm_key, id FROM org WHERE norm_key = ANY(%s)", (list(keys),))
+        return dict(cursor.fetchall())
+
+    def commit(self, conn):
+        """Publishes the org ids inserted on conn. Call after conn.commit()."""
+        with self._lock:
+            self._ids.update(self._pending.pop(conn, {}))
+
+    def rollback(self, conn):
+        """Forgets the org ids inserted on conn. Call after conn.rollback()."""
+        with self._lock:
+            self._pending.pop(conn, None)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._ids)}
+
+# Shared by every OrcidRepository in the process
+org_resolver = OrgResolver(dimension_cache)
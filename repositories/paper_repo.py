@@ -0,0 +1,182 @@
+from psycopg2.extras import execute_values
+from database import db_cursor, pooled_connection
+from models import PaperBatch, StandardPaper
+
+class PaperRepository:
+    """Stores StandardPaper objects from every source in the unified `papers` table."""
+
+    DDL = """
+        CREATE TABLE IF NOT EXISTS papers (
+            id bigserial PRIMARY KEY,
+            source_id text NOT NULL,
+            source_name text NOT NULL,
+            title text,
+            authors_json jsonb,
+            year integer,
+            venue text,
+            doi text,
+            UNIQUE (source_id, source_name)
+        );
+        -- Duplicate cluster (smallest papers.id of the cluster), filled by dedup_papers.py
+        ALTER TABLE papers ADD COLUMN IF NOT EXISTS cluster_id bigint;
+        CREATE INDEX IF NOT EXISTS papers_cluster_id_idx ON papers (cluster_id);
+        -- LSH buckets (and DOI) of every clustered paper (DedupIndex.lsh_keys), so a run
+        -- only loads the papers a new batch can match
+        CREATE TABLE IF NOT EXISTS paper_lsh (
+            band smallint NOT NULL,
+            bucket bigint NOT NULL,
+            paper_id bigint NOT NULL REFERENCES papers (id) ON DELETE CASCADE,
+            PRIMARY KEY (band, bucket, paper_id)
+        );
+        CREATE INDEX IF NOT EXISTS paper_lsh_paper_id_idx ON paper_lsh (paper_id);
+    """
+
+    COLUMNS = ("source_id", "source_name", "title", "authors_json", "year", "venue", "doi")
+
+    # Per-session staging table for COPY; emptied at the end of every transaction
+    STAGING_DDL = """
+        CREATE TEMP TABLE IF NOT EXISTS papers_staging (
+            source_id text, source_name text, title text, authors_json jsonb,
+            year integer, venue text, doi text
+        ) ON COMMIT DELETE ROWS
+    """
+
+    def __init__(self, conn=None):
+        """conn: optional connection owned by the caller; otherwise each call borrows a pooled one."""
+        self.conn = conn
+
+    def _run(self, fn, *args):
+        if self.conn is not None:
+            with self.conn.cursor() as cursor:
+                result = fn(cursor, *args)
+            self.conn.commit()
+            return result
+        with db_cursor() as (conn, cursor):
+            result = fn(cursor, *args)
+            conn.commit()
+            return result
+
+    def ensure_table(self):
+        self._run(lambda cursor: cursor.execute(self.DDL))
+
+    def save_batch(self, papers):
+        """
+        Upserts papers (a PaperBatch or StandardPaper objects) with one multi-row
+        INSERT ... ON CONFLICT in one transaction. Returns the number of rows written.
+        """
+        tuples = papers.to_tuples() if isinstance(papers, PaperBatch) else (p.to_db_tuple() for p in papers)
+        # A statement may not update the same row twice, so keep the last copy of each key
+        rows = list({(t[0], t[1]): t for t in tuples}.values())
+        if not rows:
+            return 0
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in self.COLUMNS[2:])
+
+        def upsert(cursor):
+            execute_values(cursor, f"""
+                INSERT INTO papers ({', '.join(self.COLUMNS)}) VALUES %s
+                ON CONFLICT (source_id, source_name) DO UPDATE SET {updates}
+            """, rows, page_size=len(rows))
+            return len(rows)
+        return self._run(upsert)
+
+    def copy_batch(self, papers):
+        """
+        Loads papers (a PaperBatch or StandardPaper objects) with COPY into a temporary
+        staging table and upserts them into papers with one INSERT ... SELECT. Much
+        faster than INSERT for large batches. Returns the number of rows written.
+        """
+        if not isinstance(papers, PaperBatch):
+            papers = PaperBatch.from_papers(papers)
+        if not len(papers):
+            return 0
+        buf = papers.to_copy_buffer()
+        columns = ", ".join(self.COLUMNS)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in self.COLUMNS[2:])
+
+        def copy(cursor):
+            cursor.execute(self.STAGING_DDL)
+            cursor.copy_expert(f"COPY papers_staging ({columns}) FROM STDIN", buf)
+            # DISTINCT ON: a statement may not update the same row twice
+            cursor.execute(f"""
+                INSERT INTO papers ({columns})
+                SELECT DISTINCT ON (source_id, source_name) {columns} FROM papers_staging
+                ON CONFLICT (source_id, source_name) DO UPDATE SET {updates}
+            """)
+            return cursor.rowcount
+        return self._run(copy)
+
+    def iter_papers(self, clustered, batch_size=10000):
+        """
+        Streams (id, StandardPaper, cluster_id) for papers that already have a cluster
+        (clustered=True) or not yet, in id order, through a server-side cursor.
+        """
+        yield from self._iter_rows(f"WHERE cluster_id IS {'NOT ' if clustered else ''}NULL", (), batch_size)
+
+    def iter_candidates(self, lsh_keys, max_bucket=1000, batch_size=10000):
+        """
+        Streams (id, StandardPaper, cluster_id), in id order, for the whole clusters of
+        the papers stored under any of the (band, bucket) lsh_keys. Like DedupIndex,
+        only the max_bucket smallest ids of a bucket are taken.
+        """
+        bands, buckets = zip(*lsh_keys) if lsh_keys else ((), ())
+        yield from self._iter_rows("""
+            WHERE cluster_id IN (
+                SELECT p.cluster_id FROM papers p
+                JOIN (
+                    SELECT l.paper_id,
+                           row_number() OVER (PARTITION BY l.band, l.bucket ORDER BY l.paper_id) AS n
+                    FROM paper_lsh l
+                    JOIN unnest(%s::smallint[], %s::bigint[]) AS k (band, bucket) USING (band, bucket)
+                ) hit ON hit.paper_id = p.id AND hit.n <= %s
+            )
+        """, (list(bands), list(buckets), max_bucket), batch_size)
+
+    def _iter_rows(self, where, params, batch_size):
+        with pooled_connection() as conn:
+            with conn.cursor(name="iter_papers") as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(f"""
+                    SELECT id, {', '.join(self.COLUMNS)}, cluster_id FROM papers
+                    {where}
+                    ORDER BY id
+                """, params)
+                for row in cursor:
+                    paper = StandardPaper(source_id=row[1], source_name=row[2], title=row[3],
+                                          authors=row[4] or [], year=row[5], venue=row[6], doi=row[7])
+                    yield row[0], paper, row[8]
+
+    def needs_lsh_backfill(self):
+        """True if papers were clustered before paper_lsh existed (it is still empty)."""
+        def check(cursor):
+            cursor.execute("""
+                SELECT EXISTS (SELECT 1 FROM papers WHERE cluster_id IS NOT NULL)
+                   AND NOT EXISTS (SELECT 1 FROM paper_lsh)
+            """)
+            return cursor.fetchone()[0]
+        return self._run(check)
+
+    def save_clusters(self, cluster_ids, lsh_rows=()):
+        """
+        Writes {paper id: cluster id} with one UPDATE ... FROM (VALUES ...), and the
+        (band, bucket, paper id) rows of newly clustered papers into paper_lsh, in one
+        transaction. Returns the number of cluster ids written.
+        """
+        rows = list(cluster_ids.items())
+        lsh_rows = list(lsh_rows)
+        if not rows and not lsh_rows:
+            return 0
+
+        def update(cursor):
+            if rows:
+                execute_values(cursor, """
+                    UPDATE papers SET cluster_id = v.cluster_id
+                    FROM (VALUES %s) AS v (id, cluster_id)
+                    WHERE papers.id = v.id
+                """, rows, page_size=10000)
+            if lsh_rows:
+                execute_values(cursor, """
+                    INSERT INTO paper_lsh (band, bucket, paper_id) VALUES %s
+                    ON CONFLICT DO NOTHING
+                """, lsh_rows, page_size=10000)
+            return len(rows)
+        return self._run(update)
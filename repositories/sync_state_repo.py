@@ -0,0 +1,43 @@
+import datetime
+from psycopg2.extras import execute_values
+
+class SyncStateRepository:
+    """
+    Remembers the upstream 'last-modified-date' of every ORCID section we stored,
+    so incremental runs can tell which sections changed since the last ingest.
+    """
+
+    DDL = """
+        CREATE TABLE IF NOT EXISTS ingest_sync_state (
+            orcid varchar(19) NOT NULL,
+            section text NOT NULL,
+            upstream_modified timestamptz NOT NULL,
+            synced_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (orcid, section)
+        )
+    """
+
+    def ensure_table(self, cursor):
+        cursor.execute(self.DDL)
+
+    @staticmethod
+    def last_modified(section_data):
+        """Returns the section's 'last-modified-date' as an aware UTC datetime, or None."""
+        millis = ((section_data or {}).get('last-modified-date') or {}).get('value')
+        if not millis:
+            return None
+        return datetime.datetime.fromtimestamp(int(millis) / 1000, tz=datetime.timezone.utc)
+
+    def load(self, cursor, orcid):
+        """Returns {section: upstream_modified} for everything stored for this ORCID."""
+        cursor.execute("SELECT section, upstream_modified FROM ingest_sync_state WHERE orcid = %s", (orcid,))
+        return dict(cursor.fetchall())
+
+    def save(self, cursor, orcid, stamps):
+        rows = [(orcid, section, ts) for section, ts in stamps.items() if ts]
+        if not rows: return
+        execute_values(cursor, """
+            INSERT INTO ingest_sync_state (orcid, section, upstream_modified) VALUES %s
+            ON CONFLICT (orcid, section) DO UPDATE
+            SET upstream_modified = EXCLUDED.upstream_modified, synced_at = now()
+        """, rows, page_size=len(rows))
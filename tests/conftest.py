@@ -0,0 +1,42 @@
+import os
+import sys
+import uuid
+
+import pytest
+
+# The modules live at the repository root, which is not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def pg_conn(monkeypatch):
+    """
+    A connection to the PostgreSQL database configured by DB_* (.env) whose search_path
+    is a fresh schema, dropped afterwards; the connection pool uses that schema too.
+    Tests using it are skipped without a database.
+    """
+    import psycopg2
+    import database
+
+    params = database._connection_params()
+    if not params["dbname"]:
+        pytest.skip("DB_NAME is not set")
+    try:
+        admin = psycopg2.connect(**params)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    admin.autocommit = True
+    with admin.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA {schema}")
+    params = dict(params, options=f"-c search_path={schema}")
+    monkeypatch.setattr(database, "_connection_params", lambda: dict(params))
+    database.close_pool()
+    conn = psycopg2.connect(**params)
+    try:
+        yield conn
+    finally:
+        conn.close()
+        database.close_pool()
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from clients.crossref_client import CrossrefClient
+from ingest_crossref import run_crossref_ingestion
+from repositories.paper_repo import PaperRepository
+
+def _work(i):
+    return {"DOI": f"10.1000/W{i}", "title": [f"Work {i}"], "issued": {"date-parts": [[2000 + i % 20, 5]]},
+            "author": [{"given": "Jan", "family": f"Kowalski{i}"}, {"name": "The Consortium"}],
+            "container-title": ["Journal"]}
+
+class FixtureCrossref(ThreadingHTTPServer):
+    """Local /works endpoint with cursor deep paging over `total` works (every 7th has no DOI)."""
+
+    def __init__(self, total):
+        self.works = [_work(i) if i % 7 else {"title": ["No DOI"]} for i in range(total)]
+        self.requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                url = urlparse(handler.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                self.requests.append(params)
+                start = 0 if params["cursor"] == "*" else int(params["cursor"])
+                end = start + int(params["rows"])
+                body = json.dumps({"message": {
+                    "total-results": len(self.works), "items": self.works[start:end],
+                    # Crossref keeps returning a cursor; the empty page ends the walk
+                    "next-cursor": str(end)}}).encode()
+                handler.send_response(200)
+                handler.send_header("Content-Type", "application/json")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+@pytest.fixture
+def crossref():
+    server = FixtureCrossref(total=25)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _client(server):
+    return CrossrefClient(base_url=server.base_url, rate=1000, mailto="me@example.org")
+
+def test_cursor_paging_walks_every_page(crossref):
+    with contextlib.redirect_stdout(io.StringIO()):
+        papers = list(_client(crossref).iter_works("entity resolution", {"from-pub-date": "2020"}, rows=10))
+
+    assert [p.source_id for p in papers] == [f"10.1000/w{i}" for i in range(25) if i % 7]
+    assert [r["cursor"] for r in crossref.requests] == ["*", "10", "20", "30"]
+    first = crossref.requests[0]
+    assert first["select"] == "DOI,title,author,issued,container-title"
+    assert first["query.bibliographic"] == "entity resolution"
+    assert first["filter"] == "from-pub-date:2020"
+    assert first["mailto"] == "me@example.org"
+
+def test_max_results_stops_paging(crossref):
+    with contextlib.redirect_stdout(io.StringIO()):
+        papers = list(_client(crossref).iter_works(rows=10, max_results=5))
+
+    assert len(papers) == 5
+    assert [r["cursor"] for r in crossref.requests] == ["*"]
+
+def test_work_is_mapped_to_a_standard_paper():
+    paper = CrossrefClient.to_standard_paper(_work(3))
+
+    assert (paper.source_id, paper.source_name, paper.doi) == ("10.1000/w3", "crossref", "10.1000/w3")
+    assert paper.authors == ["Jan Kowalski3", "The Consortium"]
+    assert (paper.title, paper.year, paper.venue) == ("Work 3", 2003, "Journal")
+    assert CrossrefClient.to_standard_paper({"title": ["x"]}) is None
+
+def test_ingestion_writes_every_page_in_batches(crossref, pg_conn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        saved = run_crossref_ingestion("x", batch_size=8, rows=10, client=_client(crossref),
+                                       repo=PaperRepository(pg_conn))
+
+    assert saved == 21
+    with pg_conn.cursor() as cursor:
+        cursor.execute("SELECT count(*), count(DISTINCT doi) FROM papers WHERE source_name = 'crossref'")
+        assert cursor.fetchone() == (21, 21)
@@ -0,0 +1,133 @@
+import contextlib
+import io
+
+from psycopg2.extras import execute_values
+
+from dedup import DOI_BAND, DedupIndex, MinHasher, first_author_surname, normalize_doi, title_tokens
+from dedup_papers import run_dedup
+from models import StandardPaper
+from repositories.paper_repo import PaperRepository
+
+def _paper(title, doi=None, year=2020, authors=("Jan Kowalski",), source="dblp"):
+    return StandardPaper(source_id=title, source_name=source, title=title, authors=list(authors),
+                         year=year, venue=None, doi=doi)
+
+def test_normalisation():
+    assert normalize_doi("https://doi.org/10.1000/ABC") == "10.1000/abc"
+    assert normalize_doi("doi: 10.1000/x") == "10.1000/x"
+    assert title_tokens("The <i>Entity</i> Resolution of Names") == {"i", "entity", "resolution", "names"}
+    assert first_author_surname(["Kowalski, Jan"]) == first_author_surname(["Jan Kowalski 0002"]) == "kowalski"
+
+def test_minhash_estimates_jaccard_similarity():
+    hasher = MinHasher(num_perm=256)
+    a = {f"t{i}" for i in range(100)}
+    b = {f"t{i}" for i in range(50, 150)}  # Jaccard 1/3
+
+    sig_a, sig_b = hasher.signature(a), hasher.signature(b)
+
+    assert hasher.signature(set()) is None
+    assert sig_a == MinHasher(num_perm=256).signature(a)
+    assert abs(sum(x == y for x, y in zip(sig_a, sig_b)) / 256 - 1 / 3) < 0.1
+
+def test_near_duplicate_titles_are_clustered():
+    index = DedupIndex()
+    changed = index.add_batch([
+        (1, _paper("Deep Learning for Entity Resolution in Bibliographic Databases")),
+        (2, _paper("Deep learning for entity resolution in bibliographic databases.", source="crossref")),
+        (3, _paper("A Survey of Graph Neural Networks")),
+    ])
+
+    assert changed == {1: 1, 2: 1, 3: 3}
+    assert index.clusters() == {1: [1, 2]}
+
+def test_doi_matches_and_conflicts():
+    index = DedupIndex()
+    index.add_batch([
+        (1, _paper("Entity resolution at scale", doi="10.1000/1")),
+        (2, _paper("Completely different title", doi="https://doi.org/10.1000/1")),
+        (3, _paper("Entity resolution at scale", doi="10.1000/2")),
+    ])
+
+    # Same DOI always matches; a matching title with another DOI never does
+    assert index.clusters() == {1: [1, 2]}
+    assert index.cluster_id(3) == 3
+
+def test_year_gap_keeps_papers_apart():
+    index = DedupIndex()
+    index.add_batch([(1, _paper("Entity resolution of researcher names", year=2010)),
+                     (2, _paper("Entity resolution of researcher names", year=2015))])
+
+    assert index.clusters() == {}
+
+def test_first_author_decides_close_titles():
+    index = DedupIndex()
+    index.add_batch([
+        (1, _paper("Entity resolution of researcher names")),
+        (2, _paper("Entity resolution of large researcher names")),
+        (3, _paper("Entity resolution for researcher names", authors=["Anna Nowak"], source="crossref")),
+    ])
+
+    assert index.clusters() == {1: [1, 2]}
+
+def test_new_paper_with_a_smaller_key_renames_the_cluster():
+    index = DedupIndex()
+    index.add_batch([(5, _paper("Entity resolution at scale")), (7, _paper("Entity Resolution at Scale"))])
+
+    assert index.add_batch([(2, _paper("Entity resolution at scale!"))]) == {2: 2, 5: 2, 7: 2}
+
+def test_lsh_keys_are_shared_by_candidates():
+    index = DedupIndex()
+    a = index.lsh_keys(_paper("Entity resolution at scale", doi="10.1000/1"))
+    b = index.lsh_keys(_paper("Entity Resolution at Scale", doi="10.1000/1"))
+    c = index.lsh_keys(_paper("A survey of graph neural networks"))
+
+    assert len(a) == index.bands + 1 and (DOI_BAND, a[0][1]) == a[0]
+    assert a == b
+    assert not set(a) & set(c)
+    assert all(-2 ** 63 <= bucket < 2 ** 63 for _, bucket in a)
+
+def _insert(conn, papers):
+    with conn.cursor() as cursor:
+        execute_values(cursor, "INSERT INTO papers (id, source_id, source_name, title, authors_json, year, venue, doi) "
+                               "VALUES %s", [(key,) + p.to_db_tuple() for key, p in papers])
+    conn.commit()
+
+def _cluster_ids(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT id, cluster_id FROM papers ORDER BY id")
+        return dict(cursor.fetchall())
+
+def test_incremental_runs_load_only_candidates(pg_conn):
+    repo = PaperRepository(pg_conn)
+    repo.ensure_table()
+    _insert(pg_conn, [(1, _paper("Entity resolution at scale", doi="10.1000/1")),
+                      (2, _paper("A survey of graph neural networks")),
+                      (3, _paper("Streaming JSON parsers compared"))])
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_dedup(repo=repo)
+    assert _cluster_ids(pg_conn) == {1: 1, 2: 2, 3: 3}
+
+    _insert(pg_conn, [(4, _paper("Unrelated title", doi="10.1000/1", source="crossref")),
+                      (5, _paper("A Survey of Graph Neural Networks.", source="crossref"))])
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = run_dedup(repo=repo)
+
+    assert _cluster_ids(pg_conn) == {1: 1, 2: 2, 3: 3, 4: 1, 5: 2}
+    # Paper 3 shares no bucket with the new papers, so it was not read
+    assert 3 not in index and len(index) == 4
+
+def test_corpus_clustered_before_paper_lsh_is_backfilled(pg_conn):
+    repo = PaperRepository(pg_conn)
+    repo.ensure_table()
+    _insert(pg_conn, [(1, _paper("Entity resolution at scale"))])
+    with pg_conn.cursor() as cursor:
+        cursor.execute("UPDATE papers SET cluster_id = id")
+    pg_conn.commit()
+    assert repo.needs_lsh_backfill()
+
+    _insert(pg_conn, [(2, _paper("Entity Resolution at Scale", source="crossref"))])
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_dedup(repo=repo)
+
+    assert _cluster_ids(pg_conn) == {1: 1, 2: 1}
+    assert not repo.needs_lsh_backfill()
@@ -0,0 +1,88 @@
+import contextlib
+import io
+
+from ingest_worker import JobWorker
+from repositories.job_queue_repo import JobQueueRepository
+
+ORCIDS = [f"0000-0000-0000-000{i}" for i in range(5)]
+
+def _queue(pg_conn):
+    jobs = JobQueueRepository(pg_conn)
+    jobs.ensure_table()
+    jobs.enqueue(ORCIDS, max_attempts=2)
+    return jobs
+
+def _states(pg_conn):
+    with pg_conn.cursor() as cursor:
+        cursor.execute("SELECT orcid, state FROM ingest_job ORDER BY id")
+        states = dict(cursor.fetchall())
+    pg_conn.commit()
+    return states
+
+def test_enqueue_skips_queued_and_requeues_finished_on_request(pg_conn):
+    jobs = _queue(pg_conn)
+    [(job_id, _, _)] = jobs.claim("w1", batch_size=1)
+    assert jobs.complete("w1", job_id)
+
+    assert jobs.enqueue(ORCIDS) == 0
+    assert jobs.enqueue(ORCIDS, requeue_finished=True) == 1
+    assert set(_states(pg_conn).values()) == {"pending"}
+
+def test_claims_skip_rows_locked_by_another_worker(pg_conn):
+    jobs = _queue(pg_conn)
+    other = JobQueueRepository()  # Pooled connection: a second session
+
+    with pg_conn.cursor() as cursor:
+        # Another worker is in the middle of claiming the first two jobs
+        cursor.execute("SELECT id FROM ingest_job ORDER BY id LIMIT 2 FOR UPDATE")
+        locked = [row[0] for row in cursor.fetchall()]
+        claimed = other.claim("w2", batch_size=10)
+    pg_conn.rollback()
+
+    assert [orcid for _, orcid, _ in claimed] == ORCIDS[2:]
+    assert not set(locked) & {job_id for job_id, _, _ in claimed}
+
+def test_expired_lease_is_taken_over_and_the_old_owner_loses_it(pg_conn):
+    jobs = _queue(pg_conn)
+    [(job_id, orcid, attempts)] = jobs.claim("w1", batch_size=1, lease_seconds=0)
+    assert attempts == 1
+
+    [(taken, _, attempts)] = jobs.claim("w2", batch_size=1)
+    assert (taken, attempts) == (job_id, 2)
+    assert jobs.heartbeat("w1", {job_id}) == set()
+    assert not jobs.complete("w1", job_id)
+    assert not jobs.fail("w1", job_id, "late")
+    assert jobs.complete("w2", job_id)
+
+def test_failures_are_retried_until_max_attempts(pg_conn):
+    jobs = _queue(pg_conn)
+    [(job_id, orcid, _)] = jobs.claim("w1", batch_size=1)
+    assert jobs.fail("w1", job_id, "HTTP 502", retry_delay=0)
+
+    [(again, _, attempts)] = jobs.claim("w1", batch_size=1)
+    assert (again, attempts) == (job_id, 2)
+    assert jobs.fail("w1", job_id, "HTTP 502", retry_delay=0)
+    assert _states(pg_conn)[orcid] == "failed"
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(pg_conn):
+    jobs = _queue(pg_conn)
+    for worker in ("w1", "w2"):
+        [(job_id, orcid, _)] = jobs.claim(worker, batch_size=1, lease_seconds=0)
+
+    jobs.claim("w3", batch_size=0)
+    assert _states(pg_conn)[orcid] == "failed"
+    assert jobs.counts() == {"failed": 1, "pending": 4}
+
+def test_worker_counts_a_lost_lease_instead_of_the_outcome(pg_conn):
+    jobs = _queue(pg_conn)
+    worker = JobWorker(client=None)
+    worker.jobs = jobs
+    [(job_id, _, _)] = jobs.claim(worker.worker_id, batch_size=1, lease_seconds=0)
+    jobs.claim("other", batch_size=1)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        worker._record("retry", jobs.fail, job_id, "HTTP 502")
+        worker._record("failed", lambda *args: 1 / 0, job_id)
+
+    assert worker.counts["retry"] == 0 and worker.counts["failed"] == 0
+    assert worker.counts["lease_lost"] == 2
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from clients.json_stream import iter_array
+
+DOCUMENT = {
+    "last-modified-date": {"value": 1700000000000},
+    "group": [{"title": "Zażółć gęślą jaźń", "n": 12345}, {"title": "b", "n": -0.5}, [], "x", 7, True, None],
+    "path": "/0000-0002-1825-0097/works",
+}
+
+def _chunks(text, size, binary=True):
+    data = text.encode("utf-8") if binary else text
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10 ** 6])
+def test_elements_and_fields_survive_any_chunk_split(size):
+    # Byte chunks of size 1-3 split the UTF-8 characters and the numbers
+    fields = {}
+    items = list(iter_array(_chunks(json.dumps(DOCUMENT, ensure_ascii=False), size), "group", fields))
+
+    assert items == DOCUMENT["group"]
+    assert fields == {"last-modified-date": DOCUMENT["last-modified-date"], "path": DOCUMENT["path"]}
+
+def test_text_chunks_and_whitespace():
+    text = json.dumps(DOCUMENT, indent=4)
+    assert list(iter_array(_chunks(text, 5, binary=False), "group")) == DOCUMENT["group"]
+
+def test_fields_before_the_array_are_available_while_iterating():
+    fields = {}
+    items = iter_array(_chunks(json.dumps(DOCUMENT), 4), "group", fields)
+
+    next(items)
+    assert fields == {"last-modified-date": DOCUMENT["last-modified-date"]}
+
+@pytest.mark.parametrize("text", ['{}', '{"group": []}', '{"path": "x"}', '{"group": null}'])
+def test_empty_or_missing_array(text):
+    assert list(iter_array(_chunks(text, 2), "group")) == []
+
+def test_truncated_document_raises():
+    text = json.dumps(DOCUMENT)[:-30]
+    with pytest.raises(ValueError):
+        list(iter_array(_chunks(text, 8), "group"))
@@ -0,0 +1,141 @@
+import io
+import json
+import tarfile
+
+from clients.orcid_dump import iter_archive_members, parse_record
+from ingest_orcid_dump import Checkpoint
+
+RECORD_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<record:record xmlns:record="http://www.orcid.org/ns/record" xmlns:common="http://www.orcid.org/ns/common"
+    xmlns:person="http://www.orcid.org/ns/person" xmlns:personal-details="http://www.orcid.org/ns/personal-details"
+    xmlns:activities="http://www.orcid.org/ns/activities" xmlns:work="http://www.orcid.org/ns/work"
+    xmlns:employment="http://www.orcid.org/ns/employment">
+  <common:orcid-identifier><common:path>0000-0002-1825-0097</common:path></common:orcid-identifier>
+  <person:person>
+    <common:last-modified-date>2024-03-01T10:00:00.000Z</common:last-modified-date>
+    <person:name>
+      <personal-details:given-names>Josiah</personal-details:given-names>
+      <personal-details:family-name>Carberry</personal-details:family-name>
+    </person:name>
+  </person:person>
+  <activities:activities-summary>
+    <activities:employments>
+      <common:last-modified-date>2024-02-01T00:00:00.000Z</common:last-modified-date>
+      <activities:affiliation-group>
+        <employment:employment-summary put-code="11">
+          <common:role-title>Professor</common:role-title>
+          <common:start-date><common:year>2001</common:year></common:start-date>
+          <common:organization>
+            <common:name>Brown University</common:name>
+            <common:address><common:city>Providence</common:city><common:country>US</common:country></common:address>
+          </common:organization>
+        </employment:employment-summary>
+      </activities:affiliation-group>
+    </activities:employments>
+    <activities:works>
+      <activities:group>
+        <work:work-summary put-code="42">
+          <work:title><common:title>Psychoceramics</common:title></work:title>
+          <work:type>journal-article</work:type>
+          <common:external-ids>
+            <common:external-id>
+              <common:external-id-type>doi</common:external-id-type>
+              <common:external-id-value>10.1000/182</common:external-id-value>
+              <common:external-id-relationship>self</common:external-id-relationship>
+            </common:external-id>
+          </common:external-ids>
+        </work:work-summary>
+      </activities:group>
+    </activities:works>
+  </activities:activities-summary>
+</record:record>
+"""
+
+def test_xml_record_has_the_shape_of_the_api_profile():
+    profile = parse_record("0097/0000-0002-1825-0097.xml", RECORD_XML)
+
+    assert profile["orcid"] == "0000-0002-1825-0097"
+    assert profile["person"]["name"]["family-name"] == {"value": "Carberry"}
+    assert profile["person"]["last-modified-date"] == {"value": 1709287200000}
+
+    summary = profile["employments"]["affiliation-group"][0]["summaries"][0]["employment-summary"]
+    assert summary["put-code"] == 11
+    assert summary["start-date"]["year"] == {"value": "2001"}
+    assert summary["organization"]["address"]["country"] == "US"
+
+    work = profile["works"]["group"][0]["work-summary"][0]
+    assert work["title"]["title"] == {"value": "Psychoceramics"}
+    assert work["external-ids"]["external-id"][0]["external-id-value"] == "10.1000/182"
+    # Sections missing from the record are empty, not None (None means "not re-downloaded")
+    assert profile["fundings"] == {}
+
+def test_json_record_is_split_into_sections():
+    record = {"orcid-identifier": {"path": "0000-0002-1825-0097"}, "person": {"name": None},
+              "activities-summary": {"works": {"group": [{"work-summary": []}]}}}
+    profile = parse_record("a.json", json.dumps(record).encode())
+
+    assert profile["orcid"] == "0000-0002-1825-0097"
+    assert profile["works"] == {"group": [{"work-summary": []}]}
+    assert profile["fundings"] == {}
+
+def test_non_record_members_are_skipped():
+    assert parse_record("README.txt", b"hello") is None
+    assert parse_record("empty.json", b"{}") is None
+
+def _tarball(tmp_path, names):
+    path = tmp_path / "summaries.tar.gz"
+    with tarfile.open(path, "w:gz") as tar:
+        for name in names:
+            info = tarfile.TarInfo(name)
+            info.size = len(name)
+            tar.addfile(info, io.BytesIO(name.encode()))
+    return str(path)
+
+def test_resumed_archive_reads_only_unfinished_and_retried_members(tmp_path):
+    path = _tarball(tmp_path, [f"{i}.xml" for i in range(5)])
+
+    members = list(iter_archive_members(path, skip=3, retry={1}))
+
+    assert [(index, data) for index, _, data in members] == [
+        (0, None), (1, b"1.xml"), (2, None), (3, b"3.xml"), (4, b"4.xml")]
+
+def test_checkpoint_advances_over_members_finished_out_of_order(tmp_path):
+    path = str(tmp_path / "progress.json")
+    checkpoint = Checkpoint(path, "dump.tar.gz")
+
+    checkpoint.mark_done(1, "saved")
+    checkpoint.mark_done(2, "unchanged")
+    assert checkpoint.completed == 0 and checkpoint.is_done(2) and not checkpoint.is_done(0)
+    checkpoint.mark_done(0, "saved")
+    assert checkpoint.completed == 3
+    checkpoint.mark_done(5, "saved")
+    checkpoint.save()
+
+    resumed = Checkpoint(path, "dump.tar.gz")
+    assert resumed.completed == 3
+    assert resumed.is_done(5) and not resumed.is_done(3) and not resumed.is_done(4)
+    assert resumed.state["counts"]["saved"] == 3
+
+def test_failed_members_are_retried_and_counted_once(tmp_path):
+    path = str(tmp_path / "progress.json")
+    checkpoint = Checkpoint(path, "dump.tar.gz")
+    checkpoint.mark_done(0, "saved")
+    checkpoint.mark_done(1, "failed", "1.xml")
+    checkpoint.mark_done(2, "saved")
+    checkpoint.save()
+
+    resumed = Checkpoint(path, "dump.tar.gz")
+    # The failed member does not hold back progress, but is not done either
+    assert resumed.completed == 3
+    assert resumed.failed == {1: "1.xml"} and not resumed.is_done(1)
+    resumed.mark_done(1, "saved")
+    assert resumed.failed == {}
+    assert resumed.state["counts"] == {"saved": 3, "unchanged": 0, "skipped": 0, "failed": 0}
+
+def test_checkpoint_of_another_archive_is_ignored(tmp_path):
+    path = str(tmp_path / "progress.json")
+    checkpoint = Checkpoint(path, "2023.tar.gz")
+    checkpoint.mark_done(0, "saved")
+    checkpoint.save()
+
+    assert Checkpoint(path, "2024.tar.gz").completed == 0
@@ -0,0 +1,63 @@
+import pytest
+
+from models import PaperBatch, StandardPaper
+from repositories.paper_repo import PaperRepository
+
+PAPERS = [
+    StandardPaper("conf/x/1", "dblp", "Tabs\tand\nnew lines\r", ["Jan Kowalski 0002", "Zoë \"Q\" O'Neil"],
+                  2020, "Venue\\with\\backslashes", "10.1000/1"),
+    StandardPaper("10.1000/2", "crossref", "\\N is not NULL", [], None, None, None),
+    StandardPaper("conf/x/3", "dblp", "Ünïcödé ☃", ["Back\\slash", "Jan Kowalski 0002"], 1999, "Venue\\with\\backslashes"),
+]
+
+_COPY_ESCAPES = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+def _parse_copy_field(field):
+    """Inverse of COPY text escaping, as PostgreSQL reads it."""
+    if field == "\\N":
+        return None
+    out, chars = [], iter(field)
+    for c in chars:
+        out.append(_COPY_ESCAPES[next(chars)] if c == "\\" else c)
+    return "".join(out)
+
+def _parse_copy(buf):
+    lines = buf.getvalue().split("\n")
+    assert lines[-1] == ""
+    return [tuple(_parse_copy_field(f) for f in line.split("\t")) for line in lines[:-1]]
+
+def _as_text(row):
+    return tuple(None if v is None else str(v) for v in row)
+
+def test_batch_returns_the_papers_it_was_built_from():
+    batch = PaperBatch.from_papers(PAPERS)
+
+    assert len(batch) == 3
+    assert list(batch) == PAPERS
+    assert batch[-1] == PAPERS[-1]
+    assert batch.to_tuples() == [p.to_db_tuple() for p in PAPERS]
+
+def test_copy_buffer_escapes_every_field():
+    rows = _parse_copy(PaperBatch.from_papers(PAPERS).to_copy_buffer())
+
+    # One line and seven fields per paper, whatever tabs and new lines the values contain
+    assert rows == [_as_text(p.to_db_tuple()) for p in PAPERS]
+
+def test_copy_batch_loads_the_values_unchanged(pg_conn):
+    repo = PaperRepository(pg_conn)
+    repo.ensure_table()
+
+    assert repo.copy_batch(PAPERS) == 3
+    # Loading again updates in place
+    assert repo.copy_batch(PaperBatch.from_papers(PAPERS)) == 3
+
+    with pg_conn.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(PaperRepository.COLUMNS)} FROM papers ORDER BY source_id")
+        stored = cursor.fetchall()
+    expected = sorted(PAPERS, key=lambda p: p.source_id)
+    assert [row[:3] + row[4:] for row in stored] == [p.to_db_tuple()[:3] + p.to_db_tuple()[4:] for p in expected]
+    assert [row[3] for row in stored] == [p.authors for p in expected]
+
+@pytest.mark.parametrize("papers", [[], PaperBatch()])
+def test_empty_batches_write_nothing(papers):
+    assert PaperRepository().copy_batch(papers) == 0
@@ -0,0 +1,85 @@
+import gzip
+import os
+
+from clients.profile_archive import ProfileArchive
+
+def _profile(orcid, version, works=True):
+    return {"orcid": orcid, "person": {"v": version}, "works": {"v": version} if works else None}
+
+def _archive(tmp_path, profiles, chunk_size=2):
+    path = str(tmp_path / "profiles.jsonl.gz")
+    with ProfileArchive(path, chunk_size=chunk_size) as archive:
+        for profile in profiles:
+            archive.append(profile)
+    return path
+
+def test_round_trip_is_a_plain_multi_member_gzip(tmp_path):
+    profiles = [_profile(f"0000-0000-0000-000{i}", i) for i in range(5)]
+    path = _archive(tmp_path, profiles)
+
+    archive = ProfileArchive(path)
+    assert len(archive) == 5 and len(archive.chunks) == 3
+    assert list(archive) == profiles
+    assert archive.get("0000-0000-0000-0003") == profiles[3]
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert len(f.readlines()) == 5
+
+def test_missing_index_is_rebuilt_from_the_archive(tmp_path):
+    path = _archive(tmp_path, [_profile(f"0000-0000-0000-000{i}", i) for i in range(5)])
+    with open(path + ".idx", encoding="utf-8") as f:
+        index = f.read()
+    os.remove(path + ".idx")
+
+    archive = ProfileArchive(path)
+
+    assert len(archive) == 5
+    with open(path + ".idx", encoding="utf-8") as f:
+        assert f.read() == index
+
+def test_half_written_index_line_is_dropped(tmp_path):
+    path = _archive(tmp_path, [_profile(f"0000-0000-0000-000{i}", i) for i in range(4)])
+    with open(path + ".idx", "a", encoding="utf-8") as f:
+        f.write('{"offset": 12')
+
+    archive = ProfileArchive(path)
+
+    assert len(archive.chunks) == 2
+    with open(path + ".idx", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+def test_chunk_cut_short_by_a_crash_is_overwritten_by_the_next_append(tmp_path):
+    path = _archive(tmp_path, [_profile(f"0000-0000-0000-000{i}", i) for i in range(4)])
+    complete_size = os.path.getsize(path)
+    # A crash while writing the third chunk: its bytes are partly on disk, its index line is not
+    with open(path, "ab") as f:
+        f.write(gzip.compress(b'{"orcid": "0000-0000-0000-0009"}\n')[:10])
+
+    with ProfileArchive(path) as archive:
+        assert len(archive) == 4
+        archive.append(_profile("0000-0000-0000-0005", 5))
+
+    archive = ProfileArchive(path)
+    assert archive.chunks[-1]["offset"] == complete_size
+    assert [p["orcid"] for p in archive][-1] == "0000-0000-0000-0005"
+    # Rebuilding stops at the cut-short chunk as well
+    os.remove(path + ".idx")
+    with open(path, "ab") as f:
+        f.write(b"\x1f\x8b\x08")
+    assert len(ProfileArchive(path)) == 5
+
+def test_index_entries_past_the_end_of_the_archive_are_dropped(tmp_path):
+    path = _archive(tmp_path, [_profile(f"0000-0000-0000-000{i}", i) for i in range(4)])
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 5)
+
+    assert len(ProfileArchive(path).chunks) == 1
+
+def test_latest_merges_sections_of_incremental_runs(tmp_path):
+    orcid = "0000-0000-0000-0001"
+    path = _archive(tmp_path, [_profile(orcid, 1), _profile("0000-0000-0000-0002", 1),
+                               _profile(orcid, 2, works=False)])
+
+    latest = {p["orcid"]: p for p in ProfileArchive(path).iter_latest()}
+
+    assert latest[orcid] == {"orcid": orcid, "person": {"v": 2}, "works": {"v": 1}}
+    assert len(latest) == 2
@@ -0,0 +1,126 @@
+import threading
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from clients import request_scheduler
+from clients.request_scheduler import RequestScheduler, TokenBucket, TransientRequestError
+
+class FakeClock:
+    """Replaces time.monotonic / time.time / time.sleep in request_scheduler."""
+
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        self.sleeps = []
+        monkeypatch.setattr(request_scheduler.time, "monotonic", lambda: self.now)
+        monkeypatch.setattr(request_scheduler.time, "time", lambda: self.now)
+        monkeypatch.setattr(request_scheduler.time, "sleep", self.sleep)
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+@pytest.fixture
+def clock(monkeypatch):
+    return FakeClock(monkeypatch)
+
+# Rates are powers of two, so the fake clock adds up exactly
+
+def test_bucket_allows_a_burst_then_the_rate(clock):
+    bucket = TokenBucket(rate=4, burst=3)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits == [0, 0, 0, 0.25, 0.25]
+    assert clock.now == 1000.5
+
+def test_bucket_refills_up_to_burst_only(clock):
+    bucket = TokenBucket(rate=4, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60
+
+    assert [bucket.acquire() for _ in range(2)] == [0, 0]
+    assert bucket.acquire() == 0.25
+
+def test_paused_bucket_waits_out_the_pause(clock):
+    bucket = TokenBucket(rate=4, burst=5)
+    bucket.pause(2.0)
+
+    assert bucket.acquire() == pytest.approx(2.0)
+
+def test_retry_after_seconds_pauses_every_thread(clock):
+    scheduler = RequestScheduler(rate=100, burst=100)
+    throttled = FakeResponse(429, {"Retry-After": "3"})
+    session = FakeSession(throttled, FakeResponse(200))
+
+    resp = scheduler.request(session, "GET", "https://example.org")
+
+    assert resp.status_code == 200
+    assert throttled.closed
+    assert clock.sleeps[0] == 3.0
+    assert scheduler.bucket._paused_until == pytest.approx(1003.0)
+    assert scheduler.stats()["throttled"] == 1 and scheduler.stats()["retries"] == 1
+
+def test_retry_after_http_date(clock):
+    scheduler = RequestScheduler(rate=100, burst=100)
+    resp = FakeResponse(503, {"Retry-After": formatdate(clock.now + 5, usegmt=True)})
+
+    assert scheduler._retry_after(resp) == pytest.approx(5.0)
+
+@pytest.mark.parametrize("value, expected", [("-5", 0.0), ("999", 60.0), ("soon", None), ("", None)])
+def test_retry_after_is_clamped_or_ignored(clock, value, expected):
+    scheduler = RequestScheduler(rate=100, burst=100, max_delay=60.0)
+
+    assert scheduler._retry_after(FakeResponse(429, {"Retry-After": value})) == expected
+
+def test_transient_errors_give_up_after_max_attempts(clock):
+    scheduler = RequestScheduler(rate=100, burst=100, max_attempts=3)
+    session = FakeSession(requests.ConnectionError("reset"), FakeResponse(502), FakeResponse(500))
+
+    with pytest.raises(TransientRequestError):
+        scheduler.request(session, "GET", "https://example.org")
+    assert session.calls == 3
+    assert scheduler.stats()["gave_up"] == 1
+
+def test_permanent_errors_are_returned_without_retry(clock):
+    scheduler = RequestScheduler(rate=100, burst=100)
+    session = FakeSession(FakeResponse(404))
+
+    assert scheduler.request(session, "GET", "https://example.org").status_code == 404
+    assert session.calls == 1 and scheduler.stats()["permanent_errors"] == 1
+
+def test_slot_is_released_between_attempts_and_kept_for_streams(clock):
+    scheduler = RequestScheduler(rate=100, burst=100)
+    slot = threading.BoundedSemaphore(1)
+    session = FakeSession(FakeResponse(503, {"Retry-After": "1"}), FakeResponse(200))
+
+    scheduler.request(session, "GET", "https://example.org", slot=slot, hold_slot=True)
+
+    # The streamed response still holds the only slot
+    assert not slot.acquire(blocking=False)
+    slot.release()
+    scheduler.request(FakeSession(FakeResponse(200)), "GET", "https://example.org", slot=slot)
+    assert slot.acquire(blocking=False)